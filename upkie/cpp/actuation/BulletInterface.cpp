@@ -160,18 +160,74 @@ void BulletInterface::register_contacts() {
 }
 void BulletInterface::reset(const Dictionary& config) {
   params_.configure(config);
+  last_action_snapshot_.clear();
+  nb_steps_ = 0;
   register_contacts();
   bullet_.setTimeStep(params_.dt);
-  reset_base_state(params_.position_base_in_world,
-                   params_.orientation_base_in_world,
-                   params_.linear_velocity_base_to_world_in_world,
-                   params_.angular_velocity_base_in_base);
+
+  // Check the snapshot name before resetting anything, so that an unknown
+  // name falls back to a regular reset rather than throwing from the spine
+  restored_ = false;
+  if (!params_.restore.empty()) {
+    if (has_snapshot(params_.restore)) {
+      restore_snapshot(params_.restore);
+      restored_ = true;
+    } else {
+      spdlog::error("No simulation snapshot named \"{}\" to restore",
+                    params_.restore);
+    }
+  }
+  if (!restored_) {
+    reset_base_state(params_.position_base_in_world,
+                     params_.orientation_base_in_world,
+                     params_.linear_velocity_base_to_world_in_world,
+                     params_.angular_velocity_base_in_base);
+  }
   reset_contact_data();
-  reset_joint_angles(params_.joint_configuration);
+  external_forces_.clear();
+  if (!restored_) {
+    reset_joint_angles(params_.joint_configuration);
+  }
   reset_joint_properties();
   if (std::abs(params_.inertia_randomization) < 1e-10) {
     randomize_masses();
   }
+  if (!params_.snapshot.empty()) {
+    save_snapshot(params_.snapshot);
+  }
+}
+
+void BulletInterface::restore_snapshot(const std::string& name) {
+  const auto it = snapshot_ids_.find(name);
+  if (it == snapshot_ids_.end()) {
+    throw std::runtime_error("No simulation snapshot named \"" + name + "\"");
+  }
+  bullet_.restoreStateFromMemory(it->second);
+
+  // Reset the extra velocity field used to compute IMU accelerations
+  b3LinkState link_state;
+  bullet_.getLinkState(robot_, imu_link_index_, /* computeVelocity = */ true,
+                       /* computeForwardKinematics = */ true, &link_state);
+  imu_data_.linear_velocity_imu_in_world[0] =
+      link_state.m_worldLinearVelocity[0];
+  imu_data_.linear_velocity_imu_in_world[1] =
+      link_state.m_worldLinearVelocity[1];
+  imu_data_.linear_velocity_imu_in_world[2] =
+      link_state.m_worldLinearVelocity[2];
+}
+
+void BulletInterface::save_snapshot(const std::string& name) {
+  const auto it = snapshot_ids_.find(name);
+  if (it != snapshot_ids_.end()) {
+    bullet_.removeState(it->second);
+    snapshot_ids_.erase(it);
+  }
+  const int state_id = bullet_.saveStateToMemory();
+  if (state_id < 0) {
+    spdlog::warn("Could not save simulation snapshot \"{}\"", name);
+    return;
+  }
+  snapshot_ids_[name] = state_id;
 }
 
 void BulletInterface::reset_base_state(
@@ -257,6 +313,8 @@ void BulletInterface::observe(Dictionary& observation) const {
 
   Dictionary& sim = observation("sim");
   sim("imu")("linear_velocity") = imu_data_.linear_velocity_imu_in_world;
+  sim("restored") = restored_;
+  sim("time") = static_cast<double>(nb_steps_) * params_.dt;  // [s]
 
   for (const auto& contact_group : monitor_contacts_) {
     sim("contact")(contact_group.first) =
@@ -301,6 +359,15 @@ void BulletInterface::process_action(const Dictionary& action) {
   if (bullet_action.has("external_forces")) {
     process_forces(bullet_action("external_forces"));
   }
+  if (bullet_action.has("snapshot")) {
+    // Action keys persist across spine cycles until the next action update,
+    // so we only save once per requested name
+    const auto& name = bullet_action.get<std::string>("snapshot");
+    if (name != last_action_snapshot_) {
+      save_snapshot(name);
+      last_action_snapshot_ = name;
+    }
+  }
 }
 
 void BulletInterface::process_forces(const Dictionary& external_forces) {
@@ -345,6 +412,7 @@ void BulletInterface::cycle(
   send_commands();
   apply_external_forces();
   bullet_.stepSimulation();
+  ++nb_steps_;
 
   if (params_.follower_camera) {
     translate_camera_to_robot();
@@ -6,6 +6,7 @@
 #include <palimpsest/Dictionary.h>
 #include <spdlog/spdlog.h>
 
+#include <cstdint>
 #include <iostream>
 #include <limits>
 #include <map>
@@ -43,6 +44,8 @@ class BulletInterface : public Interface {
      * \param[in] config Global configuration dictionary.
      */
     void configure(const Dictionary& config) {
+      restore.clear();
+      snapshot.clear();
       if (!config.has("bullet")) {
         spdlog::debug("No \"bullet\" runtime configuration");
         return;
@@ -52,6 +55,8 @@ class BulletInterface : public Interface {
       const auto& bullet = config("bullet");
       follower_camera = bullet.get<bool>("follower_camera", follower_camera);
       gui = bullet.get<bool>("gui", gui);
+      restore = bullet.get<std::string>("restore", "");
+      snapshot = bullet.get<std::string>("snapshot", "");
 
       if (bullet.has("imu_uncertainty")) {
         imu_uncertainty.configure(bullet("imu_uncertainty"));
@@ -190,6 +195,25 @@ class BulletInterface : public Interface {
 
     //! Initial joint configuration vector
     Eigen::VectorXd joint_configuration;
+
+    /*! Name of a simulation snapshot to restore upon reset.
+     *
+     * When set to the name of an existing snapshot, the reset restores the
+     * state of the simulation from it rather than from the "reset" base state
+     * and joint configuration. Otherwise, the reset logs an error and falls
+     * back to the "reset" state. The "sim.restored" observation tells agents
+     * whether their snapshot was restored.
+     *
+     * A snapshot only holds the state of the Bullet simulation. The rest of
+     * the reset still happens when restoring it: parameters are reconfigured,
+     * contacts are registered again, joint properties are reset and masses
+     * are randomized again, if randomization is enabled. Simulated time also
+     * restarts from zero, as "sim.time" counts steps since the last reset.
+     */
+    std::string restore;
+
+    //! If set, save a simulation snapshot under this name after reset.
+    std::string snapshot;
   };
 
   /*! Initialize interface.
@@ -206,6 +230,10 @@ class BulletInterface : public Interface {
   /*! Reset interface.
    *
    * \param[in] config Additional configuration dictionary.
+   *
+   * Resets restoring a snapshot (see Parameters::restore) go through the same
+   * steps as other resets, except for the base state and joint angles that
+   * come from the snapshot.
    */
   void reset(const Dictionary& config) override;
 
@@ -272,6 +300,26 @@ class BulletInterface : public Interface {
   //! Reset contact data.
   void reset_contact_data();
 
+  /*! Restore the simulation state from a snapshot.
+   *
+   * \param[in] name Name of the snapshot.
+   *
+   * \throw std::runtime_error If there is no snapshot with this name.
+   */
+  void restore_snapshot(const std::string& name);
+
+  /*! Save the current simulation state to an in-memory snapshot.
+   *
+   * \param[in] name Name of the snapshot. A previous snapshot with the same
+   *     name is replaced.
+   */
+  void save_snapshot(const std::string& name);
+
+  //! Check whether a snapshot exists.
+  bool has_snapshot(const std::string& name) const noexcept {
+    return snapshot_ids_.find(name) != snapshot_ids_.end();
+  }
+
   /*! Reset joint angles.
    *
    * \param[in] joint_configuration Joint configuration vector.
@@ -424,6 +472,24 @@ class BulletInterface : public Interface {
   //! Random number generator used to sample from probability distributions
   std::mt19937 rng_;
 
+  //! Map from snapshot name to Bullet in-memory state identifier
+  std::map<std::string, int> snapshot_ids_;
+
+  //! Name of the last snapshot saved from an action since the last reset
+  std::string last_action_snapshot_;
+
+  //! Whether the last reset restored the simulation from a snapshot
+  bool restored_ = false;
+
+  /*! Number of simulation steps since the last reset.
+   *
+   * Multiplied by the simulation timestep, it gives the simulated time
+   * reported in the "sim.time" observation. Contrary to the "time"
+   * observation of the spine, which is wall-clock time, it lets agents pace
+   * themselves against simulated time.
+   */
+  uint64_t nb_steps_ = 0;
+
   /*! Map from link index to external force applied to it
    *
    * \note It is only possible to apply one external wrench (force, torque) on
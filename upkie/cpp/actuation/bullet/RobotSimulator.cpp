@@ -78,4 +78,16 @@ bool RobotSimulatorClientAPI::changeDynamics(
   return true;
 }
 
+bool RobotSimulatorClientAPI::removeState(int stateId) {
+  b3PhysicsClientHandle sm = m_data->m_physicsClientHandle;
+  if (sm == 0) {
+    b3Warning("Not connected to physics server.");
+    return false;
+  }
+  b3SharedMemoryCommandHandle command = b3InitRemoveStateCommand(sm, stateId);
+  b3SharedMemoryStatusHandle status =
+      b3SubmitClientCommandAndWaitStatus(sm, command);
+  return b3GetStatusType(status) == CMD_REMOVE_STATE_COMPLETED;
+}
+
 }  // namespace upkie::cpp::actuation::bullet
@@ -29,6 +29,14 @@ class RobotSimulatorClientAPI : public b3RobotSimulatorClientAPI {
    */
   bool changeDynamics(int bodyUniqueId, int linkIndex,
                       RobotSimulatorChangeDynamicsArgs& args);
+
+  /*! Remove a state saved in memory by saveStateToMemory.
+   *
+   * \param[in] stateId Identifier returned by saveStateToMemory.
+   * \return True if the state was removed successfully, false if there was an
+   *     issue.
+   */
+  bool removeState(int stateId);
 };
 
 }  // namespace upkie::cpp::actuation::bullet
@@ -110,6 +110,21 @@ TEST_F(BulletInterfaceTest, CycleDoesntThrow) {
   ASSERT_NO_THROW(interface_->cycle([](const moteus::Output& output) {}));
 }
 
+TEST_F(BulletInterfaceTest, ObserveSimulationTime) {
+  Dictionary config;
+  interface_->reset(config);
+  for (unsigned step = 0; step < 5; ++step) {
+    interface_->cycle([](const moteus::Output& output) {});
+  }
+  Dictionary observation;
+  interface_->observe(observation);
+  ASSERT_NEAR(observation("sim").get<double>("time"), 5 * dt_, 1e-12);
+
+  interface_->reset(config);
+  interface_->observe(observation);
+  ASSERT_DOUBLE_EQ(observation("sim").get<double>("time"), 0.0);
+}
+
 TEST_F(BulletInterfaceTest, ResetBaseState) {
   Dictionary config;
   config("bullet")("reset")("orientation_base_in_world") =
@@ -450,4 +465,58 @@ TEST_F(BulletInterfaceTest, ResetJointConfiguration) {
   ASSERT_THROW(interface_->reset(config), std::runtime_error);  // exn
 }
 
+TEST_F(BulletInterfaceTest, RestoreSnapshot) {
+  Eigen::VectorXd joint_configuration(6);
+  joint_configuration << 1.0, 2.0, 3.0, 4.0, 5.0, 6.0;
+
+  Dictionary config;
+  config("bullet")("reset")("position_base_in_world") =
+      Eigen::Vector3d(0.0, 0.0, 1.0);
+  config("bullet")("reset")("joint_configuration") = joint_configuration;
+  config("bullet")("snapshot") = std::string("initial");
+  interface_->reset(config);
+  ASSERT_TRUE(interface_->has_snapshot("initial"));
+
+  for (double t = 0.0; t < 0.05; t += dt_) {
+    interface_->cycle([](const moteus::Output& output) {});
+  }
+  Dictionary action;
+  action("bullet")("snapshot") = std::string("falling");
+  interface_->process_action(action);
+  const Eigen::Vector3d falling_position =
+      interface_->get_transform_base_to_world().block<3, 1>(0, 3);
+  ASSERT_LT(falling_position.z(), 1.0);
+  ASSERT_TRUE(interface_->has_snapshot("falling"));
+
+  // Restoring ignores the base state and joint configuration of the config
+  Dictionary restore_config;
+  restore_config("bullet")("restore") = std::string("initial");
+  interface_->reset(restore_config);
+  Eigen::Vector3d p =
+      interface_->get_transform_base_to_world().block<3, 1>(0, 3);
+  ASSERT_DOUBLE_EQ(p.z(), 1.0);
+  Eigen::VectorXd q = interface_->get_joint_angles();
+  ASSERT_DOUBLE_EQ(q(0), 1.0);
+  ASSERT_DOUBLE_EQ(q(5), 6.0);
+
+  restore_config("bullet")("restore") = std::string("falling");
+  interface_->reset(restore_config);
+  p = interface_->get_transform_base_to_world().block<3, 1>(0, 3);
+  ASSERT_DOUBLE_EQ(p.z(), falling_position.z());
+
+  Dictionary observation;
+  interface_->observe(observation);
+  ASSERT_TRUE(observation("sim").get<bool>("restored"));
+
+  // Unknown snapshots fall back to the "reset" state
+  restore_config("bullet")("restore") = std::string("unknown");
+  restore_config("bullet")("reset")("position_base_in_world") =
+      Eigen::Vector3d(0.0, 0.0, 2.0);
+  ASSERT_NO_THROW(interface_->reset(restore_config));
+  p = interface_->get_transform_base_to_world().block<3, 1>(0, 3);
+  ASSERT_DOUBLE_EQ(p.z(), 2.0);
+  interface_->observe(observation);
+  ASSERT_FALSE(observation("sim").get<bool>("restored"));
+}
+
 }  // namespace upkie::cpp::actuation
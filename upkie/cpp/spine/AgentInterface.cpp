@@ -6,6 +6,13 @@
 #include <spdlog/spdlog.h>
 #include <unistd.h>
 
+#ifdef __linux__
+#include <linux/futex.h>
+#include <sys/syscall.h>
+
+#include <climits>
+#endif
+
 namespace upkie::cpp::spine {
 
 /*! Allocate file with some error handling.
@@ -55,6 +62,14 @@ AgentInterface::AgentInterface(const std::string& name, size_t size)
     }
     throw std::runtime_error("Error opening file");
   }
+  // Flag the request as initializing before sizing the file, so that agents
+  // never read a zero (no request) from a spine that is not ready yet
+  const auto initializing = static_cast<uint32_t>(Request::kInitializing);
+  if (::pwrite(file_descriptor, &initializing, sizeof(initializing), 0) !=
+      sizeof(initializing)) {
+    throw std::runtime_error("Error writing to file, errno is " +
+                             std::to_string(errno));
+  }
   allocate_file(file_descriptor, size);
 
   // Map shared memory
@@ -84,6 +99,17 @@ AgentInterface::~AgentInterface() {
 
 void AgentInterface::set_request(Request request) {
   *mmap_request_ = static_cast<uint32_t>(request);
+  if (request == Request::kNone || request == Request::kError) {
+    wake_agent();
+  }
+}
+
+void AgentInterface::wake_agent() {
+#ifdef __linux__
+  // Agents waiting in blocking mode sleep on the request field. Waking up a
+  // futex without waiters costs a system call but no context switch.
+  ::syscall(SYS_futex, mmap_request_, FUTEX_WAKE, INT_MAX, nullptr, nullptr, 0);
+#endif
 }
 
 void AgentInterface::write(char* data, size_t size) {
@@ -97,4 +123,15 @@ void AgentInterface::write(char* data, size_t size) {
   std::memcpy(mmap_data_, data, size);
 }
 
+void AgentInterface::write_at(size_t offset, const char* data, size_t size) {
+  if (capacity() < offset + size) {
+    spdlog::error(
+        "Trying to write {} bytes at offset {} of agent interface buffer of "
+        "size {} bytes",
+        size, offset, size_);
+    throw std::runtime_error("Agent interface buffer overflow");
+  }
+  std::memcpy(mmap_data_ + offset, data, size);
+}
+
 }  // namespace upkie::cpp::spine
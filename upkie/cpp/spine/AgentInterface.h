@@ -46,6 +46,9 @@ class AgentInterface {
   /*! Set current request in shared memory.
    *
    * \param[in] request New request.
+   *
+   * Agents waiting for the spine are woken up when the request is set to
+   * Request::kNone or Request::kError.
    */
   void set_request(Request request);
 
@@ -56,6 +59,20 @@ class AgentInterface {
    */
   void write(char* data, size_t size);
 
+  /*! Write data at a given offset of the data buffer in shared memory.
+   *
+   * \param[in] offset Offset from the beginning of the data buffer, in bytes.
+   * \param[in] data Data to write.
+   * \param[in] size Number of bytes to write.
+   *
+   * Contrary to \ref write, this function does not update the size of the
+   * data buffer.
+   */
+  void write_at(size_t offset, const char* data, size_t size);
+
+  //! Number of bytes available in the data buffer
+  size_t capacity() const { return size_ - 2 * sizeof(uint32_t); }
+
   //! Get current request from shared memory
   Request request() const { return static_cast<Request>(*mmap_request_); }
 
@@ -66,6 +83,13 @@ class AgentInterface {
   const char* data() const { return mmap_data_; }
 
  private:
+  /*! Wake up agents sleeping on the request field.
+   *
+   * Agents in blocking mode wait on a futex located at the request field of
+   * the shared memory. This function is a no-op on platforms without futexes.
+   */
+  void wake_agent();
+
   //! Name of the shared memory object
   std::string name_;
 
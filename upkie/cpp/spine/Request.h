@@ -23,7 +23,13 @@ enum class Request : uint32_t {
   kStop = 3,
 
   //! Flag set when the last request was invalid.
-  kError = 4
+  kError = 4,
+
+  //! Flag set to indicate a batch of actions has been supplied.
+  kActions = 5,
+
+  //! Flag set by the spine until it is ready to process requests.
+  kInitializing = 6
 };
 
 }  // namespace upkie::cpp::spine
@@ -0,0 +1,213 @@
+// SPDX-License-Identifier: Apache-2.0
+// Copyright 2024 Inria
+
+#include "upkie/cpp/spine/Schema.h"
+
+#include <Eigen/Core>
+#include <Eigen/Geometry>
+#include <algorithm>
+#include <limits>
+
+namespace upkie::cpp::spine {
+
+using palimpsest::exceptions::PalimpsestError;
+
+namespace {
+
+/*! Find a value in a dictionary from its keys.
+ *
+ * \param[in] dict Root dictionary.
+ * \param[in] keys Keys from the root dictionary to the value.
+ *
+ * \return Pointer to the value, or nullptr if a key is not found.
+ */
+const Dictionary* find(const Dictionary& dict,
+                       const std::vector<std::string>& keys) {
+  const Dictionary* node = &dict;
+  for (const auto& key : keys) {
+    if (node->is_value() || !node->has(key)) {
+      return nullptr;
+    }
+    node = &(*node)(key);
+  }
+  return node;
+}
+
+/*! Get a mutable value in a dictionary from its keys.
+ *
+ * \param[in, out] dict Root dictionary.
+ * \param[in] keys Keys from the root dictionary to the value.
+ */
+Dictionary& lookup(Dictionary& dict, const std::vector<std::string>& keys) {
+  Dictionary* node = &dict;
+  for (const auto& key : keys) {
+    node = &(*node)(key);
+  }
+  return *node;
+}
+
+/*! Check whether a dictionary value has a given type.
+ *
+ * \param[in] value Dictionary value.
+ */
+template <typename T>
+bool has_type(const Dictionary& value) {
+  try {
+    value.as<T>();
+    return true;
+  } catch (const PalimpsestError&) {
+    return false;
+  }
+}
+
+}  // namespace
+
+void Schema::reset(const Dictionary& dict) {
+  std::vector<std::string> keys;
+  fields_.clear();
+  size_ = 0;
+  add_fields(dict, keys);
+}
+
+void Schema::add_fields(const Dictionary& dict,
+                        std::vector<std::string>& keys) {
+  if (!dict.is_value()) {
+    for (const auto& key : dict.keys()) {
+      keys.push_back(key);
+      add_fields(dict(key), keys);
+      keys.pop_back();
+    }
+    return;
+  }
+
+  Field field;
+  if (has_type<bool>(dict)) {
+    field.type = Type::kBool;
+    field.size = 1;
+  } else if (has_type<double>(dict)) {
+    field.type = Type::kDouble;
+    field.size = 1;
+  } else if (has_type<int>(dict)) {
+    field.type = Type::kInt;
+    field.size = 1;
+  } else if (has_type<uint32_t>(dict)) {
+    field.type = Type::kUnsigned;
+    field.size = 1;
+  } else if (has_type<Eigen::Vector2d>(dict)) {
+    field.type = Type::kVector2d;
+    field.size = 2;
+  } else if (has_type<Eigen::Vector3d>(dict)) {
+    field.type = Type::kVector3d;
+    field.size = 3;
+  } else if (has_type<Eigen::Quaterniond>(dict)) {
+    field.type = Type::kQuaterniond;
+    field.size = 4;
+  } else if (has_type<Eigen::VectorXd>(dict)) {
+    field.type = Type::kVectorXd;
+    field.size = static_cast<size_t>(dict.as<Eigen::VectorXd>().size());
+  } else {
+    return;  // not a numeric value
+  }
+
+  for (const auto& key : keys) {
+    field.name += (field.name.empty() ? "" : ".") + key;
+  }
+  field.keys = keys;
+  field.offset = size_;
+  size_ += field.size;
+  fields_.push_back(field);
+}
+
+void Schema::describe(Dictionary& output) const {
+  for (const auto& field : fields_) {
+    output(field.name)("offset") = static_cast<uint32_t>(field.offset);
+    output(field.name)("size") = static_cast<uint32_t>(field.size);
+  }
+}
+
+void Schema::write(const Dictionary& dict, double* buffer) const {
+  for (const auto& field : fields_) {
+    double* output = buffer + field.offset;
+    const Dictionary* node = find(dict, field.keys);
+    if (node == nullptr) {
+      // The value is gone since the layout was negotiated, for instance when
+      // an observer stopped reporting it
+      std::fill(output, output + field.size,
+                std::numeric_limits<double>::quiet_NaN());
+      continue;
+    }
+    const Dictionary& value = *node;
+    switch (field.type) {
+      case Type::kBool:
+        output[0] = value.as<bool>() ? 1.0 : 0.0;
+        break;
+      case Type::kDouble:
+        output[0] = value.as<double>();
+        break;
+      case Type::kInt:
+        output[0] = static_cast<double>(value.as<int>());
+        break;
+      case Type::kUnsigned:
+        output[0] = static_cast<double>(value.as<uint32_t>());
+        break;
+      case Type::kVector2d:
+        Eigen::Map<Eigen::Vector2d>(output) = value.as<Eigen::Vector2d>();
+        break;
+      case Type::kVector3d:
+        Eigen::Map<Eigen::Vector3d>(output) = value.as<Eigen::Vector3d>();
+        break;
+      case Type::kQuaterniond: {
+        const auto& quat = value.as<Eigen::Quaterniond>();
+        output[0] = quat.w();
+        output[1] = quat.x();
+        output[2] = quat.y();
+        output[3] = quat.z();
+        break;
+      }
+      case Type::kVectorXd: {
+        const auto& vector = value.as<Eigen::VectorXd>();
+        const Eigen::Index size =
+            std::min(vector.size(), static_cast<Eigen::Index>(field.size));
+        Eigen::Map<Eigen::VectorXd>(output, size) = vector.head(size);
+        break;
+      }
+    }
+  }
+}
+
+void Schema::read(const double* buffer, Dictionary& dict) const {
+  for (const auto& field : fields_) {
+    Dictionary& value = lookup(dict, field.keys);
+    const double* input = buffer + field.offset;
+    switch (field.type) {
+      case Type::kBool:
+        value.as<bool>() = (input[0] != 0.0);
+        break;
+      case Type::kDouble:
+        value.as<double>() = input[0];
+        break;
+      case Type::kInt:
+        value.as<int>() = static_cast<int>(input[0]);
+        break;
+      case Type::kUnsigned:
+        value.as<uint32_t>() = static_cast<uint32_t>(input[0]);
+        break;
+      case Type::kVector2d:
+        value.as<Eigen::Vector2d>() = Eigen::Map<const Eigen::Vector2d>(input);
+        break;
+      case Type::kVector3d:
+        value.as<Eigen::Vector3d>() = Eigen::Map<const Eigen::Vector3d>(input);
+        break;
+      case Type::kQuaterniond:
+        value.as<Eigen::Quaterniond>() =
+            Eigen::Quaterniond(input[0], input[1], input[2], input[3]);
+        break;
+      case Type::kVectorXd:
+        value.as<Eigen::VectorXd>() = Eigen::Map<const Eigen::VectorXd>(
+            input, static_cast<Eigen::Index>(field.size));
+        break;
+    }
+  }
+}
+
+}  // namespace upkie::cpp::spine
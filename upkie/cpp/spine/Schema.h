@@ -0,0 +1,118 @@
+// SPDX-License-Identifier: Apache-2.0
+// Copyright 2024 Inria
+
+#pragma once
+
+#include <palimpsest/Dictionary.h>
+
+#include <string>
+#include <vector>
+
+namespace upkie::cpp::spine {
+
+using palimpsest::Dictionary;
+
+/*! Flat layout of the numeric values of a dictionary.
+ *
+ * A schema maps every numeric leaf of a dictionary (booleans, integers,
+ * floating-point numbers, vectors and quaternions) to a contiguous range of
+ * doubles. Once the schema is built, values can be exchanged with agents as
+ * flat arrays of doubles, rather than serializing the whole dictionary at
+ * every cycle.
+ *
+ * Fields are named by joining their keys with dots, for instance
+ * `servo.left_wheel.velocity`. Quaternions are laid out as (w, x, y, z).
+ */
+class Schema {
+ public:
+  //! Value types supported in flat layouts.
+  enum class Type {
+    kBool,
+    kDouble,
+    kInt,
+    kQuaterniond,
+    kUnsigned,
+    kVector2d,
+    kVector3d,
+    kVectorXd
+  };
+
+  //! Field of the flat layout.
+  struct Field {
+    //! Name of the field, i.e. its keys joined by dots.
+    std::string name;
+
+    //! Keys to the value in the dictionary.
+    std::vector<std::string> keys;
+
+    //! Type of the value in the dictionary.
+    Type type;
+
+    //! Offset of the first double of the field in the flat layout.
+    size_t offset;
+
+    //! Number of doubles in the field.
+    size_t size;
+  };
+
+  /*! Build the schema from the values of a dictionary.
+   *
+   * \param[in] dict Dictionary to map.
+   *
+   * Values of unsupported types, such as strings, are not part of the schema.
+   */
+  void reset(const Dictionary& dict);
+
+  /*! Describe the flat layout in a dictionary.
+   *
+   * \param[out] output Dictionary where each field name maps to a dictionary
+   *     with its "offset" and "size", both counted in doubles.
+   */
+  void describe(Dictionary& output) const;
+
+  /*! Write values from a dictionary to a flat buffer.
+   *
+   * \param[in] dict Dictionary to read values from.
+   * \param[out] buffer Buffer of at least \ref size() doubles.
+   *
+   * Fields of the schema that are not found in the dictionary are filled
+   * with NaNs.
+   *
+   * \throw palimpsest::exceptions::TypeError if a value of the dictionary
+   *     does not have the type of its field in the schema.
+   */
+  void write(const Dictionary& dict, double* buffer) const;
+
+  /*! Read values from a flat buffer to a dictionary.
+   *
+   * \param[in] buffer Buffer of at least \ref size() doubles.
+   * \param[out] dict Dictionary to write values to.
+   *
+   * \throw palimpsest::exceptions::KeyError if a key of the schema is not
+   *     found in the dictionary.
+   */
+  void read(const double* buffer, Dictionary& dict) const;
+
+  //! Fields of the flat layout.
+  const std::vector<Field>& fields() const noexcept { return fields_; }
+
+  //! Total number of doubles in the flat layout.
+  size_t size() const noexcept { return size_; }
+
+ private:
+  /*! Add fields for all numeric values of a dictionary, recursively.
+   *
+   * \param[in] dict Dictionary to map.
+   * \param[in, out] keys Keys from the root dictionary to dict.
+   */
+  void add_fields(const Dictionary& dict, std::vector<std::string>& keys);
+
+ private:
+  //! Fields of the flat layout.
+  std::vector<Field> fields_;
+
+  //! Total number of doubles in the flat layout.
+  size_t size_ = 0;
+};
+
+}  // namespace upkie::cpp::spine
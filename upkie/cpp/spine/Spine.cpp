@@ -12,7 +12,9 @@
 
 #include <mpacklog/Logger.h>
 
+#include <cstring>
 #include <limits>
+#include <stdexcept>
 
 #include "upkie/cpp/exceptions/ObserverError.h"
 #include "upkie/cpp/observers/observe_servos.h"
@@ -25,6 +27,29 @@ namespace upkie::cpp::spine {
 using palimpsest::Dictionary;
 using upkie::cpp::actuation::moteus::Output;
 
+namespace {
+
+/*! Remove keys from a dictionary.
+ *
+ * \param[in, out] dict Dictionary to remove keys from.
+ * \param[in] removed_keys Dictionary with the same structure, whose leaves
+ *     are the keys to remove.
+ */
+void remove_keys(Dictionary& dict, const Dictionary& removed_keys) {
+  for (const auto& key : removed_keys.keys()) {
+    if (!dict.has(key)) {
+      continue;
+    }
+    if (removed_keys(key).is_map() && dict(key).is_map()) {
+      remove_keys(dict(key), removed_keys(key));
+    } else {
+      dict.remove(key);
+    }
+  }
+}
+
+}  // namespace
+
 Spine::Spine(const Parameters& params, actuation::Interface& actuation,
              ObserverPipeline& observers)
     : frequency_(params.frequency),
@@ -32,6 +57,9 @@ Spine::Spine(const Parameters& params, actuation::Interface& actuation,
       agent_interface_(params.shm_name, params.shm_size),
       observer_pipeline_(observers),
       logger_(params.log_path),
+      schema_mode_(false),
+      action_offset_(0),
+      batch_failed_(false),
       caught_interrupt_(utils::handle_interrupts()),
       state_machine_(agent_interface_),
       state_cycle_beginning_(State::kOver),
@@ -51,13 +79,13 @@ Spine::Spine(const Parameters& params, actuation::Interface& actuation,
     utils::configure_scheduler(10);
   }
 
-  // Inter-process communication
-  agent_interface_.set_request(Request::kNone);
-
   // Initialize internal dictionary
   Dictionary& observation = working_dict_("observation");
   observers::observe_time(observation);
   working_dict_.insert<double>("time", observation.get<double>("time"));
+
+  // Inter-process communication: tell agents the spine is ready
+  agent_interface_.set_request(Request::kNone);
 }
 
 void Spine::reset(const Dictionary& config) {
@@ -66,7 +94,42 @@ void Spine::reset(const Dictionary& config) {
   action.clear();
   actuation_.reset_action(action);
   observer_pipeline_.reset(config);
-  spdlog::info("Spine configured with:\n\n{}\n", config);
+  schema_mode_ =
+      config.has("spine") && config("spine").get<bool>("schema", false);
+}
+
+bool Spine::update_config(const char* data, size_t size) {
+  // Log the request as is, rather than serializing the full configuration
+  Dictionary& update = working_dict_("config");
+  update.clear();
+  update.update(data, size);
+  if (!update.has("spine") || !update("spine").has("base_config_id")) {
+    config_.clear();
+    config_.update(data, size);
+    spdlog::info("Spine configured with:\n\n{}\n", config_);
+  } else if (update("spine").get<std::string>("base_config_id") == config_id_) {
+    // Only print the update, as other sections of the configuration are
+    // unchanged since the last reset
+    config_.update(data, size);
+    Dictionary& spine = config_("spine");
+    spine.remove("base_config_id");
+    if (spine.has("removed_keys")) {
+      spine.remove("removed_keys");
+      remove_keys(config_, update("spine")("removed_keys"));
+    }
+    spdlog::info("Spine configuration updated with:\n\n{}\n", update);
+  } else {
+    spdlog::warn(
+        "Configuration update applies to \"{}\" but the current "
+        "configuration is \"{}\", skipping reset",
+        update("spine").get<std::string>("base_config_id"), config_id_);
+    working_dict_.remove("config");
+    return false;
+  }
+  config_id_ = config_.has("spine")
+                   ? config_("spine").get<std::string>("config_id", "")
+                   : "";
+  return true;
 }
 
 void Spine::log_working_dict() {
@@ -112,6 +175,7 @@ void Spine::cycle() {
 }
 
 void Spine::simulate(unsigned nb_substeps) {
+  state_machine_.accept_action_batches(true);
   while (state_machine_.state() != State::kOver) {
     begin_cycle();
     if (state_machine_.state() == State::kReset) {
@@ -121,6 +185,9 @@ void Spine::simulate(unsigned nb_substeps) {
       end_cycle();
       // now the first observation is ready to be read by the agent
     } else if (state_machine_.state() == State::kStep) {
+      if (!action_batch_.empty()) {
+        simulate_action_batch(nb_substeps);
+      }
       cycle_actuation();
       end_cycle();  // important: writes observation of the first substep
       for (unsigned substep = 1; substep < nb_substeps; ++substep) {
@@ -132,6 +199,80 @@ void Spine::simulate(unsigned nb_substeps) {
   }
 }
 
+void Spine::simulate_action_batch(unsigned nb_substeps) {
+  Dictionary& action = working_dict_("action");
+  const Dictionary& observation = working_dict_("observation");
+  const uint32_t nb_actions = static_cast<uint32_t>(action_batch_.size());
+  batch_failed_ = false;
+  batch_reply_.resize(sizeof(uint32_t));
+  std::memcpy(batch_reply_.data(), &nb_actions, sizeof(uint32_t));
+  for (uint32_t k = 0; k < nb_actions; ++k) {
+    const auto& [offset, size] = action_batch_[k];
+    action.update(batch_buffer_.data() + offset, size);
+    if (k + 1 == nb_actions) {
+      break;  // the last action is simulated as a regular step
+    }
+    cycle_actuation();
+    if (!append_batch_observation(observation)) {
+      break;  // skip remaining actions, the agent should reset
+    }
+    for (unsigned substep = 1; substep < nb_substeps; ++substep) {
+      cycle_actuation();
+    }
+  }
+}
+
+bool Spine::append_batch_observation(const Dictionary& observation) {
+  const uint32_t size =
+      static_cast<uint32_t>(observation.serialize(ipc_buffer_));
+  const size_t offset = batch_reply_.size();
+  // Flat actions start at the action offset in schema mode, and
+  // AgentInterface::write needs one byte of margin otherwise
+  const size_t max_reply_size =
+      schema_mode_ ? action_offset_ : agent_interface_.capacity() - 1;
+  if (offset + sizeof(uint32_t) + size > max_reply_size) {
+    spdlog::error(
+        "Batch of {} observations does not fit in the {} bytes of the agent "
+        "interface, replying with no observation",
+        action_batch_.size(), max_reply_size);
+    const uint32_t nb_observations = 0;
+    batch_reply_.resize(sizeof(uint32_t));
+    std::memcpy(batch_reply_.data(), &nb_observations, sizeof(uint32_t));
+    batch_failed_ = true;
+    return false;
+  }
+  batch_reply_.resize(offset + sizeof(uint32_t) + size);
+  std::memcpy(batch_reply_.data() + offset, &size, sizeof(uint32_t));
+  std::memcpy(batch_reply_.data() + offset + sizeof(uint32_t),
+              ipc_buffer_.data(), size);
+  return true;
+}
+
+bool Spine::read_action_batch(const char* data, size_t size) {
+  action_batch_.clear();
+  batch_buffer_.assign(data, data + size);
+  uint32_t nb_actions = 0;
+  if (size < sizeof(uint32_t)) {
+    return false;
+  }
+  std::memcpy(&nb_actions, data, sizeof(uint32_t));
+  size_t offset = sizeof(uint32_t);
+  for (uint32_t k = 0; k < nb_actions; ++k) {
+    uint32_t action_size = 0;
+    if (size < offset + sizeof(uint32_t)) {
+      return false;
+    }
+    std::memcpy(&action_size, data + offset, sizeof(uint32_t));
+    offset += sizeof(uint32_t);
+    if (size < offset + action_size) {
+      return false;
+    }
+    action_batch_.emplace_back(offset, action_size);
+    offset += action_size;
+  }
+  return nb_actions > 0;
+}
+
 void Spine::begin_cycle() {
   if (caught_interrupt_) {
     state_machine_.process_event(Event::kInterrupt);
@@ -143,21 +284,38 @@ void Spine::begin_cycle() {
   try {
     // Read input dictionary if applicable
     if (state_machine_.state() == State::kReset) {
-      Dictionary& config = working_dict_("config");
       const char* data = agent_interface_.data();
       size_t size = agent_interface_.size();
-      config.clear();
-      config.update(data, size);
-      reset(config);
+      if (update_config(data, size)) {
+        reset(config_);
+      }
     } else if (state_machine_.state() == State::kStep) {
       Dictionary& action = working_dict_("action");
       const char* data = agent_interface_.data();
-      size_t size = agent_interface_.size();
-      action.update(data, size);
+      if (agent_interface_.request() == Request::kActions) {
+        if (!read_action_batch(data, agent_interface_.size())) {
+          spdlog::error("Invalid batch of actions");
+          action_batch_.clear();
+          state_machine_.process_event(Event::kInterrupt);
+        }
+      } else if (schema_mode_) {
+        const auto* flat_action =
+            reinterpret_cast<const double*>(data + action_offset_);
+        action_schema_.read(flat_action, action);
+      } else {
+        size_t size = agent_interface_.size();
+        action.update(data, size);
+      }
     }
   } catch (const palimpsest::exceptions::PalimpsestError& exn) {
     spdlog::error("Deserialization error: {}", exn.what());
     state_machine_.process_event(Event::kInterrupt);
+  } catch (const std::runtime_error& exn) {
+    // Shut down cleanly rather than let the exception kill the spine, and
+    // report the failed request to the agent
+    spdlog::error("Could not process request: {}", exn.what());
+    state_machine_.process_event(Event::kInterrupt);
+    agent_interface_.set_request(Request::kError);
   }
 }
 
@@ -167,14 +325,82 @@ void Spine::end_cycle() {
   working_dict_("time") = observation.get<double>("time");
   if (state_machine_.state() == State::kReset ||
       state_machine_.state() == State::kStep) {
-    size_t size = observation.serialize(ipc_buffer_);
-    agent_interface_.write(ipc_buffer_.data(), size);
+    try {
+      write_observation();
+    } catch (const palimpsest::exceptions::PalimpsestError& exn) {
+      spdlog::error("Serialization error: {}", exn.what());
+      state_machine_.process_event(Event::kInterrupt);
+      agent_interface_.set_request(Request::kError);
+    } catch (const std::runtime_error& exn) {
+      spdlog::error("Could not write observation: {}", exn.what());
+      state_machine_.process_event(Event::kInterrupt);
+      agent_interface_.set_request(Request::kError);
+    }
   }
 
   state_machine_.process_event(Event::kCycleEnd);
   state_cycle_end_ = state_machine_.state();
 }
 
+void Spine::write_observation() {
+  Dictionary& observation = working_dict_("observation");
+  if (!action_batch_.empty()) {
+    if (!batch_failed_) {
+      append_batch_observation(observation);
+    }
+    agent_interface_.write(batch_reply_.data(), batch_reply_.size());
+    action_batch_.clear();
+    return;
+  }
+
+  if (state_machine_.state() == State::kReset && !config_id_.empty()) {
+    // Tell the agent which configuration the spine is running with
+    observation.insert<std::string>("config_id", config_id_);
+  }
+
+  if (!schema_mode_) {
+    size_t size = observation.serialize(ipc_buffer_);
+    agent_interface_.write(ipc_buffer_.data(), size);
+    if (observation.has("config_id")) {
+      observation.remove("config_id");
+    }
+    return;
+  }
+
+  if (state_machine_.state() == State::kStep) {
+    observation_schema_.write(observation, schema_buffer_.data());
+    agent_interface_.write(reinterpret_cast<char*>(schema_buffer_.data()),
+                           observation_schema_.size() * sizeof(double));
+    return;
+  }
+
+  // Negotiate flat layouts when replying to a start request. Flat actions are
+  // written in the second half of the buffer, so that they don't overlap with
+  // observations and persist between steps.
+  const Dictionary& action = working_dict_("action");
+  observation_schema_.reset(observation);
+  action_schema_.reset(action);
+  action_offset_ = (agent_interface_.capacity() / 2) & ~(sizeof(double) - 1);
+  schema_buffer_.resize(
+      std::max(observation_schema_.size(), action_schema_.size()));
+
+  action_schema_.write(action, schema_buffer_.data());
+  agent_interface_.write_at(action_offset_,
+                            reinterpret_cast<char*>(schema_buffer_.data()),
+                            action_schema_.size() * sizeof(double));
+
+  Dictionary& schema = observation("schema");
+  schema("action_offset") = static_cast<uint32_t>(action_offset_);
+  observation_schema_.describe(schema("observation"));
+  action_schema_.describe(schema("action"));
+  size_t size = observation.serialize(ipc_buffer_);
+  agent_interface_.write(ipc_buffer_.data(), size);
+  observation.remove("schema");
+  if (observation.has("config_id")) {
+    observation.remove("config_id");
+  }
+}
+
 void Spine::cycle_actuation() {
   try {
     // 1. Observation
@@ -10,11 +10,13 @@
 #include <map>
 #include <memory>
 #include <string>
+#include <utility>
 #include <vector>
 
 #include "upkie/cpp/actuation/Interface.h"
 #include "upkie/cpp/observers/ObserverPipeline.h"
 #include "upkie/cpp/spine/AgentInterface.h"
+#include "upkie/cpp/spine/Schema.h"
 #include "upkie/cpp/spine/StateMachine.h"
 #include "upkie/cpp/utils/SynchronousClock.h"
 
@@ -78,6 +80,18 @@ class Spine {
    *
    * \param[in] config New configuration dictionary forwarded to spine modules
    *     (actuation interface, observers).
+   *
+   * If the configuration sets `spine.schema` to true, the spine switches to
+   * schema mode until the next reset. In schema mode, the first observation
+   * (in reply to the start request) includes a "schema" key describing flat
+   * layouts of the observation and action dictionaries. Subsequent
+   * observations and actions are then exchanged as flat arrays of doubles
+   * following these layouts, rather than serialized dictionaries.
+   *
+   * If the configuration sets `spine.config_id`, the first observation
+   * includes a "config_id" key with its value. Agents can then send only the
+   * configuration values that changed at their next start request, along
+   * with `spine.base_config_id` set to this identifier.
    */
   void reset(const palimpsest::Dictionary& config);
 
@@ -106,6 +120,11 @@ class Spine {
    *
    * \note As its name suggests, do not use this function on a real robot.
    *
+   * Agents can also send a batch of K actions in a single request, which the
+   * spine then simulates back-to-back as K steps. Its reply is the batch of
+   * the K resulting observations, or an empty batch if they don't fit in the
+   * agent interface. The spine then skips the remaining actions.
+   *
    * Note that there is currently a delay of three substeps between observation
    * and simulation. That is, the internal simulation state is always three
    * substeps ahead compared to the values written to the observation
@@ -129,12 +148,71 @@ class Spine {
   //! Begin cycle: check interrupts and read agent inputs
   void begin_cycle();
 
-  //! End cycle: write agent outputs, apply state machine transition
+  /*! End cycle: write agent outputs, apply state machine transition.
+   *
+   * Errors while writing the observation are reported to the agent, and
+   * the spine then shuts down as it does upon errors reading agent inputs.
+   */
   void end_cycle();
 
   //! Log internal dictionary
   void log_working_dict();
 
+  /*! Write observation to the agent interface.
+   *
+   * \throw palimpsest::exceptions::PalimpsestError If the observation could
+   *     not be serialized.
+   * \throw std::runtime_error If the observation does not fit in the agent
+   *     interface buffer.
+   */
+  void write_observation();
+
+  /*! Parse a batch of actions from a request.
+   *
+   * \param[in] data Buffer with the number of actions, followed by the size
+   *     and serialized dictionary of each action. Sizes and counts are
+   *     unsigned 32-bit integers in host byte order.
+   * \param[in] size Size of the buffer in bytes.
+   * \return True if the batch is valid and not empty, false otherwise.
+   */
+  bool read_action_batch(const char* data, size_t size);
+
+  /*! Simulate all but the last action of a batch.
+   *
+   * \param[in] nb_substeps Number of actuation cycles per action.
+   *
+   * The last action of the batch is applied to the working dictionary, and
+   * simulated afterwards as a regular step.
+   */
+  void simulate_action_batch(unsigned nb_substeps);
+
+  /*! Append an observation to the reply to a batch of actions.
+   *
+   * \param[in] observation Observation dictionary.
+   * \return True if the observation was appended, false if the reply would
+   *     not fit in the agent interface. The reply then becomes an empty batch
+   *     of observations, which tells the agent that the batch failed.
+   */
+  bool append_batch_observation(const palimpsest::Dictionary& observation);
+
+  /*! Update the spine configuration from a start request.
+   *
+   * \param[in] data Buffer of serialized configuration dictionary.
+   * \param[in] size Size of the buffer in bytes.
+   * \return True if the configuration was updated, false if the request was
+   *     an update to a configuration the spine does not have.
+   *
+   * Requests that set `spine.base_config_id` are merged into the current
+   * configuration, provided the latter has the same identifier. Keys listed
+   * in their `spine.removed_keys` dictionary, whose leaves are the keys to
+   * remove, are then removed from the configuration. Other requests replace
+   * the configuration altogether.
+   *
+   * The request itself, that is, the full configuration or the update, is
+   * logged in the "config" entry of the working dictionary.
+   */
+  bool update_config(const char* data, size_t size);
+
  protected:
   //! Frequency of the spine loop in [Hz].
   const unsigned frequency_;
@@ -167,6 +245,39 @@ class Spine {
   //! Buffer used to serialize/deserialize dictionaries in IPC.
   std::vector<char> ipc_buffer_;
 
+  //! Configuration of the last reset, kept for incremental updates.
+  palimpsest::Dictionary config_;
+
+  //! Identifier of the configuration set by the agent, if any.
+  std::string config_id_;
+
+  //! Whether observations and actions are exchanged in flat layouts.
+  bool schema_mode_;
+
+  //! Flat layout of the action dictionary in schema mode.
+  Schema action_schema_;
+
+  //! Flat layout of the observation dictionary in schema mode.
+  Schema observation_schema_;
+
+  //! Offset in bytes of flat actions in the agent interface buffer.
+  size_t action_offset_;
+
+  //! Buffer used to write flat observations in schema mode.
+  std::vector<double> schema_buffer_;
+
+  //! Copy of the request buffer of the current batch of actions.
+  std::vector<char> batch_buffer_;
+
+  //! Offset and size in \ref batch_buffer_ of each action of the batch.
+  std::vector<std::pair<size_t, size_t>> action_batch_;
+
+  //! Reply to the current batch of actions.
+  std::vector<char> batch_reply_;
+
+  //! Whether the reply to the current batch of actions did not fit.
+  bool batch_failed_;
+
   //! Boolean flag that becomes true when an interruption is caught.
   const bool& caught_interrupt_;
 
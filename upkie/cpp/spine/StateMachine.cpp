@@ -44,6 +44,14 @@ void StateMachine::process_cycle_beginning() {
         case Request::kAction:
           enter_state(State::kStep);
           break;
+        case Request::kActions:
+          if (accept_action_batches_) {
+            enter_state(State::kStep);
+          } else {
+            spdlog::warn("Action batches are only supported in simulation");
+            interface_.set_request(Request::kError);
+          }
+          break;
         case Request::kStart:
           spdlog::warn(
               "Request::kStart is invalid from State::kIdle! Stop the spine "
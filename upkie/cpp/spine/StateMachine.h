@@ -94,6 +94,15 @@ class StateMachine {
   //! Get current state.
   const State& state() const noexcept { return state_; }
 
+  /*! Accept or reject batches of actions.
+   *
+   * \param[in] accept Whether Request::kActions transitions to State::kStep
+   *     like Request::kAction. Otherwise, it is answered by Request::kError.
+   */
+  void accept_action_batches(bool accept) noexcept {
+    accept_action_batches_ = accept;
+  }
+
   //! Whether we transition to the terminal state at the next end-cycle event.
   bool is_over_after_this_cycle() const noexcept {
     return (state_ == State::kShutdown && stop_cycles_ + 1u == kNbStopCycles);
@@ -121,6 +130,9 @@ class StateMachine {
 
   //! Cycle counter for startup and shutdown phases
   unsigned stop_cycles_;
+
+  //! Whether Request::kActions is a valid request
+  bool accept_action_batches_ = false;
 };
 
 }  // namespace upkie::cpp::spine
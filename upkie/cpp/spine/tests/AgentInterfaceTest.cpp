@@ -29,6 +29,10 @@ class AgentInterfaceTest : public ::testing::Test {
   std::unique_ptr<AgentInterface> agent_interface_;
 };
 
+TEST_F(AgentInterfaceTest, InitializingUntilRequestIsSet) {
+  ASSERT_EQ(agent_interface_->request(), Request::kInitializing);
+}
+
 TEST_F(AgentInterfaceTest, GetSetRequest) {
   agent_interface_->set_request(Request::kStart);
   ASSERT_EQ(agent_interface_->request(), Request::kStart);
@@ -0,0 +1,88 @@
+// SPDX-License-Identifier: Apache-2.0
+// Copyright 2024 Inria
+
+#include <palimpsest/Dictionary.h>
+
+#include <cmath>
+#include <string>
+#include <vector>
+
+#include "gtest/gtest.h"
+#include "upkie/cpp/spine/Schema.h"
+
+using palimpsest::Dictionary;
+
+namespace upkie::cpp::spine {
+
+class SchemaTest : public ::testing::Test {
+ protected:
+  void SetUp() override {
+    dict_("servo")("left_wheel")("position") = 1.0;
+    dict_("servo")("left_wheel")("velocity") = 2.0;
+    dict_("contact") = true;
+    dict_("name") = std::string("upkie");
+    dict_.insert<Eigen::Vector3d>("linear_velocity", 3.0, 4.0, 5.0);
+    dict_.insert<Eigen::Quaterniond>("orientation", 1.0, 0.0, 0.0, 0.0);
+    schema_.reset(dict_);
+  }
+
+  Dictionary dict_;
+  Schema schema_;
+};
+
+TEST_F(SchemaTest, NumericValuesOnly) {
+  // bool (1) + quaternion (4) + vector (3) + two doubles (2), no string
+  ASSERT_EQ(schema_.fields().size(), 5);
+  ASSERT_EQ(schema_.size(), 10);
+  for (const auto& field : schema_.fields()) {
+    ASSERT_NE(field.name, "name");
+  }
+}
+
+TEST_F(SchemaTest, FieldNames) {
+  bool found = false;
+  for (const auto& field : schema_.fields()) {
+    if (field.name == "servo.left_wheel.velocity") {
+      found = true;
+      ASSERT_EQ(field.size, 1);
+    }
+  }
+  ASSERT_TRUE(found);
+}
+
+TEST_F(SchemaTest, WriteReadRoundTrip) {
+  std::vector<double> buffer(schema_.size(), 0.0);
+  schema_.write(dict_, buffer.data());
+  for (auto& value : buffer) {
+    value *= 2.0;
+  }
+  schema_.read(buffer.data(), dict_);
+  ASSERT_DOUBLE_EQ(dict_("servo")("left_wheel")("position"), 2.0);
+  ASSERT_DOUBLE_EQ(dict_("servo")("left_wheel")("velocity"), 4.0);
+  ASSERT_TRUE(dict_.get<bool>("contact"));
+  ASSERT_DOUBLE_EQ(dict_.get<Eigen::Vector3d>("linear_velocity").z(), 10.0);
+  ASSERT_DOUBLE_EQ(dict_.get<Eigen::Quaterniond>("orientation").w(), 2.0);
+  ASSERT_EQ(dict_.get<std::string>("name"), "upkie");
+}
+
+TEST_F(SchemaTest, WriteMissingField) {
+  dict_("servo")("left_wheel").remove("velocity");
+  std::vector<double> buffer(schema_.size(), 0.0);
+  ASSERT_NO_THROW(schema_.write(dict_, buffer.data()));
+  for (const auto& field : schema_.fields()) {
+    if (field.name == "servo.left_wheel.velocity") {
+      ASSERT_TRUE(std::isnan(buffer[field.offset]));
+    } else if (field.name == "servo.left_wheel.position") {
+      ASSERT_DOUBLE_EQ(buffer[field.offset], 1.0);
+    }
+  }
+}
+
+TEST_F(SchemaTest, Describe) {
+  Dictionary description;
+  schema_.describe(description);
+  ASSERT_TRUE(description.has("servo.left_wheel.position"));
+  ASSERT_EQ(description("linear_velocity").get<uint32_t>("size"), 3u);
+}
+
+}  // namespace upkie::cpp::spine
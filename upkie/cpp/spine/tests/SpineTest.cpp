@@ -45,6 +45,9 @@ class TestSpine : public upkie::cpp::spine::Spine {
   //! Expose internal working dictionary to tests
   const palimpsest::Dictionary& working_dict() { return working_dict_; }
 
+  //! Expose current configuration to tests
+  const palimpsest::Dictionary& config() { return config_; }
+
   //! Get current (state of the) state machine.
   const State& state() { return state_machine_.state(); }
 
@@ -282,6 +285,94 @@ TEST_F(SpineTest, SpineReadsAction) {
   ASSERT_DOUBLE_EQ(action("servo")("left_hip")("position"), 1.0);
 }
 
+TEST_F(SpineTest, MergeConfigurationUpdate) {
+  Dictionary config;
+  config("spine").insert<std::string>("config_id", "first");
+  config("foo") = 1.0;
+  config("bar") = 2.0;
+  write_mmap_dict(config);
+  start_spine();
+
+  Dictionary update;
+  update("spine").insert<std::string>("base_config_id", "first");
+  update("spine").insert<std::string>("config_id", "second");
+  update("bar") = 3.0;
+  write_mmap_dict(update);
+  write_mmap_request(Request::kStop);
+  spine_->cycle();
+  write_mmap_request(Request::kStart);
+  for (unsigned cycle = 0; cycle < kNbStopCycles; ++cycle) {
+    spine_->cycle();
+  }
+  ASSERT_EQ(spine_->state(), State::kIdle);
+
+  const Dictionary& merged = spine_->config();
+  ASSERT_DOUBLE_EQ(merged("foo"), 1.0);
+  ASSERT_DOUBLE_EQ(merged("bar"), 3.0);
+  ASSERT_EQ(merged("spine").get<std::string>("config_id"), "second");
+  ASSERT_FALSE(merged("spine").has("base_config_id"));
+
+  // Only the update is logged
+  const Dictionary& logged = spine_->working_dict()("config");
+  ASSERT_FALSE(logged.has("foo"));
+  ASSERT_DOUBLE_EQ(logged("bar"), 3.0);
+}
+
+TEST_F(SpineTest, RemoveKeysFromConfigurationUpdate) {
+  Dictionary config;
+  config("spine").insert<std::string>("config_id", "first");
+  config("foo")("bar") = 1.0;
+  config("foo")("baz") = 2.0;
+  config("qux") = 3.0;
+  write_mmap_dict(config);
+  start_spine();
+
+  Dictionary update;
+  update("spine").insert<std::string>("base_config_id", "first");
+  update("spine").insert<std::string>("config_id", "second");
+  update("spine")("removed_keys")("foo")("bar") = true;
+  update("spine")("removed_keys")("qux") = true;
+  write_mmap_dict(update);
+  write_mmap_request(Request::kStop);
+  spine_->cycle();
+  write_mmap_request(Request::kStart);
+  for (unsigned cycle = 0; cycle < kNbStopCycles; ++cycle) {
+    spine_->cycle();
+  }
+  ASSERT_EQ(spine_->state(), State::kIdle);
+
+  const Dictionary& merged = spine_->config();
+  ASSERT_FALSE(merged("foo").has("bar"));
+  ASSERT_DOUBLE_EQ(merged("foo")("baz"), 2.0);
+  ASSERT_FALSE(merged.has("qux"));
+  ASSERT_FALSE(merged("spine").has("removed_keys"));
+}
+
+TEST_F(SpineTest, SkipMismatchedConfigurationUpdate) {
+  Dictionary config;
+  config("spine").insert<std::string>("config_id", "first");
+  config("foo") = 1.0;
+  write_mmap_dict(config);
+  start_spine();
+
+  Dictionary update;
+  update("spine").insert<std::string>("base_config_id", "other");
+  update("spine").insert<std::string>("config_id", "second");
+  update("foo") = 3.0;
+  write_mmap_dict(update);
+  write_mmap_request(Request::kStop);
+  spine_->cycle();
+  write_mmap_request(Request::kStart);
+  for (unsigned cycle = 0; cycle < kNbStopCycles; ++cycle) {
+    spine_->cycle();
+  }
+  ASSERT_EQ(spine_->state(), State::kIdle);
+
+  const Dictionary& current = spine_->config();
+  ASSERT_DOUBLE_EQ(current("foo"), 1.0);
+  ASSERT_EQ(current("spine").get<std::string>("config_id"), "first");
+}
+
 TEST_F(SpineTest, EnteringStopClearsRequest) {
   start_spine();
   ASSERT_EQ(spine_->state(), State::kIdle);
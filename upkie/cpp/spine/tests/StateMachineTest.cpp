@@ -32,6 +32,16 @@ class StateMachineTest : public ::testing::Test {
     agent_interface_->set_request(request);
   }
 
+  //! Do the transition sequence from stop to idle
+  void start() {
+    set_request(Request::kStart);
+    for (unsigned cycle = 0; cycle <= kNbStopCycles; ++cycle) {
+      state_machine_->process_event(Event::kCycleBeginning);
+      state_machine_->process_event(Event::kCycleEnd);
+    }
+    ASSERT_EQ(state(), State::kIdle);
+  }
+
   //! Test actuator interface
   std::unique_ptr<AgentInterface> agent_interface_;
 
@@ -96,4 +106,23 @@ TEST_F(StateMachineTest, ActingWhenSendingStopsFails) {
   ASSERT_EQ(request(), Request::kError);
 }
 
+TEST_F(StateMachineTest, ActionBatchesRejectedByDefault) {
+  start();
+  set_request(Request::kActions);
+  state_machine_->process_event(Event::kCycleBeginning);
+  ASSERT_EQ(state(), State::kIdle);
+  ASSERT_EQ(request(), Request::kError);
+}
+
+TEST_F(StateMachineTest, ActionBatchesAccepted) {
+  start();
+  state_machine_->accept_action_batches(true);
+  set_request(Request::kActions);
+  state_machine_->process_event(Event::kCycleBeginning);
+  ASSERT_EQ(state(), State::kStep);
+  state_machine_->process_event(Event::kCycleEnd);
+  ASSERT_EQ(state(), State::kIdle);
+  ASSERT_EQ(request(), Request::kNone);
+}
+
 }  // namespace upkie::cpp::spine
@@ -13,10 +13,15 @@ import gymnasium as gym
 
 from .upkie_base_env import UpkieBaseEnv
 from .upkie_ground_velocity import UpkieGroundVelocity
+from .upkie_replay import UpkieReplay
 from .upkie_servo_positions import UpkieServoPositions
 from .upkie_servo_torques import UpkieServoTorques
 from .upkie_servos import UpkieServos
+from .upkie_vector_env import UpkieVectorEnv
 from .wheeled_inverted_pendulum import WheeledInvertedPendulum
+from .wheeled_inverted_pendulum_vector_env import (
+    WheeledInvertedPendulumVectorEnv,
+)
 
 
 def register() -> None:
@@ -40,9 +45,12 @@ def register() -> None:
 __all__ = [
     "UpkieBaseEnv",
     "UpkieGroundVelocity",
+    "UpkieReplay",
     "UpkieServoPositions",
     "UpkieServoTorques",
     "UpkieServos",
+    "UpkieVectorEnv",
     "WheeledInvertedPendulum",
+    "WheeledInvertedPendulumVectorEnv",
     "register",
 ]
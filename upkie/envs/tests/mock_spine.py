@@ -30,17 +30,27 @@ class MockSpine:
                 for side in ("left", "right")
                 for joint in ("hip", "knee", "wheel")
             },
+            "sim": {"restored": False},
+            "time": 0.0,
             "wheel_odometry": {
                 "position": 0.0,
                 "velocity": 0.0,
             },
         }
+        self.snapshots = set()
 
     def _next_observation(self) -> dict:
         self.observation["number"] += 1
+        self.observation["time"] += 0.01
         return self.observation
 
     def start(self, config: dict) -> dict:
+        self.config = config
+        bullet_config = config.get("bullet", {})
+        restored = bullet_config.get("restore") in self.snapshots
+        self.observation["sim"]["restored"] = restored
+        if "snapshot" in bullet_config:
+            self.snapshots.add(bullet_config["snapshot"])
         return self._next_observation()
 
     def stop(self) -> None:
@@ -49,3 +59,9 @@ class MockSpine:
     def set_action(self, action) -> dict:
         self.action = action
         return self._next_observation()
+
+    def set_action_async(self, action) -> None:
+        self.action = action
+
+    def get_observation(self) -> dict:
+        return self._next_observation()
@@ -6,6 +6,8 @@
 
 """Test UpkieBaseEnv."""
 
+import asyncio
+import time
 import unittest
 from multiprocessing.shared_memory import SharedMemory
 
@@ -14,6 +16,9 @@ from gymnasium import spaces
 
 from upkie.envs import UpkieBaseEnv
 from upkie.envs.tests.mock_spine import MockSpine
+from upkie.exceptions import UpkieException
+from upkie.spine import ObservationView
+from upkie.spine.spine_interface import flat_layout_dtype
 
 
 class UpkieTestEnv(UpkieBaseEnv):
@@ -70,6 +75,18 @@ class TestUpkieBaseEnv(unittest.TestCase):
         self.assertEqual(env._spine_config["some_value"], 12)
         self.assertEqual(env._spine_config["bullet"]["gui"], False)
 
+    def test_delta_config(self):
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        env = UpkieTestEnv(shm_name=shared_memory._name, delta_config=True)
+        shared_memory.close()
+        self.assertTrue(env._spine._delta_config)
+
+    def test_delta_actions(self):
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        env = UpkieTestEnv(shm_name=shared_memory._name, delta_actions=True)
+        shared_memory.close()
+        self.assertTrue(env._spine._delta_actions)
+
     def test_check_env(self):
         try:
             from stable_baselines3.common.env_checker import check_env
@@ -86,6 +103,127 @@ class TestUpkieBaseEnv(unittest.TestCase):
         }
         self.assertTrue(self.env.detect_fall(spine_observation))
 
+    def test_real_time_factor(self):
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        with self.assertRaises(UpkieException):
+            UpkieTestEnv(shm_name=shared_memory._name, real_time_factor=0.0)
+        env = UpkieTestEnv(
+            frequency=None,
+            shm_name=shared_memory._name,
+            real_time_factor=10.0,
+        )
+        shared_memory.close()
+        env._spine = MockSpine()
+        env.reset()
+        start = time.perf_counter()
+        for _ in range(5):  # mock spine time advances by 10 ms per step
+            env.step(None)
+        duration = time.perf_counter() - start
+        self.assertGreaterEqual(duration, 0.004)  # 50 ms at 10x
+        self.assertLess(duration, 0.05)
+        self.assertIn("rate", env._spine.action["log"])
+
+    def test_real_time_factor_warns_once(self):
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        env = UpkieTestEnv(
+            frequency=None,
+            shm_name=shared_memory._name,
+            real_time_factor=10.0,
+        )
+        shared_memory.close()
+        env._spine = MockSpine()  # no simulated time
+        with self.assertLogs(level="WARNING") as logs:
+            env.reset()
+            env.reset()
+        warnings = [line for line in logs.output if "sim.time" in line]
+        self.assertEqual(len(warnings), 1)
+
+    def test_real_time_factor_simulated_time(self):
+        class SimulatedMockSpine(MockSpine):
+            def _next_observation(self) -> dict:
+                observation = super()._next_observation()
+                observation["sim"]["time"] = 0.01 * observation["number"]
+                observation["time"] = time.time()  # wall-clock, as the spine
+                return observation
+
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        env = UpkieTestEnv(
+            frequency=None,
+            shm_name=shared_memory._name,
+            real_time_factor=10.0,
+        )
+        shared_memory.close()
+        env._spine = SimulatedMockSpine()
+        env.reset()
+        start = time.perf_counter()
+        for _ in range(5):  # simulated time advances by 10 ms per step
+            env.step(None)
+        duration = time.perf_counter() - start
+        self.assertGreaterEqual(duration, 0.004)  # 50 ms at 10x
+        self.assertLess(duration, 0.05)
+
+    def test_reset_snapshot_options(self):
+        self.env.reset(options={"snapshot": "initial"})
+        bullet_config = self.env._spine.config["bullet"]
+        self.assertEqual(bullet_config["snapshot"], "initial")
+        self.assertNotIn("restore", bullet_config)
+        self.env.reset(options={"restore": "initial"})
+        bullet_config = self.env._spine.config["bullet"]
+        self.assertEqual(bullet_config["restore"], "initial")
+        self.assertNotIn("snapshot", bullet_config)
+        self.env.reset()
+        bullet_config = self.env._spine.config["bullet"]
+        self.assertNotIn("restore", bullet_config)
+        self.assertNotIn("snapshot", bullet_config)
+
+    def test_restore_unknown_snapshot(self):
+        with self.assertRaises(UpkieException):
+            self.env.reset(options={"restore": "unknown"})
+
+    def test_snapshot_action(self):
+        self.env.reset()
+        self.env.snapshot("branch")
+        self.env.bullet_extra({"external_forces": {}})
+        self.env.step(None)
+        bullet_action = self.env._spine.action["bullet"]
+        self.assertEqual(bullet_action["snapshot"], "branch")
+        self.assertIn("external_forces", bullet_action)
+        self.env.step(None)
+        self.assertNotIn("bullet", self.env._spine.action)
+
+    def test_bullet_extras_merge(self):
+        self.env.reset()
+        torso_force = {"torso": {"force": np.array([1.0, 0.0, 0.0])}}
+        self.env.bullet_extra({"external_forces": torso_force})
+        self.env.bullet_extra(
+            {"external_forces": {"left_wheel_tire": {"force": np.zeros(3)}}}
+        )
+        self.env.step(None)
+        external_forces = self.env._spine.action["bullet"]["external_forces"]
+        self.assertEqual(
+            sorted(external_forces.keys()), ["left_wheel_tire", "torso"]
+        )
+        self.assertEqual(list(torso_force.keys()), ["torso"])
+
+    def test_schema_extras(self):
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        env = UpkieTestEnv(
+            frequency=100.0,
+            schema=True,
+            shm_name=shared_memory._name,
+        )
+        shared_memory.close()
+        env._spine = MockSpine()
+        env.reset()
+        with self.assertRaises(UpkieException):
+            env.bullet_extra({"external_forces": {}})
+        with self.assertRaises(UpkieException):
+            env.snapshot("branch")
+        env.log("foo", {"bar": 1.0})
+        env.step(None)
+        self.assertNotIn("log", env._spine.action)
+        self.assertNotIn("bullet", env._spine.action)
+
     def test_step(self):
         self.env.reset()
         observation, reward, terminated, truncated, info = self.env.step(None)
@@ -96,6 +234,66 @@ class TestUpkieBaseEnv(unittest.TestCase):
         self.assertIsInstance(info, dict)
         self.assertAlmostEqual(reward, 1.0)
 
+    def test_skip_spine_observation_info(self):
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        env = UpkieTestEnv(
+            frequency=100.0,
+            regulate_frequency=False,
+            shm_name=shared_memory._name,
+            spine_observation_info=False,
+        )
+        shared_memory.close()
+        env._spine = MockSpine()
+        _, info = env.reset()
+        self.assertIn("spine_observation", info)
+        _, _, _, _, info = env.step(None)
+        self.assertNotIn("spine_observation", info)
+
+    def test_step_observation_view(self):
+        dtype = flat_layout_dtype(
+            {
+                "base_orientation.pitch": {"offset": 0, "size": 1},
+                "number": {"offset": 1, "size": 1},
+            }
+        )
+        observation_view = np.zeros((), dtype=dtype)
+        observation_view["base_orientation.pitch"] = 2.0
+        self.env._spine.get_observation = lambda: observation_view
+        self.env.reset()
+        self.env.begin_step(None)
+        _, _, terminated, _, info = self.env.end_step()
+        self.assertTrue(terminated)
+        spine_observation = info["spine_observation"]
+        self.assertIsInstance(spine_observation, ObservationView)
+        self.assertAlmostEqual(
+            spine_observation["base_orientation"]["pitch"], 2.0
+        )
+        self.env.begin_step(None)
+        _, _, _, _, next_info = self.env.end_step()
+        self.assertIs(next_info["spine_observation"], spine_observation)
+
+    def test_async_step(self):
+        async def run():
+            with self.assertRaises(UpkieException):
+                await self.env.async_step(None)
+            _, info = await self.env.async_reset()
+            number = info["spine_observation"]["number"]
+            (
+                observation,
+                reward,
+                terminated,
+                truncated,
+                info,
+            ) = await self.env.async_step(np.zeros(1))
+            self.assertEqual(observation.shape, (1,))
+            self.assertAlmostEqual(reward, 1.0)
+            self.assertFalse(terminated)
+            self.assertGreater(info["spine_observation"]["number"], number)
+            self.assertEqual(self.env._spine.action["test"][0], 0.0)
+
+        asyncio.run(run())
+        self.env.close()
+
 
 if __name__ == "__main__":
     unittest.main()
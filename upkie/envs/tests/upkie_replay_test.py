@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test UpkieReplay."""
+
+import copy
+import os
+import tempfile
+import unittest
+
+import msgpack
+import numpy as np
+
+from upkie.envs import UpkieReplay, UpkieServos
+from upkie.envs.tests.mock_spine import MockSpine
+from upkie.exceptions import UpkieException
+
+
+class TestUpkieReplay(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.directory.name, "spine.mpack")
+        observation = MockSpine().observation
+        entries = []
+        # States at the beginning of each cycle: reset, then the agent sends
+        # an action every other cycle (idle = 2, step = 3)
+        states = [1, 2, 3, 2, 3, 2]
+        for episode in range(2):
+            for cycle in range(6):
+                observation["wheel_odometry"]["position"] = (
+                    10 * episode + cycle
+                )
+                entry = {
+                    "action": {"servo": {}},
+                    "observation": copy.deepcopy(observation),
+                    "spine": {
+                        "rx_count": 6,  # servo replies per CAN cycle
+                        "state_cycle_beginning": states[cycle],
+                        "state_cycle_end": 2,
+                    },
+                    "time": 0.001 * cycle,
+                }
+                if cycle == 0:
+                    entry["config"] = {"spine": {}}
+                entries.append(entry)
+        with open(self.log_path, "wb") as log_file:
+            for entry in entries:
+                log_file.write(msgpack.packb(entry))
+        self.env = UpkieReplay(self.log_path)
+
+    def tearDown(self):
+        self.env.close()
+        self.directory.cleanup()
+
+    def test_replay(self):
+        observation, info = self.env.reset()
+        self.assertAlmostEqual(observation[1], 0.0)
+        self.assertIn("spine_action", info)
+        action = np.zeros(self.env.action_space.shape)
+        positions = []
+        truncated = False
+        while not truncated:
+            observation, _, _, truncated, _ = self.env.step(action)
+            positions.append(observation[1])
+        self.assertEqual(positions, [2.0, 4.0])
+
+        observation, _ = self.env.reset()
+        self.assertAlmostEqual(observation[1], 10.0)
+
+    def test_reset_skips_rest_of_episode(self):
+        self.env.reset()
+        observation, _ = self.env.reset()
+        self.assertAlmostEqual(observation[1], 10.0)
+        observation, _ = self.env.reset()
+        self.assertAlmostEqual(observation[1], 0.0)  # back to the beginning
+
+    def test_every_cycle(self):
+        env = UpkieReplay(self.log_path, agent_cycles_only=False)
+        env.reset()
+        action = np.zeros(env.action_space.shape)
+        for _ in range(5):
+            _, _, _, truncated, _ = env.step(action)
+        self.assertTrue(truncated)
+        with self.assertRaises(UpkieException):
+            env.step(action)
+        env.close()
+
+    def test_servos(self):
+        env = UpkieReplay(self.log_path, env_class=UpkieServos, flat=True)
+        observation, _ = env.reset()
+        self.assertEqual(observation.shape, (6, 5))
+        env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -86,6 +86,25 @@ class TestUpkieServoPositions(unittest.TestCase):
             places=5,
         )
 
+    def test_flat_action_masking(self):
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        env = UpkieServoPositions(
+            flat=True,
+            frequency=100.0,
+            shm_name=shared_memory._name,
+        )
+        shared_memory.close()
+        env._spine = MockSpine()
+        self.assertEqual(env.action_space.shape, (6, 3))
+        env.reset()
+        action = np.zeros((6, 3))
+        action[:, 0] = 0.1
+        env.step(action)
+        left_hip = env._spine.action["servo"]["left_hip"]
+        self.assertAlmostEqual(left_hip["position"], 0.1)
+        self.assertAlmostEqual(left_hip["kp_scale"], 0.0)
+        self.assertAlmostEqual(left_hip["velocity"], 0.0)
+
 
 if __name__ == "__main__":
     unittest.main()
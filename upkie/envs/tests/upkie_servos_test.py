@@ -93,6 +93,76 @@ class TestUpkieServos(unittest.TestCase):
             places=5,
         )
 
+    def test_action_saturations(self):
+        action = {
+            joint: dict(servo_action)
+            for joint, servo_action in self.env.get_neutral_action().items()
+        }
+        action["left_hip"]["position"] = 5e5
+        self.env.reset()
+        for _ in range(2):
+            _, _, _, _, info = self.env.step(action)
+        self.assertEqual(info["action_saturations"], {"left_hip: position": 2})
+        self.env.reset()
+        action["left_hip"]["position"] = 0.0
+        _, _, _, _, info = self.env.step(action)
+        self.assertEqual(info["action_saturations"], {})
+
+    def test_flat(self):
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        env = UpkieServos(
+            flat=True,
+            frequency=100.0,
+            shm_name=shared_memory._name,
+        )
+        shared_memory.close()
+        env._spine = MockSpine()
+        self.assertEqual(env.observation_space.shape, (6, 5))
+        self.assertEqual(env.action_space.shape, (6, 6))
+
+        observation, info = env.reset()
+        spine_observation = info["spine_observation"]
+        self.assertEqual(observation.shape, (6, 5))
+        self.assertAlmostEqual(
+            observation[0, 0],
+            spine_observation["servo"][env.model.joints[0].name]["position"],
+        )
+
+        action = env.get_neutral_action()
+        self.assertEqual(action.shape, (6, 6))
+        hip = env.model.joints[0].name
+        action[0, 0] = 5e5
+        env.step(action)
+        servo_action = env._spine.action["servo"]
+        self.assertAlmostEqual(
+            servo_action[hip]["position"],
+            env.action_space.high[0, 0],
+            places=5,
+        )
+        self.assertIsInstance(servo_action[hip]["velocity"], float)
+        self.assertTrue(np.isnan(servo_action["left_wheel"]["position"]))
+
+    def test_flat_buffers(self):
+        shared_memory = SharedMemory(name=None, size=42, create=True)
+        env = UpkieServos(
+            flat=True,
+            frequency=100.0,
+            shm_name=shared_memory._name,
+        )
+        shared_memory.close()
+        env._spine = MockSpine()
+        first_observation, _ = env.reset()
+        action = env.get_neutral_action()
+        second_observation, _, _, _, _ = env.step(action)
+        self.assertIs(second_observation, first_observation)
+        env.step(action)
+        action[0, 0] = 0.1
+        env.step(action)
+        hip = env.model.joints[0].name
+        self.assertAlmostEqual(
+            env._spine.action["servo"][hip]["position"], 0.1
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
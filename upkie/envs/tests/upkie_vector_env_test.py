@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test UpkieVectorEnv."""
+
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from upkie.envs import UpkieGroundVelocity, UpkieVectorEnv
+from upkie.envs.tests.mock_spine import MockSpine
+from upkie.exceptions import UpkieException
+
+
+class TestUpkieVectorEnv(unittest.TestCase):
+    def setUp(self):
+        envs = []
+        for _ in range(3):
+            shared_memory = SharedMemory(name=None, size=42, create=True)
+            env = UpkieGroundVelocity(
+                frequency=100.0,
+                regulate_frequency=False,
+                shm_name=shared_memory._name,
+            )
+            shared_memory.close()
+            env._spine = MockSpine()
+            envs.append(env)
+        self.vector_env = UpkieVectorEnv(envs, max_episode_steps=3)
+
+    def test_spaces(self):
+        self.assertEqual(self.vector_env.num_envs, 3)
+        self.assertEqual(self.vector_env.observation_space.shape, (3, 4))
+        self.assertEqual(self.vector_env.action_space.shape, (3, 1))
+
+    def test_no_env(self):
+        with self.assertRaises(UpkieException):
+            UpkieVectorEnv([])
+
+    def test_step(self):
+        observations, infos = self.vector_env.reset(seed=42)
+        self.assertEqual(observations.shape, (3, 4))
+        self.assertEqual(len(infos["spine_observation"]["number"]), 3)
+        actions = np.zeros((3, 1))
+        observations, rewards, terminated, truncated, infos = (
+            self.vector_env.step(actions)
+        )
+        self.assertEqual(observations.shape, (3, 4))
+        self.assertEqual(rewards.shape, (3,))
+        self.assertFalse(terminated.any())
+        self.assertFalse(truncated.any())
+
+    def test_autoreset(self):
+        self.vector_env.reset()
+        actions = np.zeros((3, 1))
+        fallen_env = self.vector_env.envs[1]
+        fallen_env._spine.observation["base_orientation"]["pitch"] = 2.0
+        _, _, terminated, _, _ = self.vector_env.step(actions)
+        self.assertEqual(terminated.tolist(), [False, True, False])
+
+        number = fallen_env._spine.observation["number"]
+        _, rewards, terminated, _, _ = self.vector_env.step(actions)
+        self.assertAlmostEqual(rewards[1], 0.0)
+        self.assertFalse(terminated[1])
+        self.assertEqual(fallen_env._spine.observation["number"], number + 1)
+
+    def test_truncation(self):
+        self.vector_env.reset()
+        actions = np.zeros((3, 1))
+        for _ in range(2):
+            _, _, _, truncated, _ = self.vector_env.step(actions)
+            self.assertFalse(truncated.any())
+        _, _, _, truncated, _ = self.vector_env.step(actions)
+        self.assertTrue(truncated.all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,7 @@ import unittest
 import numpy as np
 
 from upkie.envs import WheeledInvertedPendulum
+from upkie.envs.wheeled_inverted_pendulum import GRAVITY, discrete_jacobians
 
 
 class TestWheeledInvertedPendulum(unittest.TestCase):
@@ -35,6 +36,22 @@ class TestWheeledInvertedPendulum(unittest.TestCase):
         observation, _ = self.env.reset()
         self.assertAlmostEqual(observation.dot(observation), 0.0)
 
+    def test_seeded_uncertainty(self):
+        env = WheeledInvertedPendulum(
+            regulate_frequency=False,
+            uncertainty=WheeledInvertedPendulum.Uncertainty(
+                accelerometer_noise=0.1,
+                observation_noise=0.1,
+            ),
+        )
+        action = np.zeros(env.action_space.shape)
+        observations = []
+        for _ in range(2):
+            env.reset(seed=7)
+            observations.append(env.step(action)[0])
+        self.assertTrue(np.allclose(observations[0], observations[1]))
+        self.assertGreater(np.abs(observations[0]).max(), 1e-10)
+
     def test_reward(self):
         observation, info = self.env.reset()
         action = np.zeros(self.env.action_space.shape)
@@ -85,6 +102,72 @@ class TestWheeledInvertedPendulum(unittest.TestCase):
         self.assertAlmostEqual(imu_accel[0], rdd + self.env.length * thetadd)
         self.assertAlmostEqual(imu_accel[1], 9.81)
 
+    def discrete_step(self, state, ground_accel):
+        theta, r, thetad, rd = state
+        thetadd = (
+            GRAVITY * np.sin(theta) - ground_accel * np.cos(theta)
+        ) / self.env.length
+        r, rd = self.env._integrate(r, rd, ground_accel, self.env.dt)
+        theta, thetad = self.env._integrate(
+            theta, thetad, thetadd, self.env.dt
+        )
+        return np.array([theta, r, thetad, rd])
+
+    def test_discrete_jacobians(self):
+        state = np.array([0.3, 0.1, -0.5, 0.2])
+        ground_accel = 2.0
+        A, B = discrete_jacobians(
+            self.env.dt, self.env.length, state[0], ground_accel
+        )
+        self.assertEqual(A.shape, (4, 4))
+        self.assertEqual(B.shape, (4, 1))
+        eps = 1e-6
+        next_state = self.discrete_step(state, ground_accel)
+        for i in range(4):
+            delta = np.zeros(4)
+            delta[i] = eps
+            column = (
+                self.discrete_step(state + delta, ground_accel) - next_state
+            ) / eps
+            self.assertTrue(np.allclose(A[:, i], column, atol=1e-5))
+        column = (
+            self.discrete_step(state, ground_accel + eps) - next_state
+        ) / eps
+        self.assertTrue(np.allclose(B[:, 0], column, atol=1e-5))
+
+    def test_linear_model_is_cached(self):
+        A, B = self.env.get_linear_model()
+        A_eq, B_eq = discrete_jacobians(self.env.dt, self.env.length)
+        self.assertTrue(np.allclose(A, A_eq))
+        self.assertTrue(np.allclose(B, B_eq))
+        A2, _ = self.env.get_linear_model()
+        self.assertTrue(np.shares_memory(A, A2))
+        self.assertFalse(A.flags.writeable)
+        self.env.length = 0.3
+        A3, _ = self.env.get_linear_model()
+        self.assertFalse(np.allclose(A, A3))
+
+    def test_get_jacobians(self):
+        state = np.array([0.3, 0.0, 0.0, 0.0])
+        A, B = self.env.get_jacobians(state, ground_accel=2.0)
+        A_exact, B_exact = discrete_jacobians(
+            self.env.dt, self.env.length, 0.3, 2.0
+        )
+        self.assertTrue(np.allclose(A, A_exact, atol=1e-4))
+        self.assertTrue(np.allclose(B, B_exact, atol=1e-4))
+        self.env.reset()
+        A_current, _ = self.env.get_jacobians()
+        self.assertTrue(np.allclose(A_current, self.env.get_linear_model()[0]))
+        A_far, _ = self.env.get_jacobians(10.0 * state)  # clamped to the grid
+        self.assertEqual(A_far.shape, (4, 4))
+
+    def test_get_jacobians_zero_bounds(self):
+        env = WheeledInvertedPendulum(fall_pitch=0.0, max_ground_accel=0.0)
+        A, B = env.get_jacobians(np.array([0.1, 0.0, 0.0, 0.0]), 1.0)
+        A_exact, B_exact = discrete_jacobians(env.dt, env.length)
+        self.assertTrue(np.allclose(A, A_exact))
+        self.assertTrue(np.allclose(B, B_exact))
+
 
 if __name__ == "__main__":
     unittest.main()
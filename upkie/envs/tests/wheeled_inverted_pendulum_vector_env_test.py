@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test WheeledInvertedPendulumVectorEnv."""
+
+import unittest
+
+import numpy as np
+
+from upkie.envs import (
+    WheeledInvertedPendulum,
+    WheeledInvertedPendulumVectorEnv,
+)
+from upkie.exceptions import UpkieException
+
+
+class TestWheeledInvertedPendulumVectorEnv(unittest.TestCase):
+    def setUp(self):
+        self.vector_env = WheeledInvertedPendulumVectorEnv(
+            num_envs=3,
+            fall_pitch=1.0,
+            frequency=100.0,
+            length=np.array([0.4, 0.6, 0.8]),
+            max_episode_steps=5,
+        )
+
+    def test_spaces(self):
+        self.assertEqual(self.vector_env.observation_space.shape, (3, 4))
+        self.assertEqual(self.vector_env.action_space.shape, (3, 1))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(UpkieException):
+            WheeledInvertedPendulumVectorEnv(num_envs=0)
+        with self.assertRaises(UpkieException):
+            WheeledInvertedPendulumVectorEnv(num_envs=2, length=[0.6, 0.0])
+
+    def test_reset(self):
+        observations, infos = self.vector_env.reset(seed=42)
+        self.assertEqual(observations.shape, (3, 4))
+        self.assertAlmostEqual(np.abs(observations).sum(), 0.0)
+
+    def test_same_dynamics_as_single_env(self):
+        self.vector_env.reset()
+        actions = np.full((3, 1), 0.5)
+        for _ in range(4):
+            observations, _, _, _, _ = self.vector_env.step(actions)
+        for i, length in enumerate(self.vector_env.length):
+            env = WheeledInvertedPendulum(
+                frequency=100.0,
+                length=length,
+                regulate_frequency=False,
+            )
+            env.reset()
+            for _ in range(4):
+                observation, _, _, _, _ = env.step(actions[i])
+            self.assertTrue(np.allclose(observations[i], observation))
+
+    def test_pendulums_differ_by_length(self):
+        self.vector_env.reset()
+        actions = np.ones((3, 1))
+        observations, _, _, _, _ = self.vector_env.step(actions)
+        pitch_velocities = observations[:, 2]
+        self.assertGreater(abs(pitch_velocities[0]), abs(pitch_velocities[1]))
+        self.assertGreater(abs(pitch_velocities[1]), abs(pitch_velocities[2]))
+
+    def test_fall_and_autoreset(self):
+        self.vector_env.reset()
+        actions = np.zeros((3, 1))
+        self.vector_env._WheeledInvertedPendulumVectorEnv__state[1, 0] = 1.5
+        _, rewards, terminated, _, _ = self.vector_env.step(actions)
+        self.assertEqual(terminated.tolist(), [False, True, False])
+        self.assertTrue(np.allclose(rewards, 1.0))
+
+        observations, rewards, terminated, _, _ = self.vector_env.step(actions)
+        self.assertFalse(terminated.any())
+        self.assertAlmostEqual(rewards[1], 0.0)
+        self.assertAlmostEqual(np.abs(observations[1]).sum(), 0.0)
+
+    def test_truncation(self):
+        self.vector_env.reset()
+        actions = np.zeros((3, 1))
+        for _ in range(4):
+            _, _, _, truncated, _ = self.vector_env.step(actions)
+            self.assertFalse(truncated.any())
+        _, _, _, truncated, _ = self.vector_env.step(actions)
+        self.assertTrue(truncated.all())
+        _, rewards, _, truncated, _ = self.vector_env.step(actions)
+        self.assertFalse(truncated.any())
+        self.assertTrue(np.allclose(rewards, 0.0))
+
+    def test_seeded_observation_noise(self):
+        vector_env = WheeledInvertedPendulumVectorEnv(
+            num_envs=3,
+            uncertainty=WheeledInvertedPendulum.Uncertainty(
+                observation_noise=np.array([0.1, 0.0, 0.1, 0.0]),
+            ),
+        )
+        actions = np.zeros((3, 1))
+        vector_env.reset(seed=7)
+        first, _, _, _, _ = vector_env.step(actions)
+        vector_env.reset(seed=7)
+        second, _, _, _, _ = vector_env.step(actions)
+        self.assertTrue(np.allclose(first, second))
+        self.assertGreater(np.abs(first[:, 0]).sum(), 0.0)
+        self.assertAlmostEqual(np.abs(first[:, 1]).sum(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,19 +5,22 @@
 # Copyright 2023 Inria
 
 import abc
-from typing import Any, Optional, Tuple
+import copy
+from typing import Any, Optional, Tuple, Union
 
 import gymnasium as gym
 import numpy as np
 import upkie_description
-from loop_rate_limiters import RateLimiter
+from loop_rate_limiters import AsyncRateLimiter, RateLimiter
 
 import upkie.config
 from upkie.exceptions import UpkieException
 from upkie.model import Model
-from upkie.spine import SpineInterface
+from upkie.spine import AsyncSpineInterface, ObservationView, SpineInterface
+from upkie.utils.clamp import ArrayClamp
 from upkie.utils.nested_update import nested_update
 from upkie.utils.robot_state import RobotState
+from upkie.utils.simulated_clock import SimulatedClock
 from upkie.utils.spdlog import logging
 
 
@@ -32,7 +35,10 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
     - Communication with the spine process.
     - Fall detection.
     - Initial state randomization (e.g. when training a policy).
-    - Loop frequency regulation (optional).
+    - Loop frequency regulation (optional), either against wall-clock time
+      or against simulated time with a real-time factor.
+    - Coroutine counterparts \ref async_reset and \ref async_step of the
+      reset and step functions, for agents running in an asyncio event loop.
 
     It otherwise defines three abstract methods to be defined by derived
     environments to:
@@ -47,13 +53,25 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
     it relies on the same spine interface that runs on Upkie.
     """
 
+    __async_rate: Optional[AsyncRateLimiter]
+    __async_spine: Optional[AsyncSpineInterface]
     __frequency: Optional[float]
     __extras: dict
+    __observation_view: Optional[ObservationView]
     __rate: Optional[RateLimiter]
     __regulate_frequency: bool
+    __schema: bool
+    __clock: Optional[SimulatedClock]
+    __sim_time: bool
     _spine: SpineInterface
     _spine_config: dict
 
+    ## \var action_clamp
+    ## Optional clamp applied to actions by derived environments. When set,
+    ## its saturation counts since the last reset are reported under the
+    ## "action_saturations" key of the `info` dictionary returned by steps.
+    action_clamp: Optional[ArrayClamp]
+
     ## \var fall_pitch
     ## Fall detection pitch angle, in radians.
     fall_pitch: float
@@ -69,18 +87,35 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
 
     def __init__(
         self,
+        blocking_wait: bool = False,
+        delta_actions: bool = False,
+        delta_config: bool = False,
         fall_pitch: float = 1.0,
         frequency: Optional[float] = 200.0,
         frequency_checks: bool = True,
         init_state: Optional[RobotState] = None,
+        real_time_factor: Optional[float] = None,
         regulate_frequency: bool = True,
-        shm_name: str = "/upkie",
+        schema: bool = False,
+        shm_name: Optional[str] = "/upkie",
         spine_config: Optional[dict] = None,
+        spine_observation_info: bool = True,
         spine_retries: int = 10,
     ) -> None:
         r"""!
         Initialize environment.
 
+        \param blocking_wait If set, sleep on a futex while waiting for the
+            spine rather than busy-polling. This is always the case after
+            \ref async_reset, so that waiting for the spine does not hold the
+            GIL.
+        \param delta_actions If set, only send action values that changed
+            since the previous step to the spine, along with a full action
+            every now and then. Ignored in schema mode.
+        \param delta_config If set, only send configuration values that
+            changed since the last reset to the spine, along with the keys
+            removed since then. This saves serializing and sending the full
+            configuration at every reset.
         \param fall_pitch Fall detection pitch angle, in radians.
         \param frequency Regulated frequency of the control loop, in Hz. Can be
             prescribed even when `regulate_frequency` is unset, in which case
@@ -91,13 +126,37 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
             control loop runs slower than the desired `frequency`. Set this
             parameter to false to disable these warnings.
         \param init_state Initial state of the robot, only used in simulation.
+        \param real_time_factor If set, pace the control loop against the
+            simulated time reported by the spine in the "sim.time"
+            observation, rather than against wall-clock time, so that
+            simulated time runs this many times faster than wall time. For
+            instance, 1.0 gives timing-faithful runs while `math.inf` runs as
+            fast as the spine allows. This mode replaces wall-clock frequency
+            regulation, and `frequency_checks` then warn when the loop can't
+            keep up with the factor. Spines that don't report simulated time
+            are paced against their "time" observation instead, which is
+            wall-clock time.
         \param regulate_frequency If set (default), the environment will
             regulate the control loop frequency to the value prescribed in
-            `frequency`.
+            `frequency`. Ignored when `real_time_factor` is set.
+        \param schema If set, exchange flat observations and actions with the
+            spine rather than serialized dictionaries. Spine observations are
+            then \ref upkie.spine.observation_view.ObservationView objects
+            that only read the values that are accessed. Bullet actions and
+            log entries are not sent to the spine in this mode: \ref
+            bullet_extra and \ref snapshot raise an exception, and \ref log
+            warns once that entries are dropped.
         \param shm_name Name of shared-memory file to exchange with the spine.
+            If None, the environment does not connect to a spine, and its
+            `_spine` attribute needs to be set to a spine-like object (see
+            for instance \ref upkie.envs.upkie_replay.UpkieReplay) before
+            it is reset.
         \param spine_config Additional spine configuration overriding the
             default `upkie.config.SPINE_CONFIG`. The combined configuration
             dictionary is sent to the spine at every reset.
+        \param spine_observation_info If set (default), the `info` dictionary
+            returned by steps contains the spine observation. Unset it to skip
+            this entry if you don't use it.
         \param spine_retries Number of times to try opening the shared-memory
             file to communicate with the spine.
 
@@ -107,6 +166,10 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
         merged_spine_config = upkie.config.SPINE_CONFIG.copy()
         if spine_config is not None:
             nested_update(merged_spine_config, spine_config)
+        if real_time_factor is not None:
+            if not real_time_factor > 0.0:
+                raise UpkieException(f"{real_time_factor=} should be positive")
+            regulate_frequency = False  # paced by the simulated clock instead
         if regulate_frequency and frequency is None:
             raise UpkieException(f"{regulate_frequency=} but {frequency=}")
         if init_state is None:
@@ -114,12 +177,42 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
                 position_base_in_world=np.array([0.0, 0.0, 0.6])
             )
 
+        self.__async_rate = None
+        self.__async_spine = None
+        self.__clock = (
+            SimulatedClock(
+                real_time_factor,
+                name=f"{self.__class__.__name__} simulated clock",
+                warn=frequency_checks,
+            )
+            if real_time_factor is not None
+            else None
+        )
         self.__extras = {"bullet": {}, "log": {}}
         self.__frequency = frequency
         self.__frequency_checks = frequency_checks
+        self.__observation_view = None
         self.__rate = None
         self.__regulate_frequency = regulate_frequency
-        self._spine = SpineInterface(shm_name, retries=spine_retries)
+        self.__schema = schema
+        self.__schema_log_warned = False
+        self.__sim_time = False
+        self.__sim_time_warned = False
+        self.__spine_observation_info = spine_observation_info
+        self.__spine_time = 0.0
+        self.action_clamp = None
+        self._spine = (
+            SpineInterface(
+                shm_name,
+                retries=spine_retries,
+                blocking_wait=blocking_wait,
+                schema=schema,
+                delta_actions=delta_actions,
+                delta_config=delta_config,
+            )
+            if shm_name is not None
+            else None
+        )
         self._spine_config = merged_spine_config
         self.fall_pitch = fall_pitch
         self.init_state = init_state
@@ -135,8 +228,11 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
         """!
         Stop the spine properly.
         """
-        if hasattr(self, "_spine"):  # in case SpineError was raised in ctor
+        if getattr(self, "_spine", None) is not None:  # SpineError in ctor
             self._spine.stop()
+        if getattr(self, "_UpkieBaseEnv__async_spine", None) is not None:
+            self.__async_spine.close()
+            self.__async_spine = None
 
     @property
     def dt(self) -> Optional[float]:
@@ -174,7 +270,13 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
 
         \param seed Number used to initialize the environment’s internal random
             number generator.
-        \param options Currently unused.
+        \param options Optional dictionary with the following keys:
+            - `"restore"`: name of a simulation snapshot to reset to, rather
+              than to a sampled initial state. Snapshots are only supported by
+              simulation spines, see \ref snapshot. Raises an UpkieException
+              if the spine has no snapshot with this name.
+            - `"snapshot"`: name under which the simulation state is saved
+              right after this reset.
         \return
             - `observation`: Initial vectorized observation, i.e. an element
               of the environment's `observation_space`.
@@ -185,7 +287,45 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
         self._spine.stop()
         self.__reset_rate()
         self.__reset_init_state()
+        self.__reset_snapshot_keys(options)
+        if self.action_clamp is not None:
+            self.action_clamp.reset()
         spine_observation = self._spine.start(self._spine_config)
+        self.__check_restored(options, spine_observation)
+        self.__reset_clock(spine_observation)
+        observation = self.get_env_observation(spine_observation)
+        info = {"spine_observation": spine_observation}
+        return observation, info
+
+    async def async_reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[dict] = None,
+    ) -> Tuple[np.ndarray, dict]:
+        r"""!
+        Coroutine counterpart of \ref reset.
+
+        \param seed Number used to initialize the environment’s internal random
+            number generator.
+        \param options Same as \ref reset.
+        \return Same as \ref reset.
+
+        This coroutine needs to be awaited from a running event loop, which
+        will keep running other coroutines while waiting for the spine.
+        """
+        super().reset(seed=seed)
+        if self.__async_spine is None:
+            self.__async_spine = AsyncSpineInterface(self._spine)
+        await self.__async_spine.stop()
+        self.__reset_async_rate()
+        self.__reset_init_state()
+        self.__reset_snapshot_keys(options)
+        if self.action_clamp is not None:
+            self.action_clamp.reset()
+        spine_observation = await self.__async_spine.start(self._spine_config)
+        self.__check_restored(options, spine_observation)
+        self.__reset_clock(spine_observation)
         observation = self.get_env_observation(spine_observation)
         info = {"spine_observation": spine_observation}
         return observation, info
@@ -199,6 +339,32 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
                 warn=self.__frequency_checks,
             )
 
+    def __reset_async_rate(self):
+        if self.__regulate_frequency:
+            rate_name = f"{self.__class__.__name__} async rate limiter"
+            self.__async_rate = AsyncRateLimiter(
+                self.__frequency,
+                name=rate_name,
+                warn=self.__frequency_checks,
+            )
+
+    def __reset_clock(self, spine_observation: dict):
+        if self.__clock is not None:
+            self.__sim_time = "time" in spine_observation.get("sim", {})
+            if not self.__sim_time and not self.__sim_time_warned:
+                self.__sim_time_warned = True
+                logging.warning(
+                    'Spine does not report simulated time in "sim.time", '
+                    'pacing against its wall-clock "time" instead'
+                )
+            self.__spine_time = self.__read_spine_time(spine_observation)
+            self.__clock.reset(self.__spine_time)
+
+    def __read_spine_time(self, spine_observation: dict) -> float:
+        if self.__sim_time:
+            return float(spine_observation["sim"]["time"])
+        return float(spine_observation["time"])
+
     def __reset_init_state(self):
         init_state, np_random = self.init_state, self.np_random
         orientation_matrix = init_state.sample_orientation(np_random)
@@ -216,6 +382,34 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
         reset["angular_velocity_base_in_base"] = omega
         reset["joint_configuration"] = init_state.joint_configuration
 
+    def __check_restored(
+        self, options: Optional[dict], spine_observation: dict
+    ) -> None:
+        r"""!
+        Check that the spine restored the snapshot requested at reset.
+
+        \param options Options passed to the reset.
+        \param spine_observation Observation returned by the spine.
+        \raise UpkieException If the spine did not restore the snapshot, for
+            instance because there is no snapshot with this name. The spine
+            then resets to the initial state from its configuration.
+        """
+        if options is None or "restore" not in options:
+            return
+        if not spine_observation.get("sim", {}).get("restored", False):
+            raise UpkieException(
+                f'Spine did not restore snapshot "{options["restore"]}", '
+                "it reset to the initial state of its configuration instead"
+            )
+
+    def __reset_snapshot_keys(self, options: Optional[dict]):
+        bullet_config = self._spine_config["bullet"]
+        for key in ("restore", "snapshot"):
+            if options is not None and key in options:
+                bullet_config[key] = options[key]
+            else:  # snapshot keys only apply to the reset they are passed to
+                bullet_config.pop(key, None)
+
     def step(
         self,
         action: np.ndarray,
@@ -243,9 +437,68 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
         """
         if self.__regulate_frequency:
             self.__rate.sleep()  # wait until clock tick to send the action
-            self.log("rate", {"slack": self.__rate.slack})
+            self.__log_rate(self.__rate.slack)
+        elif self.__clock is not None:
+            self.__clock.sleep(self.__spine_time)
+            self.__log_rate(self.__clock.slack)
+        spine_action = self.__prepare_spine_action(action)
+        spine_observation = self._spine.set_action(spine_action)
+        return self.__process_spine_observation(spine_observation)
+
+    def begin_step(self, action: np.ndarray) -> None:
+        r"""!
+        Send an action to the spine without waiting for it to be processed.
+
+        \param action Action from the agent.
+
+        This function and \ref end_step split \ref step in two, so that a
+        caller can step several environments in parallel, for instance \ref
+        upkie.envs.upkie_vector_env.UpkieVectorEnv. Contrary to \ref step, it
+        does not regulate the loop frequency.
+        """
+        spine_action = self.__prepare_spine_action(action)
+        self._spine.set_action_async(spine_action)
 
-        # Prepare spine action
+    def end_step(self) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        r"""!
+        Wait for the spine to process the action sent by \ref begin_step.
+
+        \return Same as \ref step.
+        """
+        spine_observation = self._spine.get_observation()
+        return self.__process_spine_observation(spine_observation)
+
+    async def async_step(
+        self,
+        action: np.ndarray,
+    ) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        r"""!
+        Coroutine counterpart of \ref step.
+
+        \param action Action from the agent.
+        \return Same as \ref step.
+
+        The environment needs to be reset by \ref async_reset before calling
+        this coroutine. Both the loop frequency regulation and the wait for
+        the spine let the event loop run other coroutines.
+        """
+        if self.__async_spine is None:
+            raise UpkieException("call `async_reset` before `async_step`")
+        if self.__regulate_frequency:
+            await self.__async_rate.sleep()
+            self.__log_rate(self.__async_rate.slack)
+        elif self.__clock is not None:
+            await self.__clock.async_sleep(self.__spine_time)
+            self.__log_rate(self.__clock.slack)
+        spine_action = self.__prepare_spine_action(action)
+        spine_observation = await self.__async_spine.set_action(spine_action)
+        return self.__process_spine_observation(spine_observation)
+
+    def __log_rate(self, slack: float) -> None:
+        if not self.__schema:  # log entries are not sent in schema mode
+            self.log("rate", {"slack": slack})
+
+    def __prepare_spine_action(self, action: np.ndarray) -> dict:
         spine_action = self.get_spine_action(action)
         for key in ("bullet", "log"):
             if not self.__extras[key]:
@@ -253,18 +506,33 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
             spine_action[key] = {}
             spine_action[key].update(self.__extras[key])
             self.__extras[key].clear()
+        return spine_action
 
-        # Send action to and get observation from the spine
-        spine_observation = self._spine.set_action(spine_action)
-
-        # Process spine observation
+    def __process_spine_observation(
+        self, spine_observation: Union[dict, np.ndarray]
+    ) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        if isinstance(spine_observation, np.ndarray):  # schema mode
+            spine_observation = self.__get_observation_view(spine_observation)
+        if self.__clock is not None:
+            self.__spine_time = self.__read_spine_time(spine_observation)
         observation = self.get_env_observation(spine_observation)
         reward = 1.0  # ready for e.g. an ObservationBasedReward wrapper
         terminated = self.detect_fall(spine_observation)
         truncated = False  # will be handled by e.g. a TimeLimit wrapper
-        info = {"spine_observation": spine_observation}
+        info = {}
+        if self.__spine_observation_info:
+            info["spine_observation"] = spine_observation
+        if self.action_clamp is not None:
+            info["action_saturations"] = self.action_clamp.saturations()
         return observation, reward, terminated, truncated, info
 
+    def __get_observation_view(self, array: np.ndarray) -> ObservationView:
+        # The spine interface keeps the same array until its next start
+        view = self.__observation_view
+        if view is None or view.array is not array:
+            view = self.__observation_view = ObservationView(array)
+        return view
+
     def detect_fall(self, spine_observation: dict) -> bool:
         r"""!
         Detect a fall based on the base-to-world pitch angle.
@@ -309,7 +577,18 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
 
         \param name Name of the entry.
         \param entry Dictionary to log along with the actual action.
+
+        \note Log entries are not sent to the spine in schema mode. The first
+            entry logged in this mode triggers a warning.
         """
+        if self.__schema:
+            if not self.__schema_log_warned:
+                logging.warning(
+                    "Log entries such as '%s' are dropped in schema mode",
+                    name,
+                )
+                self.__schema_log_warned = True
+            return
         if isinstance(entry, dict):
             self.__extras["log"][name] = entry.copy()
         else:  # logging values directly
@@ -320,8 +599,42 @@ class UpkieBaseEnv(abc.ABC, gym.Env):
         Prepend for the next step an extra action for the Bullet spine.
 
         This extra action can be for instance a set of external forces applied
-        to some robot bodies.
+        to some robot bodies. Extra actions prepended for the same step are
+        merged recursively, so that for instance external forces on different
+        bodies add up rather than replace each other.
 
         \param bullet_action Action dictionary processed by the Bullet spine.
+        \throw UpkieException In schema mode, where Bullet actions are not
+            sent to the spine.
+        """
+        self.__check_bullet_extras()
+        nested_update(self.__extras["bullet"], copy.deepcopy(bullet_action))
+
+    def snapshot(self, name: str) -> None:
+        r"""!
+        Save the state of the simulation at the next step.
+
+        The Bullet spine saves the simulation state when it receives the next
+        action, that is, the state from which the last observation was
+        computed. The environment can then go back to this state by `reset`
+        with the `{"restore": name}` option, for instance to branch several
+        rollouts from the same mid-trajectory state. Snapshots are kept in
+        memory by the spine until it is shut down.
+
+        Only the state of the simulation is restored: the rest of the reset,
+        such as the randomization of link masses, still applies, and the
+        simulated time "sim.time" restarts from zero.
+
+        \param name Name of the snapshot. Snapshots requested during the same
+            episode should have distinct names.
+        \throw UpkieException In schema mode, where Bullet actions are not
+            sent to the spine.
         """
-        self.__extras["bullet"] = bullet_action.copy()
+        self.__check_bullet_extras()
+        self.__extras["bullet"]["snapshot"] = name
+
+    def __check_bullet_extras(self) -> None:
+        if self.__schema:
+            raise UpkieException(
+                "Bullet actions are not sent to the spine in schema mode"
+            )
@@ -12,7 +12,7 @@ import gymnasium as gym
 import numpy as np
 
 from upkie.exceptions import UpkieException
-from upkie.utils.clamp import clamp_and_warn
+from upkie.utils.clamp import ArrayClamp
 from upkie.utils.filters import low_pass_filter
 from upkie.utils.robot_state import RobotState
 
@@ -33,7 +33,9 @@ class UpkieGroundVelocity(UpkieBaseEnv):
     [PPO balancer](https://github.com/upkie/ppo_balancer) agents.
 
     \note For reinforcement learning with neural-network policies: the
-    observation space and action space are not normalized.
+    observation space and action space are not normalized. Observations can
+    be normalized by the \ref
+    upkie.envs.wrappers.normalize_observation.NormalizeObservation wrapper.
 
     ### Action space
 
@@ -99,20 +101,32 @@ class UpkieGroundVelocity(UpkieBaseEnv):
 
     def __init__(
         self,
+        blocking_wait: bool = False,
+        delta_actions: bool = False,
+        delta_config: bool = False,
         fall_pitch: float = 1.0,
         frequency: float = 200.0,
         frequency_checks: bool = True,
         init_state: Optional[RobotState] = None,
         left_wheeled: bool = True,
         max_ground_velocity: float = 1.0,
+        real_time_factor: Optional[float] = None,
         regulate_frequency: bool = True,
+        schema: bool = False,
         shm_name: str = "/upkie",
         spine_config: Optional[dict] = None,
+        spine_observation_info: bool = True,
         wheel_radius: float = 0.06,
     ):
         r"""!
         Initialize environment.
 
+        \param blocking_wait If set, sleep on a futex while waiting for the
+            spine rather than busy-polling.
+        \param delta_actions If set, only send action values that changed
+            since the previous step to the spine.
+        \param delta_config If set, only send configuration values that
+            changed since the last reset to the spine.
         \param fall_pitch Fall detection pitch angle, in radians.
         \param frequency Regulated frequency of the control loop, in Hz.
         \param frequency_checks If `regulate_frequency` is set and this
@@ -126,21 +140,34 @@ class UpkieGroundVelocity(UpkieBaseEnv):
         \param max_ground_velocity Maximum commanded ground velocity in m/s.
             The default value of 1 m/s is conservative, don't hesitate to
             increase it once you feel confident in your agent.
+        \param real_time_factor If set, pace the control loop against
+            simulated time rather than wall-clock time, see \ref
+            UpkieBaseEnv.
         \param regulate_frequency Enables loop frequency regulation.
+        \param schema If set, exchange flat observations and actions with the
+            spine, see \ref UpkieBaseEnv.
         \param shm_name Name of shared-memory file.
         \param spine_config Additional spine configuration overriding the
             default `upkie.config.SPINE_CONFIG`. The combined configuration
             dictionary is sent to the spine at every reset.
+        \param spine_observation_info If set (default), the `info` dictionary
+            returned by steps contains the spine observation.
         \param wheel_radius Wheel radius in [m].
         """
         super().__init__(
+            blocking_wait=blocking_wait,
+            delta_actions=delta_actions,
+            delta_config=delta_config,
             fall_pitch=fall_pitch,
             frequency=frequency,
             frequency_checks=frequency_checks,
             init_state=init_state,
+            real_time_factor=real_time_factor,
             regulate_frequency=regulate_frequency,
+            schema=schema,
             shm_name=shm_name,
             spine_config=spine_config,
+            spine_observation_info=spine_observation_info,
         )
 
         if self.dt is None:
@@ -174,6 +201,11 @@ class UpkieGroundVelocity(UpkieBaseEnv):
             shape=action_limit.shape,
             dtype=action_limit.dtype,
         )
+        self.action_clamp = ArrayClamp(
+            self.action_space.low,
+            self.action_space.high,
+            labels=["ground_velocity"],
+        )
 
         self.__leg_servo_action = {
             joint.name: {
@@ -280,12 +312,7 @@ class UpkieGroundVelocity(UpkieBaseEnv):
         \param action Environment action.
         \return Spine action dictionary.
         """
-        ground_velocity = clamp_and_warn(
-            action[0],
-            self.action_space.low[0],
-            self.action_space.high[0],
-            label="ground_velocity",
-        )
+        ground_velocity = self.action_clamp(action)[0]
         wheel_velocity = ground_velocity / self.wheel_radius
         left_wheel_sign = 1.0 if self.left_wheeled else -1.0
         left_wheel_velocity = left_wheel_sign * wheel_velocity
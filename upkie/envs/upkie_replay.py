@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from typing import BinaryIO, Optional, Tuple, Type
+
+import gymnasium as gym
+import msgpack
+import numpy as np
+
+from upkie.exceptions import UpkieException
+
+from .upkie_base_env import UpkieBaseEnv
+from .upkie_ground_velocity import UpkieGroundVelocity
+
+## \var STATE_STEP
+## Value of the "spine.state_cycle_beginning" log entry in cycles where the
+## spine read an action from its agent, see upkie::cpp::spine::State.
+STATE_STEP: int = 3
+
+
+class ReplaySpine:
+    r"""!
+    Spine-like object serving observations read from a spine log.
+
+    Spine logs are sequences of msgpack-serialized dictionaries, one per
+    spine cycle, each with the "observation" and "action" of that cycle. The
+    first dictionary after each spine reset also has a "config" key, which
+    marks the beginning of an episode. The log file is streamed: only the
+    current and next dictionaries are kept in memory.
+    """
+
+    __file: Optional[BinaryIO]
+    __next_entry: Optional[dict]
+    __unpacker: Optional[msgpack.Unpacker]
+
+    ## \var action
+    ## Action logged by the spine along with the current observation.
+    action: Optional[dict]
+
+    ## \var episode_over
+    ## True when the log has no more observations for the current episode.
+    episode_over: bool
+
+    ## \var log_path
+    ## Path to the spine log file.
+    log_path: str
+
+    def __init__(
+        self,
+        log_path: str,
+        agent_cycles_only: bool = True,
+        read_size: int = 1024 * 1024,
+    ):
+        r"""!
+        Open spine log.
+
+        \param log_path Path to the spine log file.
+        \param agent_cycles_only If set (default), only serve observations
+            from spine cycles where the spine replied to its agent, that is,
+            reset cycles and cycles that began in the step state according to
+            their "spine.state_cycle_beginning" entry. Otherwise, serve
+            observations from every spine cycle.
+        \param read_size Number of bytes read from the log file at once.
+        """
+        self.__agent_cycles_only = agent_cycles_only
+        self.__file = None
+        self.__next_entry = None
+        self.__read_size = read_size
+        self.__unpacker = None
+        self.action = None
+        self.episode_over = True
+        self.log_path = log_path
+        self.__rewind()
+
+    def __del__(self):
+        """!
+        Close the log file.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """!
+        Close the log file.
+        """
+        if getattr(self, "_ReplaySpine__file", None) is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __rewind(self) -> None:
+        """!
+        Go back to the beginning of the log file.
+        """
+        self.close()
+        self.__file = open(self.log_path, "rb")
+        self.__unpacker = msgpack.Unpacker(
+            self.__file, raw=False, read_size=self.__read_size
+        )
+        self.__next_entry = self.__read_entry()
+        if self.__next_entry is None:
+            raise UpkieException(f"No observation in {self.log_path}")
+
+    def __read_entry(self) -> Optional[dict]:
+        r"""!
+        Read the next entry to serve from the log file.
+
+        \return Next dictionary with an observation, or None at the end of the
+            file.
+        """
+        for entry in self.__unpacker:
+            if not isinstance(entry, dict) or "observation" not in entry:
+                continue
+            state = entry.get("spine", {}).get("state_cycle_beginning")
+            if (
+                self.__agent_cycles_only
+                and "config" not in entry
+                and state is not None
+                and state != STATE_STEP
+            ):
+                continue  # the agent sent no action during this cycle
+            return entry
+        return None
+
+    def __next_observation(self) -> dict:
+        r"""!
+        Move on to the next entry of the log.
+
+        \return Observation dictionary of the new current entry.
+        """
+        entry = self.__next_entry
+        self.__next_entry = self.__read_entry()
+        self.action = entry.get("action")
+        self.episode_over = (
+            self.__next_entry is None or "config" in self.__next_entry
+        )
+        return entry["observation"]
+
+    def start(self, config: dict) -> dict:
+        r"""!
+        Start the next episode of the log.
+
+        \param config Configuration dictionary, unused.
+        \return First observation dictionary of the episode.
+
+        Episodes are served in the order they appear in the log. After the
+        last one, the log is replayed from the beginning.
+        """
+        while not self.episode_over:  # skip the rest of the current episode
+            self.__next_observation()
+        if self.__next_entry is None:
+            self.__rewind()
+        return self.__next_observation()
+
+    def stop(self) -> None:
+        """!
+        Nothing to stop when replaying a log.
+        """
+
+    def set_action(self, action: Optional[dict]) -> dict:
+        r"""!
+        Get the next observation from the log.
+
+        \param action Action from the agent, unused.
+        \return Next observation dictionary.
+        """
+        self.set_action_async(action)
+        return self.get_observation()
+
+    def set_action_async(self, action: Optional[dict]) -> None:
+        r"""!
+        Ignore an action from the agent.
+
+        \param action Action from the agent, unused.
+        """
+
+    def get_observation(self) -> dict:
+        r"""!
+        Get the next observation from the log.
+
+        \return Next observation dictionary.
+        \throw UpkieException If the episode is over.
+        """
+        if self.episode_over:
+            raise UpkieException(
+                "Replayed episode is over, reset the environment"
+            )
+        return self.__next_observation()
+
+
+class UpkieReplay(gym.Wrapper):
+    r"""!
+    Replay a spine log through an Upkie environment, without a spine.
+
+    This environment wraps an Upkie environment, such as \ref
+    upkie.envs.upkie_ground_velocity.UpkieGroundVelocity or \ref
+    upkie.envs.upkie_servos.UpkieServos, whose spine is replaced by a \ref
+    ReplaySpine reading observations from a log file. Observations are then
+    computed from logged spine observations by the environment's regular
+    `get_env_observation` function. Actions passed to `step` don't affect
+    observations: the spine action logged along with each observation is
+    returned in the "spine_action" key of the `info` dictionary.
+
+    Steps run as fast as the CPU allows. Each episode of the log is a
+    separate episode of the environment, which is truncated at the end of
+    the logged episode.
+    """
+
+    ## \var env
+    ## Wrapped Upkie environment.
+    env: UpkieBaseEnv
+
+    ## \var spine
+    ## Replay spine reading the log file.
+    spine: ReplaySpine
+
+    def __init__(
+        self,
+        log_path: str,
+        agent_cycles_only: bool = True,
+        env_class: Type[UpkieBaseEnv] = UpkieGroundVelocity,
+        **kwargs,
+    ):
+        r"""!
+        Initialize environment.
+
+        \param log_path Path to the spine log file.
+        \param agent_cycles_only If set (default), only replay spine cycles
+            where the spine replied to its agent.
+        \param env_class Class of the Upkie environment to replay the log
+            through.
+        \param kwargs Keyword arguments forwarded to the environment class.
+        """
+        env = env_class(regulate_frequency=False, shm_name=None, **kwargs)
+        spine = ReplaySpine(log_path, agent_cycles_only=agent_cycles_only)
+        env._spine = spine
+        super().__init__(env)
+        self.spine = spine
+
+    def reset(self, **kwargs) -> Tuple[np.ndarray, dict]:
+        r"""!
+        Start replaying the next episode of the log.
+
+        \param kwargs Keyword arguments forwarded to the wrapped environment.
+        \return Observation and info dictionary from the wrapped environment,
+            with the logged spine action under the "spine_action" key.
+        """
+        observation, info = self.env.reset(**kwargs)
+        info["spine_action"] = self.spine.action
+        return observation, info
+
+    def step(
+        self, action: np.ndarray
+    ) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        r"""!
+        Replay the next observation of the log.
+
+        \param action Action from the agent. It is converted to a spine action
+            by the wrapped environment, but does not affect observations.
+        \return Tuple with (observation, reward, terminated, truncated, info).
+            See \ref upkie.envs.upkie_base_env.UpkieBaseEnv.step for details.
+            The episode is truncated at the last observation of the logged
+            episode.
+        """
+        observation, reward, terminated, _, info = self.env.step(action)
+        info["spine_action"] = self.spine.action
+        truncated = self.spine.episode_over
+        return observation, reward, terminated, truncated, info
+
+    def close(self) -> None:
+        """!
+        Close the log file and the wrapped environment.
+        """
+        self.spine.close()
+        super().close()
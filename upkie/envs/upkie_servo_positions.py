@@ -4,7 +4,7 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2024 Inria
 
-from typing import Optional, Set
+from typing import Optional, Set, Union
 
 import gymnasium as gym
 
@@ -49,42 +49,71 @@ class UpkieServoPositions(UpkieServos):
 
     ## \var action_space
     ## Action space.
-    action_space: gym.spaces.dict.Dict
+    action_space: Union[gym.spaces.Box, gym.spaces.dict.Dict]
 
     def __init__(
         self,
+        blocking_wait: bool = False,
+        delta_actions: bool = False,
+        delta_config: bool = False,
         fall_pitch: float = 1.0,
+        flat: bool = False,
         frequency: float = 200.0,
         frequency_checks: bool = True,
         init_state: Optional[RobotState] = None,
+        real_time_factor: Optional[float] = None,
         regulate_frequency: bool = True,
+        schema: bool = False,
         shm_name: str = "/upkie",
         spine_config: Optional[dict] = None,
+        spine_observation_info: bool = True,
     ):
         r"""!
         Initialize environment.
 
+        \param blocking_wait If set, sleep on a futex while waiting for the
+            spine rather than busy-polling.
+        \param delta_actions If set, only send action values that changed
+            since the previous step to the spine.
+        \param delta_config If set, only send configuration values that
+            changed since the last reset to the spine.
         \param fall_pitch Fall pitch angle, in radians.
+        \param flat If set, observations and actions are arrays rather than
+            nested dictionaries, see \ref UpkieServos.
         \param frequency Regulated frequency of the control loop, in Hz.
         \param frequency_checks If `regulate_frequency` is set and this
             parameter is true (default), a warning is issued every time the
             control loop runs slower than the desired `frequency`. Set this
             parameter to false to disable these warnings.
         \param init_state Initial state of the robot, only used in simulation.
+        \param real_time_factor If set, pace the control loop against
+            simulated time rather than wall-clock time, see \ref
+            UpkieBaseEnv.
         \param regulate_frequency Enables loop frequency regulation.
+        \param schema If set, exchange flat observations and actions with the
+            spine, see \ref UpkieBaseEnv.
         \param shm_name Name of shared-memory file.
         \param spine_config Additional spine configuration overriding the
             default `upkie.config.SPINE_CONFIG`. The combined configuration
             dictionary is sent to the spine at every reset.
+        \param spine_observation_info If set (default), the `info` dictionary
+            returned by steps contains the spine observation.
         """
         super().__init__(
+            blocking_wait=blocking_wait,
+            delta_actions=delta_actions,
+            delta_config=delta_config,
             fall_pitch=fall_pitch,
+            flat=flat,
             frequency=frequency,
             frequency_checks=frequency_checks,
             init_state=init_state,
+            real_time_factor=real_time_factor,
             regulate_frequency=regulate_frequency,
+            schema=schema,
             shm_name=shm_name,
             spine_config=spine_config,
+            spine_observation_info=spine_observation_info,
         )
         action_space = {
             joint.name: gym.spaces.Dict(
@@ -111,4 +140,5 @@ class UpkieServoPositions(UpkieServos):
             )
             for joint in self.model.joints
         }
-        self.action_space = gym.spaces.Dict(action_space)
+        if not flat:
+            self.action_space = gym.spaces.Dict(action_space)
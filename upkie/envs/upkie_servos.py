@@ -4,12 +4,12 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2023 Inria
 
-from typing import Optional, Set, Tuple
+from typing import Optional, Set, Tuple, Union
 
 import gymnasium as gym
 import numpy as np
 
-from upkie.utils.clamp import clamp_and_warn
+from upkie.utils.clamp import ArrayClamp
 from upkie.utils.robot_state import RobotState
 
 from .upkie_base_env import UpkieBaseEnv
@@ -89,6 +89,19 @@ class UpkieServos(UpkieBaseEnv):
     As with all Upkie environments, full observations from the spine (detailed
     in \ref observations) are also available in the `info` dictionary
     returned by the reset and step functions.
+
+    ### Flat mode
+
+    When the environment is constructed with `flat=True`, observations and
+    actions are arrays rather than dictionaries. Rows correspond to servos in
+    the order of `model.joints`, while columns correspond to \ref
+    OBSERVATION_KEYS for observations and to \ref ACTION_KEYS (restricted to
+    \ref ACTION_MASK when it is set) for actions. For instance, observations
+    of this environment then have shape `(6, 5)` and actions shape `(6, 6)`.
+
+    Flat observations are written in place into a preallocated array: the
+    observation returned by `reset` or `step` is overwritten by the next
+    call. Copy it if you need to keep it across steps.
     """
 
     ACTION_KEYS: Tuple[str, str, str, str, str, str] = (
@@ -102,13 +115,25 @@ class UpkieServos(UpkieBaseEnv):
 
     ACTION_MASK: Set[str] = set()
 
+    OBSERVATION_KEYS: Tuple[str, str, str, str, str] = (
+        "position",
+        "velocity",
+        "torque",
+        "temperature",
+        "voltage",
+    )
+
     ## \var action_space
     ## Action space.
-    action_space: gym.spaces.dict.Dict
+    action_space: Union[gym.spaces.Box, gym.spaces.dict.Dict]
+
+    ## \var flat
+    ## If set, observations and actions are arrays rather than dictionaries.
+    flat: bool
 
     ## \var observation_space
     ## Observation space.
-    observation_space: gym.spaces.dict.Dict
+    observation_space: Union[gym.spaces.Box, gym.spaces.dict.Dict]
 
     ## \var version
     ## Environment version number.
@@ -116,38 +141,66 @@ class UpkieServos(UpkieBaseEnv):
 
     def __init__(
         self,
+        blocking_wait: bool = False,
+        delta_actions: bool = False,
+        delta_config: bool = False,
         fall_pitch: float = 1.0,
+        flat: bool = False,
         frequency: float = 200.0,
         frequency_checks: bool = True,
         init_state: Optional[RobotState] = None,
+        real_time_factor: Optional[float] = None,
         regulate_frequency: bool = True,
+        schema: bool = False,
         shm_name: str = "/upkie",
         spine_config: Optional[dict] = None,
+        spine_observation_info: bool = True,
     ):
         r"""!
         Initialize environment.
 
+        \param blocking_wait If set, sleep on a futex while waiting for the
+            spine rather than busy-polling.
+        \param delta_actions If set, only send action values that changed
+            since the previous step to the spine.
+        \param delta_config If set, only send configuration values that
+            changed since the last reset to the spine.
         \param fall_pitch Fall pitch angle, in radians.
+        \param flat If set, observations and actions are arrays rather than
+            nested dictionaries, see \ref upkie_servos_description.
         \param frequency Regulated frequency of the control loop, in Hz.
         \param frequency_checks If `regulate_frequency` is set and this
             parameter is true (default), a warning is issued every time the
             control loop runs slower than the desired `frequency`. Set this
             parameter to false to disable these warnings.
         \param init_state Initial state of the robot, only used in simulation.
+        \param real_time_factor If set, pace the control loop against
+            simulated time rather than wall-clock time, see \ref
+            UpkieBaseEnv.
         \param regulate_frequency Enables loop frequency regulation.
+        \param schema If set, exchange flat observations and actions with the
+            spine, see \ref UpkieBaseEnv.
         \param shm_name Name of shared-memory file.
         \param spine_config Additional spine configuration overriding the
             default `upkie.config.SPINE_CONFIG`. The combined configuration
             dictionary is sent to the spine at every `reset`.
+        \param spine_observation_info If set (default), the `info` dictionary
+            returned by steps contains the spine observation.
         """
         super().__init__(
+            blocking_wait=blocking_wait,
+            delta_actions=delta_actions,
+            delta_config=delta_config,
             fall_pitch=fall_pitch,
             frequency=frequency,
             frequency_checks=frequency_checks,
             init_state=init_state,
+            real_time_factor=real_time_factor,
             regulate_frequency=regulate_frequency,
+            schema=schema,
             shm_name=shm_name,
             spine_config=spine_config,
+            spine_observation_info=spine_observation_info,
         )
 
         action_space = {}
@@ -262,10 +315,85 @@ class UpkieServos(UpkieBaseEnv):
         # gymnasium.Env: observation_space
         self.observation_space = gym.spaces.Dict(servo_space)
 
+        # Limit arrays for flat mode
+        flat_action_keys = tuple(
+            key
+            for key in self.ACTION_KEYS
+            if not self.ACTION_MASK or key in self.ACTION_MASK
+        )
+        flat_action_columns = [
+            self.ACTION_KEYS.index(key) for key in flat_action_keys
+        ]
+        joint_names = [joint.name for joint in self.model.joints]
+        flat_max_action = np.array(
+            [
+                [max_action[name][key] for key in self.ACTION_KEYS]
+                for name in joint_names
+            ],
+            dtype=float,
+        )
+        flat_min_action = np.array(
+            [
+                [min_action[name][key] for key in self.ACTION_KEYS]
+                for name in joint_names
+            ],
+            dtype=float,
+        )
+        flat_neutral_action = np.array(
+            [
+                [neutral_action[name][key] for key in self.ACTION_KEYS]
+                for name in joint_names
+            ],
+            dtype=float,
+        )
+        if flat:
+            self.action_space = gym.spaces.Box(
+                low=flat_min_action[:, flat_action_columns],
+                high=flat_max_action[:, flat_action_columns],
+                dtype=float,
+            )
+            self.observation_space = gym.spaces.Box(
+                low=np.array(
+                    [
+                        [
+                            servo_space[name][key].low[0]
+                            for key in self.OBSERVATION_KEYS
+                        ]
+                        for name in joint_names
+                    ],
+                    dtype=float,
+                ),
+                high=np.array(
+                    [
+                        [
+                            servo_space[name][key].high[0]
+                            for key in self.OBSERVATION_KEYS
+                        ]
+                        for name in joint_names
+                    ],
+                    dtype=float,
+                ),
+                dtype=float,
+            )
+
         # Class attributes
+        self.__flat_action_columns = flat_action_columns
+        self.__flat_neutral_action = flat_neutral_action
+        self.__flat_observation = np.empty(
+            (len(joint_names), len(self.OBSERVATION_KEYS)), dtype=float
+        )
+        self.__joint_names = joint_names
         self.__neutral_action = neutral_action
-        self.__max_action = max_action
-        self.__min_action = min_action
+        self.__servo_action = np.empty(flat_neutral_action.shape)
+        self.action_clamp = ArrayClamp(
+            flat_min_action,
+            flat_max_action,
+            labels=[
+                [f"{name}: {key}" for key in self.ACTION_KEYS]
+                for name in joint_names
+            ],
+        )
+        self.flat = flat
 
     def get_neutral_action(self) -> dict:
         r"""!
@@ -273,6 +401,8 @@ class UpkieServos(UpkieBaseEnv):
 
         \return Neutral action where servos don't move.
         """
+        if self.flat:
+            return self.__flat_neutral_action[:, self.__flat_action_columns]
         return self.__neutral_action.copy()
 
     def get_env_observation(self, spine_observation: dict):
@@ -280,8 +410,17 @@ class UpkieServos(UpkieBaseEnv):
         Extract environment observation from spine observation dictionary.
 
         \param spine_observation Full observation dictionary from the spine.
-        \return Environment observation.
+        \return Environment observation. In flat mode, it is a preallocated
+            array overwritten by the next call to this function.
         """
+        if self.flat:
+            observation = self.__flat_observation
+            for i, name in enumerate(self.__joint_names):
+                servo = spine_observation["servo"][name]
+                for j, key in enumerate(self.OBSERVATION_KEYS):
+                    observation[i, j] = servo[key]
+            return observation
+
         # If creating a new object turns out to be too slow we can switch to
         # updating in-place.
         return {
@@ -302,26 +441,28 @@ class UpkieServos(UpkieBaseEnv):
         \param env_action Environment action.
         \return Spine action dictionary.
         """
-        spine_action = {"servo": {}}
-        for joint in self.model.joints:
-            servo_action = {}
-            for key in self.ACTION_KEYS:
-                action = (
-                    env_action[joint.name][key]
-                    if key in env_action[joint.name]
-                    and (not self.ACTION_MASK or key in self.ACTION_MASK)
-                    else self.__neutral_action[joint.name][key]
-                )
-                action_value = (
-                    action.item()
-                    if isinstance(action, np.ndarray)
-                    else float(action)
-                )
-                servo_action[key] = clamp_and_warn(
-                    action_value,
-                    self.__min_action[joint.name][key],
-                    self.__max_action[joint.name][key],
-                    label=f"{joint.name}: {key}",
-                )
-            spine_action["servo"][joint.name] = servo_action
-        return spine_action
+        servo_action = self.__servo_action
+        if self.flat:
+            servo_action[:] = self.__flat_neutral_action
+            servo_action[:, self.__flat_action_columns] = env_action
+        else:
+            for i, joint in enumerate(self.model.joints):
+                for j, key in enumerate(self.ACTION_KEYS):
+                    action = (
+                        env_action[joint.name][key]
+                        if key in env_action[joint.name]
+                        and (not self.ACTION_MASK or key in self.ACTION_MASK)
+                        else self.__neutral_action[joint.name][key]
+                    )
+                    servo_action[i, j] = (
+                        action.item()
+                        if isinstance(action, np.ndarray)
+                        else float(action)
+                    )
+        self.action_clamp(servo_action, out=servo_action)
+        return {
+            "servo": {
+                name: dict(zip(self.ACTION_KEYS, row))
+                for name, row in zip(self.__joint_names, servo_action.tolist())
+            }
+        }
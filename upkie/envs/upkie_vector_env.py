@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from copy import deepcopy
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector.utils import (
+    batch_space,
+    concatenate,
+    create_empty_array,
+    iterate,
+)
+
+from upkie.exceptions import UpkieException
+
+from .upkie_base_env import UpkieBaseEnv
+
+
+class UpkieVectorEnv(gym.vector.VectorEnv):
+    r"""!
+    Vector of Upkie environments, each connected to its own spine.
+
+    At each step, this environment sends all actions to their spines before
+    collecting any observation, so that spines (typically `bullet_spine`
+    processes started with distinct `--shm-name` arguments) process their
+    actions in parallel on separate CPU cores.
+
+    Sub-environments that terminate or get truncated are reset at the next
+    call to \ref step, which then returns their initial observation with a
+    zero reward. This is the "next step" autoreset mode of Gymnasium vector
+    environments.
+    """
+
+    ## \var envs
+    ## Sub-environments.
+    envs: Tuple[UpkieBaseEnv, ...]
+
+    ## \var max_episode_steps
+    ## If set, number of steps after which sub-environments are truncated.
+    max_episode_steps: Optional[int]
+
+    def __init__(
+        self,
+        envs: Sequence[UpkieBaseEnv],
+        max_episode_steps: Optional[int] = None,
+    ):
+        r"""!
+        Initialize vector environment.
+
+        \param envs Upkie environments, each connected to a different spine.
+            They should be constructed with `regulate_frequency=False`, and
+            share the same observation and action spaces.
+        \param max_episode_steps If set, truncate episodes of sub-environments
+            after this many steps.
+        """
+        if len(envs) < 1:
+            raise UpkieException("vector environment needs at least one env")
+        for env in envs:
+            if not isinstance(env, UpkieBaseEnv):
+                raise UpkieException(
+                    f"{env} is not an unwrapped Upkie environment"
+                )
+        first_env = envs[0]
+        self.envs = tuple(envs)
+        self.max_episode_steps = max_episode_steps
+        self.num_envs = len(envs)
+        self.single_observation_space = first_env.observation_space
+        self.single_action_space = first_env.action_space
+        self.observation_space = batch_space(
+            self.single_observation_space, self.num_envs
+        )
+        self.action_space = batch_space(
+            self.single_action_space, self.num_envs
+        )
+        self.metadata = dict(first_env.metadata)
+        AutoresetMode = getattr(gym.vector, "AutoresetMode", None)
+        if AutoresetMode is not None:  # gymnasium >= 1.1
+            self.metadata["autoreset_mode"] = AutoresetMode.NEXT_STEP
+
+        self.__autoreset = np.zeros(self.num_envs, dtype=bool)
+        self.__env_observations: List[Any] = [None] * self.num_envs
+        self.__episode_steps = np.zeros(self.num_envs, dtype=int)
+        self.__observations = create_empty_array(
+            self.single_observation_space, n=self.num_envs, fn=np.zeros
+        )
+        self.__rewards = np.zeros(self.num_envs, dtype=np.float64)
+        self.__terminations = np.zeros(self.num_envs, dtype=bool)
+        self.__truncations = np.zeros(self.num_envs, dtype=bool)
+
+    @property
+    def dt(self) -> Optional[float]:
+        """!
+        Period of the control loop of sub-environments in seconds.
+        """
+        return self.envs[0].dt
+
+    def reset(
+        self,
+        *,
+        seed: Optional[Union[int, Sequence[Optional[int]]]] = None,
+        options: Optional[dict] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        r"""!
+        Reset all sub-environments.
+
+        \param seed Seed for the first sub-environment, incremented for each
+            subsequent one, or list of seeds for each sub-environment.
+        \param options Options forwarded to every sub-environment.
+        \return Batched observations and infos.
+        """
+        if seed is None or isinstance(seed, int):
+            seeds = [
+                None if seed is None else seed + i
+                for i in range(self.num_envs)
+            ]
+        else:
+            seeds = list(seed)
+        infos: Dict[str, Any] = {}
+        for i, env in enumerate(self.envs):
+            self.__env_observations[i], info = env.reset(
+                seed=seeds[i], options=options
+            )
+            infos = self._add_info(infos, info, i)
+        self.__autoreset[:] = False
+        self.__episode_steps[:] = 0
+        self.__observations = concatenate(
+            self.single_observation_space,
+            self.__env_observations,
+            self.__observations,
+        )
+        return deepcopy(self.__observations), infos
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        r"""!
+        Step all sub-environments in parallel.
+
+        \param actions Batch of actions, one per sub-environment.
+        \return Batched observations, rewards, terminations, truncations and
+            infos.
+        """
+        stepping = np.logical_not(self.__autoreset)
+        env_actions = iterate(self.action_space, actions)
+        for i, action in enumerate(env_actions):
+            if stepping[i]:
+                self.envs[i].begin_step(action)
+
+        # Spines are now processing their actions, reset the others meanwhile
+        infos: Dict[str, Any] = {}
+        for i in np.flatnonzero(self.__autoreset):
+            self.__env_observations[i], info = self.envs[i].reset()
+            self.__episode_steps[i] = 0
+            self.__rewards[i] = 0.0
+            self.__terminations[i] = False
+            self.__truncations[i] = False
+            infos = self._add_info(infos, info, int(i))
+
+        for i in np.flatnonzero(stepping):
+            (
+                self.__env_observations[i],
+                self.__rewards[i],
+                self.__terminations[i],
+                truncated,
+                info,
+            ) = self.envs[i].end_step()
+            self.__episode_steps[i] += 1
+            self.__truncations[i] = truncated or (
+                self.max_episode_steps is not None
+                and self.__episode_steps[i] >= self.max_episode_steps
+            )
+            infos = self._add_info(infos, info, int(i))
+
+        self.__observations = concatenate(
+            self.single_observation_space,
+            self.__env_observations,
+            self.__observations,
+        )
+        self.__autoreset = np.logical_or(
+            self.__terminations, self.__truncations
+        )
+        return (
+            deepcopy(self.__observations),
+            np.copy(self.__rewards),
+            np.copy(self.__terminations),
+            np.copy(self.__truncations),
+            infos,
+        )
+
+    def close_extras(self, **kwargs) -> None:
+        """!
+        Close all sub-environments.
+        """
+        for env in self.envs:
+            env.close()
@@ -6,6 +6,7 @@
 
 """Wheeled inverted pendulum."""
 
+import functools
 from typing import Any, Optional, Tuple, Union
 
 import gymnasium as gym
@@ -16,12 +17,108 @@ from numpy import cos, sin
 
 from upkie.exceptions import MissingOptionalDependency, UpkieRuntimeError
 from upkie.model import Model
-from upkie.utils.clamp import clamp_and_warn
+from upkie.utils.clamp import ArrayClamp
+from upkie.utils.noise_bank import NoiseBank
 from upkie.utils.spdlog import logging
 
 GRAVITY: float = 9.81  # [m] / [s]²
 
 
+def discrete_jacobians(
+    dt: float,
+    length: float,
+    pitch: Union[float, np.ndarray] = 0.0,
+    ground_accel: Union[float, np.ndarray] = 0.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    r"""!
+    Jacobians of the discrete-time dynamics of a wheeled inverted pendulum.
+
+    The discrete-time dynamics are those integrated by \ref
+    WheeledInvertedPendulum.step, with state \f$x = (\theta, r, \dot{\theta},
+    \dot{r})\f$ and input the ground acceleration \f$u = \ddot{r}\f$. Their
+    Jacobians only depend on the pitch angle and ground acceleration of the
+    linearization point.
+
+    \param dt Integration timestep, in [s].
+    \param length Length of the pendulum, in [m].
+    \param pitch Pitch angle of the linearization point, in [rad]. Can be an
+        array to linearize around several points at once.
+    \param ground_accel Ground acceleration of the linearization point, in
+        [m] / [s]². Can be an array broadcastable with `pitch`.
+    \return Pair \f$(A, B)\f$ of state and input Jacobians, with shapes
+        `pitch.shape + (4, 4)` and `pitch.shape + (4, 1)`.
+    """
+    pitch, ground_accel = np.broadcast_arrays(
+        np.asarray(pitch, dtype=float), np.asarray(ground_accel, dtype=float)
+    )
+    dthetadd_dtheta = (
+        GRAVITY * np.cos(pitch) + ground_accel * np.sin(pitch)
+    ) / length
+    dthetadd_du = -np.cos(pitch) / length
+    A = np.zeros(pitch.shape + (4, 4))
+    A[...] = np.eye(4)
+    A[..., 0, 0] += 0.5 * dt**2 * dthetadd_dtheta
+    A[..., 0, 2] = dt
+    A[..., 1, 3] = dt
+    A[..., 2, 0] = dt * dthetadd_dtheta
+    B = np.empty(pitch.shape + (4, 1))
+    B[..., 0, 0] = 0.5 * dt**2 * dthetadd_du
+    B[..., 1, 0] = 0.5 * dt**2
+    B[..., 2, 0] = dt * dthetadd_du
+    B[..., 3, 0] = dt
+    return A, B
+
+
+@functools.lru_cache(maxsize=32)
+def _jacobian_table(
+    dt: float,
+    length: float,
+    max_pitch: float,
+    nb_pitches: int,
+    max_ground_accel: float,
+    nb_ground_accels: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    r"""!
+    Tabulate discrete-time Jacobians over a grid of linearization points.
+
+    \param dt Integration timestep, in [s].
+    \param length Length of the pendulum, in [m].
+    \param max_pitch Pitch angles of the grid span [-max_pitch, max_pitch].
+    \param nb_pitches Number of pitch angles in the grid.
+    \param max_ground_accel Ground accelerations of the grid span
+        [-max_ground_accel, max_ground_accel].
+    \param nb_ground_accels Number of ground accelerations in the grid.
+    \return Read-only state and input Jacobians, with shapes `(nb_pitches,
+        nb_ground_accels, 4, 4)` and `(nb_pitches, nb_ground_accels, 4, 1)`.
+    """
+    pitches = np.linspace(-max_pitch, max_pitch, nb_pitches)
+    ground_accels = np.linspace(
+        -max_ground_accel, max_ground_accel, nb_ground_accels
+    )
+    A, B = discrete_jacobians(
+        dt, length, pitches[:, np.newaxis], ground_accels[np.newaxis, :]
+    )
+    A.flags.writeable = False  # shared by all callers of the cache
+    B.flags.writeable = False
+    return A, B
+
+
+def _grid_index(value: float, bound: float, nb_points: int) -> int:
+    r"""!
+    Index of the point nearest to a value in a grid spanning [-bound, bound].
+
+    \param value Value to look up, clamped to the grid.
+    \param bound Bound of the grid.
+    \param nb_points Number of points in the grid.
+    \return Index of the nearest grid point. All points of a grid with a
+        zero bound coincide, in which case this index is zero.
+    """
+    if nb_points < 2 or bound <= 0.0:
+        return 0
+    index = round((value + bound) / (2.0 * bound) * (nb_points - 1))
+    return min(max(index, 0), nb_points - 1)
+
+
 class WheeledInvertedPendulum(gym.Env):
     r"""!
     Wheeled inverted pendulum model.
@@ -95,6 +192,11 @@ class WheeledInvertedPendulum(gym.Env):
     ## Length of the inverted pendulum.
     length: float
 
+    ## \var linearization_grid
+    ## Number of pitch angles and ground accelerations in the grid of
+    ## linearization points used by \ref get_jacobians.
+    linearization_grid: Tuple[int, int]
+
     ## \var metadata
     ## Metadata of the environment containing rendering modes.
     metadata = {"render_modes": ["plot"]}
@@ -152,36 +254,75 @@ class WheeledInvertedPendulum(gym.Env):
             accelerometer_noise: Union[np.ndarray, float] = 0.0,
             observation_bias: Union[np.ndarray, float] = 0.0,
             observation_noise: Union[np.ndarray, float] = 0.0,
+            block_size: int = 4096,
         ):
             r"""!
             Initialize uncertainties.
+
+            \param accelerometer_bias Bias vector added to accelerometer
+                measurements in the base frame.
+            \param accelerometer_noise Standard deviations of white noise
+                added to accelerometer measurements in the base frame.
+            \param observation_bias Bias vector added to state observations.
+            \param observation_noise Standard deviations of white noise added
+                to state observations.
+            \param block_size Number of steps of noise drawn at once from the
+                random number generator.
             """
+            self.__accelerometer_bank = NoiseBank(2, "normal", block_size)
+            self.__observation_bank = NoiseBank(4, "normal", block_size)
             self.accelerometer_bias = accelerometer_bias
             self.accelerometer_noise = accelerometer_noise
             self.observation_bias = observation_bias
             self.observation_noise = observation_noise
 
-        def accelerometer(self) -> np.ndarray:
+        def reset(self) -> None:
+            r"""!
+            Discard noise drawn in advance, e.g. after reseeding the random
+            number generator.
+            """
+            self.__accelerometer_bank.reset()
+            self.__observation_bank.reset()
+
+        def accelerometer(
+            self, np_random: Optional[np.random.Generator] = None
+        ) -> np.ndarray:
             r"""!
             Get accelerometer uncertainty vector.
 
+            \param np_random Random number generator to draw noise from, for
+                instance the `np_random` generator of the environment. If
+                unset, noise is drawn from NumPy's global generator.
             \return Acceleration uncertainty vector in the base frame.
             """
-            return np.random.normal(
-                loc=self.accelerometer_bias,
-                scale=self.accelerometer_noise,
-                size=(2,),
-            )
+            if np_random is None:
+                return np.random.normal(
+                    loc=self.accelerometer_bias,
+                    scale=self.accelerometer_noise,
+                    size=(2,),
+                )
+            sample = self.__accelerometer_bank.draw(np_random)
+            return self.accelerometer_bias + self.accelerometer_noise * sample
 
-        def observation(self) -> np.ndarray:
+        def observation(
+            self, np_random: Optional[np.random.Generator] = None
+        ) -> np.ndarray:
             r"""!
             Get observation uncertainty vector.
+
+            \param np_random Random number generator to draw noise from, for
+                instance the `np_random` generator of the environment. If
+                unset, noise is drawn from NumPy's global generator.
+            \return Observation uncertainty vector.
             """
-            return np.random.normal(
-                loc=self.observation_bias,
-                scale=self.observation_noise,
-                size=(4,),
-            )
+            if np_random is None:
+                return np.random.normal(
+                    loc=self.observation_bias,
+                    scale=self.observation_noise,
+                    size=(4,),
+                )
+            sample = self.__observation_bank.draw(np_random)
+            return self.observation_bias + self.observation_noise * sample
 
     def __init__(
         self,
@@ -189,6 +330,7 @@ class WheeledInvertedPendulum(gym.Env):
         frequency: float = 200.0,
         frequency_checks: bool = True,
         length: float = 0.6,
+        linearization_grid: Tuple[int, int] = (201, 41),
         max_ground_accel: float = 10.0,
         max_ground_velocity: float = 1.0,
         regulate_frequency: bool = True,
@@ -205,6 +347,10 @@ class WheeledInvertedPendulum(gym.Env):
             control loop runs slower than the desired `frequency`. Set this
             parameter to false to disable these warnings.
         \param length Length of the pole.
+        \param linearization_grid Number of pitch angles, spanning
+            [-fall_pitch, fall_pitch], and ground accelerations, spanning
+            [-max_ground_accel, max_ground_accel], in the grid of
+            linearization points used by \ref get_jacobians.
         \param max_ground_velocity Maximum commanded ground velocity in [m] /
             [s].
         \param max_ground_accel  Maximum acceleration of the ground point,
@@ -295,16 +441,22 @@ class WheeledInvertedPendulum(gym.Env):
             uncertainty = WheeledInvertedPendulum.Uncertainty()
 
         self.__accel = np.zeros(2)
+        self.__accel_clamp = ArrayClamp(
+            -max_ground_accel, max_ground_accel, "ground_acceleration"
+        )
         self.__max_ground_accel = max_ground_accel
-        self.__max_ground_velocity = max_ground_velocity
         self.__noise = np.zeros(4)
         self.__rate = rate
         self.__regulate_frequency = regulate_frequency
         self.__spine_observation = spine_observation
         self.__state = np.zeros(4)
+        self.__velocity_clamp = ArrayClamp(
+            -max_ground_velocity, max_ground_velocity, "ground_velocity"
+        )
         self.dt = dt
         self.fall_pitch = fall_pitch
         self.length = length
+        self.linearization_grid = linearization_grid
         self.model = model
         self.plot = None
         self.render_mode = render_mode
@@ -329,6 +481,10 @@ class WheeledInvertedPendulum(gym.Env):
               Upkie this is the full observation dictionary sent by the spine.
         """
         super().reset(seed=seed)
+        if seed is not None:
+            self.uncertainty.reset()
+        self.__accel_clamp.reset()
+        self.__velocity_clamp.reset()
         self.__state = np.zeros(4)
         observation = self.__state
         info = {"spine_observation": self._get_spine_observation()}
@@ -399,18 +555,8 @@ class WheeledInvertedPendulum(gym.Env):
             self.__rate.sleep()  # wait until clock tick to send the action
 
         theta_0, r_0, thetad_0, rd_0 = self.__state
-        rd_next = clamp_and_warn(
-            action[0],
-            -self.__max_ground_velocity,
-            self.__max_ground_velocity,
-            "ground_velocity",
-        )
-        rdd = clamp_and_warn(
-            (rd_next - rd_0) / self.dt,
-            -self.__max_ground_accel,
-            self.__max_ground_accel,
-            "ground_acceleration",
-        )
+        rd_next = float(self.__velocity_clamp(action[0]))
+        rdd = float(self.__accel_clamp((rd_next - rd_0) / self.dt))
         thetadd = (GRAVITY * sin(theta_0) - rdd * cos(theta_0)) / self.length
         r, rd = self._integrate(r_0, rd_0, rdd, self.dt)
         theta, thetad = self._integrate(theta_0, thetad_0, thetadd, self.dt)
@@ -425,13 +571,69 @@ class WheeledInvertedPendulum(gym.Env):
         if self.render_mode == "plot":
             self._render_plot()
 
-        observation = self.__state + self.uncertainty.observation()
+        observation = self.__state + self.uncertainty.observation(
+            self.np_random
+        )
         reward = 1.0
         terminated = self.detect_fall(theta)
         truncated = False
-        info = {"spine_observation": self._get_spine_observation()}
+        info = {
+            "action_saturations": {
+                **self.__velocity_clamp.saturations(),
+                **self.__accel_clamp.saturations(),
+            },
+            "spine_observation": self._get_spine_observation(),
+        }
         return observation, reward, terminated, truncated, info
 
+    def get_linear_model(self) -> Tuple[np.ndarray, np.ndarray]:
+        r"""!
+        Get the discrete-time linear model around the upright equilibrium.
+
+        \return Pair \f$(A, B)\f$ of read-only matrices such that \f$x_{k+1}
+            = A x_k + B u_k\f$, where \f$x\f$ is the state ordered as in
+            observations and \f$u\f$ is the ground acceleration. Matrices are
+            computed once per pair of timestep and pendulum length.
+        """
+        A, B = _jacobian_table(self.dt, self.length, 0.0, 1, 0.0, 1)
+        return A[0, 0], B[0, 0]
+
+    def get_jacobians(
+        self,
+        state: Optional[np.ndarray] = None,
+        ground_accel: float = 0.0,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        r"""!
+        Get Jacobians of the discrete-time dynamics around a state.
+
+        Jacobians are tabulated once per timestep, pendulum length and \ref
+        linearization_grid, then looked up at the grid point nearest to the
+        linearization point. This takes constant time, for instance to
+        update the linear time-varying model of an MPC problem at every
+        step. Use \ref discrete_jacobians for exact values.
+
+        \param state State to linearize around, ordered as in observations.
+            Defaults to the current state of the pendulum.
+        \param ground_accel Ground acceleration to linearize around, in [m] /
+            [s]².
+        \return Pair \f$(A, B)\f$ of read-only state and input Jacobians.
+        """
+        pitch = (self.__state if state is None else state)[0]
+        nb_pitches, nb_ground_accels = self.linearization_grid
+        max_pitch = self.fall_pitch
+        max_ground_accel = self.__max_ground_accel
+        A, B = _jacobian_table(
+            self.dt,
+            self.length,
+            max_pitch,
+            nb_pitches,
+            max_ground_accel,
+            nb_ground_accels,
+        )
+        i = _grid_index(pitch, max_pitch, nb_pitches)
+        j = _grid_index(ground_accel, max_ground_accel, nb_ground_accels)
+        return A[i, j], B[i, j]
+
     def detect_fall(self, pitch: float) -> bool:
         r"""!
         Detect a fall based on the base-to-world pitch angle.
@@ -485,7 +687,7 @@ class WheeledInvertedPendulum(gym.Env):
         proper_accel_in_world = u + rotation_base_to_world @ v
         rotation_world_to_base = rotation_base_to_world.T
         proper_accel_in_base = rotation_world_to_base @ proper_accel_in_world
-        uncertainty_in_base = self.uncertainty.accelerometer()
+        uncertainty_in_base = self.uncertainty.accelerometer(self.np_random)
         return proper_accel_in_base + uncertainty_in_base
 
     def _get_spine_observation(self):
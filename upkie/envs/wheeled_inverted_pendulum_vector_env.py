@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from typing import Any, Dict, Optional, Tuple, Union
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector.utils import batch_space
+
+from upkie.exceptions import UpkieException
+from upkie.utils.clamp import ArrayClamp
+
+from .wheeled_inverted_pendulum import GRAVITY, WheeledInvertedPendulum
+
+
+class WheeledInvertedPendulumVectorEnv(gym.vector.VectorEnv):
+    r"""!
+    Batch of wheeled inverted pendulums integrated together.
+
+    This environment holds the states of all pendulums in a single
+    `(num_envs, 4)` array and integrates them with one vectorized NumPy
+    operation per step. Its single observation and action spaces are those of
+    \ref upkie.envs.wheeled_inverted_pendulum.WheeledInvertedPendulum, and
+    each pendulum follows the same dynamics, but with its own length and
+    uncertainties.
+
+    Unlike the single-pendulum environment, this environment does not
+    regulate its frequency nor compute spine observation dictionaries: its
+    purpose is to step as fast as possible, for instance to pretrain
+    balancing policies. Infos returned by \ref reset and \ref step are empty.
+
+    Pendulums that fall or get truncated are reset at the next call to \ref
+    step, which then returns their initial observation with a zero reward.
+    This is the "next step" autoreset mode of Gymnasium vector environments.
+    """
+
+    ## \var dt
+    ## Period of the control loop in seconds.
+    dt: float
+
+    ## \var fall_pitch
+    ## Fall pitch angle, in radians.
+    fall_pitch: float
+
+    ## \var length
+    ## Lengths of the inverted pendulums, one per sub-environment.
+    length: np.ndarray
+
+    ## \var max_episode_steps
+    ## If set, number of steps after which sub-environments are truncated.
+    max_episode_steps: Optional[int]
+
+    ## \var uncertainty
+    ## Biases and noise levels on observations. Bias and noise vectors can
+    ## have shape `(4,)` to apply to all pendulums, or `(num_envs, 4)` for
+    ## per-pendulum values.
+    uncertainty: WheeledInvertedPendulum.Uncertainty
+
+    def __init__(
+        self,
+        num_envs: int,
+        fall_pitch: float = 1.0,
+        frequency: float = 200.0,
+        length: Union[float, np.ndarray] = 0.6,
+        max_episode_steps: Optional[int] = None,
+        max_ground_accel: float = 10.0,
+        max_ground_velocity: float = 1.0,
+        uncertainty: Optional[WheeledInvertedPendulum.Uncertainty] = None,
+    ):
+        r"""!
+        Initialize a new environment.
+
+        \param num_envs Number of pendulums.
+        \param fall_pitch Fall detection pitch angle, in [rad].
+        \param frequency Frequency of the simulated control loop, in Hz.
+        \param length Length of the poles, either a single value for all
+            pendulums or an array with one length per pendulum.
+        \param max_episode_steps If set, truncate episodes of sub-environments
+            after this many steps.
+        \param max_ground_accel  Maximum acceleration of the ground point,
+            in [m] / [s]².
+        \param max_ground_velocity Maximum commanded ground velocity in [m] /
+            [s].
+        \param uncertainty Uncertainty biases and noise magnitudes.
+        """
+        if num_envs < 1:
+            raise UpkieException("vector environment needs at least one env")
+        lengths = np.broadcast_to(
+            np.asarray(length, dtype=float), (num_envs,)
+        ).copy()
+        if (lengths <= 0.0).any():
+            raise UpkieException(f"pendulum lengths {lengths} should be > 0")
+
+        MAX_BASE_PITCH: float = np.pi
+        MAX_GROUND_POSITION: float = float("inf")
+        MAX_BASE_ANGULAR_VELOCITY: float = 1000.0  # rad/s
+        observation_limit = np.array(
+            [
+                MAX_BASE_PITCH,
+                MAX_GROUND_POSITION,
+                MAX_BASE_ANGULAR_VELOCITY,
+                max_ground_velocity,
+            ],
+            dtype=float,
+        )
+        action_limit = np.array([max_ground_velocity], dtype=float)
+        self.num_envs = num_envs
+        self.single_observation_space = gym.spaces.Box(
+            -observation_limit,
+            +observation_limit,
+            shape=observation_limit.shape,
+            dtype=observation_limit.dtype,
+        )
+        self.single_action_space = gym.spaces.Box(
+            -action_limit,
+            +action_limit,
+            shape=action_limit.shape,
+            dtype=action_limit.dtype,
+        )
+        self.observation_space = batch_space(
+            self.single_observation_space, num_envs
+        )
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.metadata = {"render_modes": []}
+        AutoresetMode = getattr(gym.vector, "AutoresetMode", None)
+        if AutoresetMode is not None:  # gymnasium >= 1.1
+            self.metadata["autoreset_mode"] = AutoresetMode.NEXT_STEP
+
+        if uncertainty is None:
+            uncertainty = WheeledInvertedPendulum.Uncertainty()
+
+        self.__accel = np.zeros((num_envs, 2))
+        self.__accel_clamp = ArrayClamp(
+            np.full(num_envs, -max_ground_accel),
+            np.full(num_envs, max_ground_accel),
+            "ground_acceleration",
+        )
+        self.__autoreset = np.zeros(num_envs, dtype=bool)
+        self.__episode_steps = np.zeros(num_envs, dtype=int)
+        self.__rewards = np.zeros(num_envs)
+        self.__state = np.zeros((num_envs, 4))
+        self.__terminations = np.zeros(num_envs, dtype=bool)
+        self.__truncations = np.zeros(num_envs, dtype=bool)
+        self.__velocity_clamp = ArrayClamp(
+            np.full(num_envs, -max_ground_velocity),
+            np.full(num_envs, max_ground_velocity),
+            "ground_velocity",
+        )
+        self.dt = 1.0 / frequency
+        self.fall_pitch = fall_pitch
+        self.length = lengths
+        self.max_episode_steps = max_episode_steps
+        self.uncertainty = uncertainty
+
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[dict] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        r"""!
+        Reset all pendulums to their upright equilibrium.
+
+        \param seed Number used to initialize the environment's random number
+            generator, which samples observation noise.
+        \param options Currently unused.
+        \return Batched observations and (empty) infos.
+        """
+        super().reset(seed=seed)
+        self.__accel_clamp.reset()
+        self.__autoreset[:] = False
+        self.__episode_steps[:] = 0
+        self.__state[:] = 0.0
+        self.__accel[:] = 0.0
+        self.__velocity_clamp.reset()
+        return self.__state.copy(), {}
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        r"""!
+        Integrate all pendulums over one timestep.
+
+        \param actions Batch of ground velocities, of shape `(num_envs, 1)`.
+        \return Batched observations, rewards, terminations, truncations and
+            (empty) infos.
+        """
+        dt = self.dt
+        state = self.__state
+        accel = self.__accel
+        theta_0 = state[:, 0]
+        rd_0 = state[:, 3]
+
+        rd_next = self.__velocity_clamp(
+            np.asarray(actions, dtype=float).reshape(self.num_envs)
+        )
+        rdd = self.__accel_clamp((rd_next - rd_0) / dt)
+        accel[:, 0] = (
+            GRAVITY * np.sin(theta_0) - rdd * np.cos(theta_0)
+        ) / self.length
+        accel[:, 1] = rdd
+
+        # Explicit second-order Euler integration of (theta, r)
+        state[:, :2] += dt * (state[:, 2:] + dt * (accel / 2))
+        state[:, 2:] += dt * accel
+
+        self.__episode_steps += 1
+        self.__rewards[:] = 1.0
+        np.greater(np.abs(state[:, 0]), self.fall_pitch, self.__terminations)
+        self.__truncations[:] = (
+            self.max_episode_steps is not None
+            and self.max_episode_steps <= self.__episode_steps
+        )
+
+        # Sub-environments that were done at the last step restart instead
+        resetting = self.__autoreset
+        if resetting.any():
+            state[resetting] = 0.0
+            accel[resetting] = 0.0
+            self.__episode_steps[resetting] = 0
+            self.__rewards[resetting] = 0.0
+            self.__terminations[resetting] = False
+            self.__truncations[resetting] = False
+
+        observations = state + self.np_random.normal(
+            loc=self.uncertainty.observation_bias,
+            scale=self.uncertainty.observation_noise,
+            size=state.shape,
+        )
+        observations[resetting] = 0.0
+        self.__autoreset = np.logical_or(
+            self.__terminations, self.__truncations
+        )
+        return (
+            observations,
+            self.__rewards.copy(),
+            self.__terminations.copy(),
+            self.__truncations.copy(),
+            {},
+        )
+
+    def _get_state(self) -> np.ndarray:
+        r"""!
+        Get a copy of the current internal states.
+        """
+        return self.__state.copy()
@@ -7,17 +7,23 @@
 from .add_action_to_observation import AddActionToObservation
 from .add_lag_to_action import AddLagToAction
 from .differentiate_action import DifferentiateAction
+from .history import History
 from .noisify_action import NoisifyAction
 from .noisify_observation import NoisifyObservation
+from .normalize_observation import NormalizeObservation
 from .observation_based_reward import ObservationBasedReward
 from .random_push import RandomPush
+from .record_episodes import RecordEpisodes
 
 __all__ = [
     "AddActionToObservation",
     "AddLagToAction",
     "DifferentiateAction",
+    "History",
     "NoisifyAction",
     "NoisifyObservation",
+    "NormalizeObservation",
     "ObservationBasedReward",
     "RandomPush",
+    "RecordEpisodes",
 ]
@@ -11,12 +11,12 @@ from upkie.exceptions import UpkieException
 
 
 class AddActionToObservation(gym.ObservationWrapper):
-    """!
+    r"""!
     Append last action vector to the observation vector.
 
     Can be used in combination with gymnasium.wrappers.FrameStackObservation to
-    create histories. (If there were directly a history wrapper in gymnasium we
-    wouldn't need this wrapper.)
+    create histories. See also \ref upkie.envs.wrappers.history.History, which
+    keeps both observations and actions in a preallocated buffer.
     """
 
     ## @var observation_space
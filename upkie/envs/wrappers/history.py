@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from typing import Optional, Sequence, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+from upkie.exceptions import UpkieException
+
+
+class History(gym.Wrapper):
+    r"""!
+    Observe a history of past observations and actions.
+
+    This wrapper keeps past observations and actions in a preallocated ring
+    buffer, whose rows are pairs \f$(o_t, a_{t-1})\f$ of an observation and
+    the action that led to it. Each step writes one row in place, and
+    observations of the wrapper are read from the buffer without other
+    allocations. It can replace the combination of \ref
+    upkie.envs.wrappers.add_action_to_observation.AddActionToObservation and
+    `gymnasium.wrappers.FrameStackObservation`, which copy the whole history
+    at every step.
+
+    The wrapper has two modes:
+
+    - Window mode (default): observations are arrays of shape
+      `(history_length, observation_dim + action_dim)`, with one row per
+      timestep from the oldest to the latest, possibly spaced by a `stride`.
+      These arrays are read-only views of the ring buffer: they are not
+      copied, but they are overwritten by subsequent steps.
+    - Lag mode: when `observation_lags` or `action_lags` are set,
+      observations are flat vectors concatenating the observations at the
+      prescribed lags, then the actions at the prescribed lags. A lag of zero
+      corresponds to the latest observation, or to the action passed to the
+      latest step. These vectors are gathered into a preallocated array,
+      which is also overwritten by subsequent steps.
+
+    Observations and actions are flattened. Until the history is full, past
+    observations are copies of the initial observation and past actions are
+    zero.
+    """
+
+    __buffer: np.ndarray
+    __index: int
+    __output: Optional[np.ndarray]
+
+    ## \var action_lags
+    ## Lags of past actions in lag mode, or None in window mode.
+    action_lags: Optional[Tuple[int, ...]]
+
+    ## \var history_length
+    ## Number of timesteps in window-mode observations.
+    history_length: int
+
+    ## \var observation_lags
+    ## Lags of past observations in lag mode, or None in window mode.
+    observation_lags: Optional[Tuple[int, ...]]
+
+    ## \var observation_space
+    ## Observation space.
+    observation_space: gym.spaces.Box
+
+    ## \var stride
+    ## Number of timesteps between two rows of window-mode observations.
+    stride: int
+
+    def __init__(
+        self,
+        env: gym.Env,
+        history_length: int = 1,
+        stride: int = 1,
+        observation_lags: Optional[Sequence[int]] = None,
+        action_lags: Optional[Sequence[int]] = None,
+    ):
+        r"""!
+        Initialize wrapper.
+
+        \param env Environment to wrap.
+        \param history_length Number of timesteps in window mode.
+        \param stride Number of timesteps between two consecutive rows in
+            window mode.
+        \param observation_lags If set, lags of the past observations to
+            include in lag mode. Defaults to no observation in lag mode.
+        \param action_lags If set, lags of the past actions to include in lag
+            mode. Defaults to no action in lag mode.
+        """
+        super().__init__(env)
+        observation_space = env.observation_space
+        action_space = env.action_space
+        if not isinstance(observation_space, gym.spaces.Box) or not isinstance(
+            action_space, gym.spaces.Box
+        ):
+            raise UpkieException(
+                "History wrapper only applies to Box observations and actions"
+            )
+        if observation_space.dtype != action_space.dtype:
+            raise UpkieException(
+                "Not sure which type to pick "
+                f"between {observation_space.dtype=} "
+                f"and {action_space.dtype=}"
+            )
+        if history_length < 1 or stride < 1:
+            raise UpkieException(
+                f"{history_length=} and {stride=} should be positive"
+            )
+
+        lag_mode = observation_lags is not None or action_lags is not None
+        obs_lags = tuple(observation_lags or ())
+        act_lags = tuple(action_lags or ())
+        if any(lag < 0 for lag in obs_lags + act_lags):
+            raise UpkieException("History lags should be non-negative")
+        if lag_mode and not obs_lags + act_lags:
+            raise UpkieException("History needs at least one lag")
+        capacity = (
+            1 + max(obs_lags + act_lags)
+            if lag_mode
+            else 1 + (history_length - 1) * stride
+        )
+
+        obs_low = observation_space.low.reshape(-1)
+        obs_high = observation_space.high.reshape(-1)
+        act_low = action_space.low.reshape(-1)
+        act_high = action_space.high.reshape(-1)
+        dtype = observation_space.dtype
+        if lag_mode:
+            low = np.concatenate(
+                [
+                    np.tile(obs_low, len(obs_lags)),
+                    np.tile(act_low, len(act_lags)),
+                ]
+            )
+            high = np.concatenate(
+                [
+                    np.tile(obs_high, len(obs_lags)),
+                    np.tile(act_high, len(act_lags)),
+                ]
+            )
+        else:
+            low = np.tile(
+                np.concatenate([obs_low, act_low]), (history_length, 1)
+            )
+            high = np.tile(
+                np.concatenate([obs_high, act_high]), (history_length, 1)
+            )
+        self.observation_space = gym.spaces.Box(
+            low=low,
+            high=high,
+            shape=low.shape,
+            dtype=dtype,
+        )
+
+        # Rows are written twice, at index and index + capacity, so that the
+        # last capacity rows are always contiguous in the buffer
+        self.__buffer = np.zeros(
+            (2 * capacity, obs_low.size + act_low.size), dtype=dtype
+        )
+        self.__capacity = capacity
+        self.__index = 0
+        self.__obs_dim = obs_low.size
+        self.__output = np.empty(low.shape, dtype=dtype) if lag_mode else None
+        self.action_lags = act_lags if lag_mode else None
+        self.history_length = history_length
+        self.observation_lags = obs_lags if lag_mode else None
+        self.stride = stride
+
+    def reset(self, **kwargs) -> Tuple[np.ndarray, dict]:
+        r"""!
+        Reset the environment and fill the history with its initial
+        observation.
+
+        \param kwargs Keyword arguments forwarded to the wrapped environment.
+        \return Initial history and info dictionary from the wrapped
+            environment.
+        """
+        observation, info = self.env.reset(**kwargs)
+        buffer = self.__buffer
+        buffer[:, : self.__obs_dim] = np.reshape(observation, -1)
+        buffer[:, self.__obs_dim :] = 0.0
+        self.__index = 0
+        return self.__observe(), info
+
+    def step(
+        self, action: np.ndarray
+    ) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        r"""!
+        Step the environment and append the new observation and action to the
+        history.
+
+        \param action Action from the agent.
+        \return Tuple with (observation, reward, terminated, truncated, info)
+            where the observation is the updated history.
+        """
+        observation, reward, terminated, truncated, info = self.env.step(
+            action
+        )
+        buffer, capacity, obs_dim = (
+            self.__buffer,
+            self.__capacity,
+            self.__obs_dim,
+        )
+        index = (self.__index + 1) % capacity
+        row = buffer[index + capacity]
+        row[:obs_dim] = np.reshape(observation, -1)
+        row[obs_dim:] = np.reshape(action, -1)
+        buffer[index] = row
+        self.__index = index
+        return self.__observe(), reward, terminated, truncated, info
+
+    def __observe(self) -> np.ndarray:
+        r"""!
+        Read the current history from the ring buffer.
+
+        \return Window view of the buffer, or gathered lags.
+        """
+        buffer, capacity, obs_dim = (
+            self.__buffer,
+            self.__capacity,
+            self.__obs_dim,
+        )
+        latest = self.__index + capacity  # row of the latest observation
+        if self.__output is None:  # window mode
+            window = buffer[latest + 1 - capacity : latest + 1 : self.stride]
+            window = window.view()
+            window.flags.writeable = False
+            return window
+        output = self.__output
+        offset = 0
+        for lag in self.observation_lags:
+            output[offset : offset + obs_dim] = buffer[latest - lag, :obs_dim]
+            offset += obs_dim
+        for lag in self.action_lags:
+            action = buffer[latest - lag, obs_dim:]
+            output[offset : offset + action.size] = action
+            offset += action.size
+        return output
@@ -6,10 +6,13 @@
 
 """Add noise to the action of an environment."""
 
+from typing import Optional
+
 import gymnasium as gym
 import numpy as np
 
 from upkie.exceptions import UpkieException
+from upkie.utils.noise_bank import NoiseBank
 
 
 class NoisifyAction(gym.ActionWrapper):
@@ -25,12 +28,14 @@ class NoisifyAction(gym.ActionWrapper):
     ## Lower bound on action noise.
     low: np.ndarray
 
-    def __init__(self, env, noise: np.ndarray):
+    def __init__(self, env, noise: np.ndarray, block_size: int = 4096):
         r"""!
         Create wrapper.
 
         \param env Environment to wrap.
         \param noise Noise level.
+        \param block_size Number of steps of noise drawn at once from the
+            random number generator of the environment.
         """
         super().__init__(env)
         if noise.shape != env.action_space.shape:
@@ -38,9 +43,23 @@ class NoisifyAction(gym.ActionWrapper):
                 f"Action {noise.shape=} does not "
                 f"match {env.action_space.shape=}"
             )
+        self.__noise_bank = NoiseBank(noise.shape, "uniform", block_size)
         self.high = +np.abs(noise)
         self.low = -np.abs(noise)
 
+    def reset(self, *, seed: Optional[int] = None, options=None):
+        r"""!
+        Reset the environment.
+
+        \param seed Seed forwarded to the wrapped environment. When set, noise
+            drawn in advance is discarded so that subsequent noise only
+            depends on this seed.
+        \param options Options forwarded to the wrapped environment.
+        """
+        if seed is not None:
+            self.__noise_bank.reset()
+        return super().reset(seed=seed, options=options)
+
     def action(self, action: np.ndarray) -> np.ndarray:
         r"""!
         Get the noisy action.
@@ -48,7 +67,8 @@ class NoisifyAction(gym.ActionWrapper):
         \param action Original action.
         \return Noisy action.
         """
-        noise = self.np_random.uniform(low=self.low, high=self.high)
+        sample = self.__noise_bank.draw(self.np_random)
+        noise = self.low + (self.high - self.low) * sample
         noisy_action = np.clip(
             action + noise,
             self.env.action_space.low,
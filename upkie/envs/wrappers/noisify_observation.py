@@ -4,10 +4,13 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2023 Inria
 
+from typing import Optional
+
 import gymnasium as gym
 import numpy as np
 
 from upkie.exceptions import UpkieException
+from upkie.utils.noise_bank import NoiseBank
 
 
 class NoisifyObservation(gym.ObservationWrapper):
@@ -23,12 +26,14 @@ class NoisifyObservation(gym.ObservationWrapper):
     ## Lower bound on observation noise.
     low: np.ndarray
 
-    def __init__(self, env, noise: np.ndarray):
+    def __init__(self, env, noise: np.ndarray, block_size: int = 4096):
         r"""!
         Create wrapper.
 
         \param env Environment to wrap.
         \param noise Noise level.
+        \param block_size Number of steps of noise drawn at once from the
+            random number generator of the environment.
         """
         super().__init__(env)
         if noise.shape != env.observation_space.shape:
@@ -36,9 +41,23 @@ class NoisifyObservation(gym.ObservationWrapper):
                 f"Observation {noise.shape=} does not "
                 f"match {env.observation_space.shape=}"
             )
+        self.__noise_bank = NoiseBank(noise.shape, "uniform", block_size)
         self.high = +np.abs(noise)
         self.low = -np.abs(noise)
 
+    def reset(self, *, seed: Optional[int] = None, options=None):
+        r"""!
+        Reset the environment.
+
+        \param seed Seed forwarded to the wrapped environment. When set, noise
+            drawn in advance is discarded so that subsequent noise only
+            depends on this seed.
+        \param options Options forwarded to the wrapped environment.
+        """
+        if seed is not None:
+            self.__noise_bank.reset()
+        return super().reset(seed=seed, options=options)
+
     def observation(self, observation: np.ndarray) -> np.ndarray:
         r"""!
         Get noisy observation.
@@ -46,7 +65,8 @@ class NoisifyObservation(gym.ObservationWrapper):
         \param observation Noise-less observation.
         \return Noisy observation.
         """
-        noise = self.np_random.uniform(low=self.low, high=self.high)
+        sample = self.__noise_bank.draw(self.np_random)
+        noise = self.low + (self.high - self.low) * sample
         noisy_observation = np.clip(
             observation + noise,
             self.env.observation_space.low,
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+import time
+import zlib
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+from upkie.exceptions import UpkieException
+
+## \var STATISTICS_MAGIC
+## Magic number at the beginning of blocks of observation statistics.
+STATISTICS_MAGIC: int = int.from_bytes(b"upkienrm", "little")
+
+## \var HEADER_SIZE
+## Number of 64-bit words in the header of statistics blocks: magic number,
+## observation dimension and number of workers.
+HEADER_SIZE: int = 3
+
+
+def _statistics_nbytes(dim: int, nb_workers: int) -> int:
+    r"""!
+    Get the size of a block of observation statistics.
+
+    \param dim Dimension of flattened observations.
+    \param nb_workers Number of workers sharing statistics.
+    \return Size of the block in bytes.
+    """
+    slot_size = 3 + 2 * dim  # sequence, checksum, count, mean, m2
+    return (HEADER_SIZE + nb_workers * slot_size) * 8
+
+
+def _slots_array(buffer, dim: int, nb_workers: int) -> np.ndarray:
+    r"""!
+    Get the array of worker slots in a block of observation statistics.
+
+    \param buffer Buffer of the block.
+    \param dim Dimension of flattened observations.
+    \param nb_workers Number of workers sharing statistics.
+    \return Array of shape `(nb_workers, 3 + 2 * dim)` backed by the buffer.
+    """
+    return np.ndarray(
+        (nb_workers, 3 + 2 * dim),
+        dtype=np.float64,
+        buffer=buffer,
+        offset=8 * HEADER_SIZE,
+    )
+
+
+def _init_statistics(buffer, dim: int, nb_workers: int) -> None:
+    r"""!
+    Initialize a zero-filled block of observation statistics.
+
+    \param buffer Buffer of the block.
+    \param dim Dimension of flattened observations.
+    \param nb_workers Number of workers sharing statistics.
+    """
+    slots = _slots_array(buffer, dim, nb_workers)
+    slots[:, 1] = zlib.crc32(slots[0, 2:].tobytes())
+    header = np.ndarray((HEADER_SIZE,), dtype=np.uint64, buffer=buffer)
+    header[1] = dim
+    header[2] = nb_workers
+    header[0] = STATISTICS_MAGIC  # written last: block is ready
+
+
+def _open_statistics(
+    shm_name: str, dim: int, nb_workers: int, timeout: float = 1.0
+) -> Tuple[SharedMemory, bool]:
+    r"""!
+    Create or attach to the shared-memory block of observation statistics.
+
+    \param shm_name Name of the shared-memory block.
+    \param dim Dimension of flattened observations.
+    \param nb_workers Number of workers sharing statistics.
+    \param timeout Time in seconds to wait for another process to size the
+        block and write its header after creating it.
+    \return Shared memory, and whether this process created it.
+    \throw UpkieException If an existing block does not hold statistics for
+        the same observation dimension and number of workers.
+    """
+    shm_name = shm_name.lstrip("/")
+    nbytes = _statistics_nbytes(dim, nb_workers)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            shared_memory = SharedMemory(shm_name, create=True, size=nbytes)
+            created = True
+            break
+        except FileExistsError:
+            pass
+        try:
+            shared_memory = SharedMemory(shm_name, create=False)
+            created = False
+            break
+        except ValueError:  # created but not sized yet
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(1e-3)
+        except FileNotFoundError:  # unlinked in the meantime, create it
+            continue
+    # Statistics should outlive the processes of workers, which all share the
+    # same resource tracker, see also upkie.spine.wait_for_shared_memory
+    resource_tracker.unregister(shared_memory._name, "shared_memory")
+    if created:
+        _init_statistics(shared_memory.buf, dim, nb_workers)
+        return shared_memory, created
+    header = np.ndarray(
+        (HEADER_SIZE,), dtype=np.uint64, buffer=shared_memory.buf
+    )
+    # Header words are written one by one, but each of them is either zero
+    # or its final value
+    while not header.all() and time.monotonic() < deadline:
+        time.sleep(1e-3)
+    magic, block_dim, block_workers = (int(word) for word in header)
+    del header
+    if (magic, block_dim, block_workers) != (
+        STATISTICS_MAGIC,
+        dim,
+        nb_workers,
+    ):
+        shared_memory.close()
+        raise UpkieException(
+            f"Shared memory /{shm_name} does not hold statistics for "
+            f"{dim=} and {nb_workers=} (header: {magic=:#x}, "
+            f"dim={block_dim}, nb_workers={block_workers})"
+        )
+    return shared_memory, created
+
+
+class NormalizeObservation(gym.ObservationWrapper):
+    r"""!
+    Normalize observations with running statistics shared across processes.
+
+    Observations are normalized by the running mean and variance of all
+    observations seen by a group of workers, for instance environments
+    running in separate processes for training. Statistics are stored in a
+    shared-memory block with one slot per worker, holding the count, mean
+    and sum of squared deviations (Welford accumulators) of the observations
+    of this worker. The block starts with a header recording the observation
+    dimension and number of workers, checked by workers attaching to it.
+
+    Each slot only has one writer, so that workers don't need locks: a
+    sequence counter in each slot lets readers detect concurrent writes and
+    retry. Python has no memory barriers, so that other processors may see
+    these writes in a different order, for instance on ARM. Slots therefore
+    also hold a CRC32 checksum of their statistics, and readers only accept
+    a copy whose sequence number is even, unchanged after copying, and whose
+    checksum matches.
+
+    Workers buffer their observations locally and merge them into their slot
+    every `update_period` steps, at which point they also recompute the
+    normalization from all slots. Set \ref frozen to stop updating
+    statistics, for instance when deploying a trained policy.
+    """
+
+    __batch: np.ndarray
+    __batch_size: int
+    __inv_std: np.ndarray
+    __mean: np.ndarray
+    __shared_memory: Optional[SharedMemory]
+    __slots: np.ndarray
+    __steps: int
+
+    ## \var epsilon
+    ## Small value added to variances to avoid dividing by zero.
+    epsilon: float
+
+    ## \var frozen
+    ## If set, observations don't update the statistics any more.
+    frozen: bool
+
+    ## \var observation_space
+    ## Observation space.
+    observation_space: gym.spaces.Box
+
+    ## \var update_period
+    ## Number of steps between two merges of local observations into the
+    ## shared statistics.
+    update_period: int
+
+    ## \var worker_index
+    ## Index of the slot this wrapper writes its statistics to.
+    worker_index: int
+
+    def __init__(
+        self,
+        env: gym.Env,
+        shm_name: Optional[str] = None,
+        nb_workers: int = 1,
+        worker_index: int = 0,
+        update_period: int = 100,
+        epsilon: float = 1e-8,
+        frozen: bool = False,
+    ):
+        r"""!
+        Initialize wrapper.
+
+        \param env Environment to wrap.
+        \param shm_name Name of the shared-memory block holding statistics.
+            The first worker creates it, others attach to it. If None,
+            statistics are kept in private memory.
+        \param nb_workers Number of workers sharing statistics.
+        \param worker_index Index of this worker, between 0 and `nb_workers -
+            1`. Each worker should have a different index.
+        \param update_period Number of steps between two merges of local
+            observations into the shared statistics.
+        \param epsilon Small value added to variances to avoid dividing by
+            zero.
+        \param frozen If set, don't update statistics.
+        """
+        super().__init__(env)
+        if not isinstance(env.observation_space, gym.spaces.Box):
+            raise UpkieException(
+                "NormalizeObservation only applies to Box observations"
+            )
+        if not 0 <= worker_index < nb_workers:
+            raise UpkieException(f"{worker_index=} not in [0, {nb_workers=})")
+        if update_period < 1:
+            raise UpkieException(f"{update_period=} should be positive")
+        shape = env.observation_space.shape
+        dim = int(np.prod(shape))
+        created = False
+        shared_memory = None
+        if shm_name is not None:
+            shared_memory, created = _open_statistics(
+                shm_name, dim, nb_workers
+            )
+            buffer = shared_memory.buf
+        else:
+            buffer = bytearray(_statistics_nbytes(dim, nb_workers))
+            _init_statistics(buffer, dim, nb_workers)
+        self.observation_space = gym.spaces.Box(
+            low=-np.inf,
+            high=np.inf,
+            shape=shape,
+            dtype=env.observation_space.dtype,
+        )
+        self.__batch = np.empty((update_period, dim))
+        self.__batch_size = 0
+        self.__created = created
+        self.__dim = dim
+        self.__inv_std = np.ones(dim)
+        self.__mean = np.zeros(dim)
+        self.__shared_memory = shared_memory
+        self.__slots = _slots_array(buffer, dim, nb_workers)
+        self.__steps = 0
+        self.epsilon = epsilon
+        self.frozen = frozen
+        self.update_period = update_period
+        self.worker_index = worker_index
+        self.__update_normalization()
+
+    @property
+    def mean(self) -> np.ndarray:
+        r"""!
+        Mean observation used for normalization.
+        """
+        return self.__mean.reshape(self.observation_space.shape)
+
+    @property
+    def var(self) -> np.ndarray:
+        r"""!
+        Observation variance used for normalization.
+        """
+        return (1.0 / self.__inv_std**2 - self.epsilon).reshape(
+            self.observation_space.shape
+        )
+
+    def observation(self, observation: np.ndarray) -> np.ndarray:
+        r"""!
+        Normalize an observation.
+
+        \param observation Observation from the wrapped environment.
+        \return Normalized observation.
+        """
+        flat_observation = np.reshape(observation, -1)
+        if not self.frozen:
+            self.__batch[self.__batch_size] = flat_observation
+            self.__batch_size += 1
+            if self.__batch_size >= self.update_period:
+                self.__merge_batch()
+        self.__steps += 1
+        if self.__steps >= self.update_period:
+            self.__update_normalization()
+        normalized = (flat_observation - self.__mean) * self.__inv_std
+        return normalized.reshape(observation.shape).astype(
+            self.observation_space.dtype
+        )
+
+    def set_statistics(
+        self, mean: np.ndarray, var: np.ndarray, count: float = 1.0
+    ) -> None:
+        r"""!
+        Replace the statistics of this worker, for instance to deploy a
+        policy with the statistics it was trained with.
+
+        \param mean Mean observation.
+        \param var Observation variance.
+        \param count Number of observations these statistics account for.
+        """
+        self.__batch_size = 0
+        self.__write_slot(
+            count,
+            np.reshape(mean, -1),
+            np.reshape(var, -1) * count,
+        )
+        self.__update_normalization()
+
+    def close(self) -> None:
+        r"""!
+        Close the wrapped environment and detach from shared statistics.
+
+        The worker that created the shared-memory block also unlinks it.
+        """
+        if self.__shared_memory is not None:
+            self.__slots = None
+            self.__shared_memory.close()
+            if self.__created:  # unlink unregisters from the tracker
+                resource_tracker.register(
+                    self.__shared_memory._name, "shared_memory"
+                )
+                self.__shared_memory.unlink()
+            self.__shared_memory = None
+        super().close()
+
+    def __merge_batch(self) -> None:
+        r"""!
+        Merge locally buffered observations into the slot of this worker.
+        """
+        batch = self.__batch[: self.__batch_size]
+        self.__batch_size = 0
+        slot = self.__slots[self.worker_index]
+        dim = self.__dim
+        count_a = slot[2]
+        mean_a = slot[3 : 3 + dim]
+        m2_a = slot[3 + dim :]
+        count_b = batch.shape[0]
+        mean_b = batch.mean(axis=0)
+        m2_b = np.square(batch - mean_b).sum(axis=0)
+        count = count_a + count_b
+        delta = mean_b - mean_a
+        self.__write_slot(
+            count,
+            mean_a + delta * (count_b / count),
+            m2_a + m2_b + np.square(delta) * (count_a * count_b / count),
+        )
+
+    def __write_slot(
+        self, count: float, mean: np.ndarray, m2: np.ndarray
+    ) -> None:
+        r"""!
+        Write the statistics of this worker to its slot.
+
+        \param count Number of observations.
+        \param mean Mean observation.
+        \param m2 Sum of squared deviations from the mean.
+        """
+        slot = self.__slots[self.worker_index]
+        dim = self.__dim
+        slot[0] += 1.0  # odd sequence number: write in progress
+        slot[2] = count
+        slot[3 : 3 + dim] = mean
+        slot[3 + dim :] = m2
+        slot[1] = zlib.crc32(slot[2:].tobytes())
+        slot[0] += 1.0
+
+    def __read_slots(self, retries: int = 1000) -> np.ndarray:
+        r"""!
+        Read a consistent copy of all slots.
+
+        \param retries Number of times to retry reading a slot that is being
+            written to.
+        \return Copy of the slots array.
+        \throw UpkieException If a slot is still inconsistent after all
+            retries, for instance because its worker died while writing it.
+        """
+        slots = self.__slots.copy()
+        for i in range(slots.shape[0]):
+            for _ in range(retries):
+                slot = slots[i]
+                sequence = slot[0]
+                if (
+                    sequence % 2.0 == 0.0
+                    and self.__slots[i, 0] == sequence
+                    and slot[1] == zlib.crc32(slot[2:].tobytes())
+                ):
+                    break
+                time.sleep(0.0)  # yield to the writer
+                slots[i] = self.__slots[i]
+            else:  # no break
+                raise UpkieException(
+                    f"Statistics of worker {i} are still being written to "
+                    f"after {retries} reads"
+                )
+        return slots
+
+    def __update_normalization(self) -> None:
+        r"""!
+        Recompute normalization from the statistics of all workers.
+        """
+        self.__steps = 0
+        slots = self.__read_slots()
+        dim = self.__dim
+        counts = slots[:, 2]
+        total = counts.sum()
+        if total < 1.0:
+            return
+        means = slots[:, 3 : 3 + dim]
+        mean = counts @ means / total
+        m2 = slots[:, 3 + dim :].sum(axis=0) + counts @ np.square(means - mean)
+        self.__mean[:] = mean
+        self.__inv_std[:] = 1.0 / np.sqrt(m2 / total + self.epsilon)
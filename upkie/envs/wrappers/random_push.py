@@ -4,66 +4,154 @@
 # SPDX-License-Identifier: Apache-2.0
 # Copyright 2024 Inria
 
+from typing import Callable, Optional, Sequence, Tuple
+
 import numpy as np
 from gymnasium import Env, Wrapper
 
+from upkie.exceptions import UpkieException
+
 
 class RandomPush(Wrapper):
-    """!
-    At each step, with a given probability, apply a random push to the robot.
+    r"""!
+    Apply random pushes to the robot at random times.
+
+    Pushes start at each step with a given probability, that is, the number
+    of steps between two pushes follows a geometric distribution. Rather than
+    drawing at every step, the wrapper samples the step of the next push
+    when the environment is reset and after each push.
+
+    Each push lasts as many steps as its profile, a sequence of factors
+    applied to the push force at each step. External forces are sent to the
+    Bullet spine by \ref upkie.envs.upkie_base_env.UpkieBaseEnv.bullet_extra
+    only when they change, typically when a push starts and ends, since the
+    spine keeps applying the last force it received. They are merged under
+    the "torso" body, so that external forces on other bodies queued for the
+    same step are sent as well. As Bullet actions are not
+    sent in schema mode, the first push then raises an exception.
     """
 
+    __force: np.ndarray
+    __push_force: np.ndarray
+    __push_step: Optional[int]
+    __steps_to_push: float
+
     ## \var env
     ## Wrapped environment.
     env: Env
 
-    # Internal reference to unwrapped get_spine_action function.
-    _env_get_spine_action: callable
-
     ## \var push_generator
     ## Function that generates the push force. It should return a 3D numpy
-    ## array.
-    push_generator: callable
+    ## array. If None, forces are sampled from a normal distribution with
+    ## standard deviation 400 N, using the random number generator of the
+    ## environment.
+    push_generator: Optional[Callable[[], np.ndarray]]
 
     ## \var push_prob
-    ## Probability of pushing at each step.
+    ## Probability of starting a push at each step.
     push_prob: float
 
+    ## \var push_profile
+    ## Factors applied to the push force at each step of a push.
+    push_profile: Tuple[float, ...]
+
     def __init__(
         self,
         env,
-        push_prob=0.01,
-        push_generator=lambda: np.random.normal(0, 400, 3),
+        push_prob: float = 0.01,
+        push_generator: Optional[Callable[[], np.ndarray]] = None,
+        push_profile: Sequence[float] = (1.0,),
     ):
         r"""!
         Initialize wrapper.
 
         \param env Environment to wrap.
-        \param push_prob Probability of pushing at each step.
-        \param push_generator Function that generates the push force. It should
-            return a 3D numpy array.
+        \param push_prob Probability of starting a push at each step.
+        \param push_generator Function that generates the push force. It
+            should return a 3D numpy array. Defaults to normal forces with
+            standard deviation 400 N.
+        \param push_profile Factors applied to the push force at each step of
+            a push. For instance, `(1.0,) * 5` pushes with a constant force
+            for five steps, and `(0.5, 1.0, 0.5)` ramps the force up and
+            down.
+        \throw UpkieException If the environment has no `bullet_extra`
+            method or the push profile is empty.
         """
         super().__init__(env)
+        if not hasattr(self.env.unwrapped, "bullet_extra"):
+            raise UpkieException(
+                "The environment must have a method bullet_extra"
+            )
+        if len(push_profile) < 1:
+            raise UpkieException("Push profile should have at least one step")
+        self.__force = np.zeros(3)
+        self.__payload = {
+            "external_forces": {"torso": {"force": self.__force}}
+        }
+        self.__push_force = np.zeros(3)
+        self.__push_step = None
+        self.__steps_to_push = np.inf
         self.env = env
-        self.push_prob = push_prob
         self.push_generator = push_generator
-        if not hasattr(self.env, "get_spine_action"):
-            raise ValueError(
-                "The environment must have a method get_spine_action"
-            )
-        self._env_get_spine_action = self.env.get_spine_action
-        self.env.unwrapped.get_spine_action = self.get_spine_action
-
-    def get_spine_action(self, action):
-        """Adds a random push to the action."""
-        spine_action = self._env_get_spine_action(action)
-        if np.random.binomial(1, self.push_prob):
-            force = self.push_generator()
-            spine_action["bullet"] = {
-                "external_forces": {"torso": {"force": force}}
-            }
-        else:  # Reset the forces to zero
-            spine_action["bullet"] = {
-                "external_forces": {"torso": {"force": np.zeros(3)}}
-            }
-        return spine_action
+        self.push_prob = push_prob
+        self.push_profile = tuple(push_profile)
+
+    def reset(self, **kwargs):
+        r"""!
+        Reset the environment and sample the step of the first push.
+
+        \param kwargs Keyword arguments forwarded to the wrapped environment.
+        \return Observation and info dictionary from the wrapped environment.
+        """
+        observation, info = self.env.reset(**kwargs)
+        if self.__push_step is not None or self.__force.any():
+            self.__push_step = len(self.push_profile)  # release at next step
+        self.__sample_next_push()
+        return observation, info
+
+    def step(self, action):
+        r"""!
+        Step the environment, pushing the robot if a push is scheduled.
+
+        \param action Action from the agent.
+        \return Tuple with (observation, reward, terminated, truncated, info).
+        """
+        if self.__push_step is None:
+            self.__steps_to_push -= 1
+            if self.__steps_to_push <= 0:
+                self.__push_force[:] = (
+                    self.push_generator()
+                    if self.push_generator is not None
+                    else self.np_random.normal(0.0, 400.0, 3)
+                )
+                self.__push_step = 0
+        if self.__push_step is not None:
+            self.__update_push()
+        return self.env.step(action)
+
+    def __sample_next_push(self) -> None:
+        r"""!
+        Sample the number of steps until the next push starts.
+        """
+        self.__steps_to_push = (
+            self.np_random.geometric(self.push_prob)
+            if self.push_prob > 0.0
+            else np.inf
+        )
+
+    def __update_push(self) -> None:
+        r"""!
+        Send the force of the current push step if it changed.
+        """
+        profile, step = self.push_profile, self.__push_step
+        if step < len(profile):
+            if step == 0 or profile[step] != profile[step - 1]:
+                np.multiply(profile[step], self.__push_force, out=self.__force)
+                self.env.unwrapped.bullet_extra(self.__payload)
+            self.__push_step = step + 1
+            return
+        self.__force[:] = 0.0
+        self.env.unwrapped.bullet_extra(self.__payload)
+        self.__push_step = None
+        if self.__steps_to_push <= 0:
+            self.__sample_next_push()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+import json
+import os
+import queue
+import shutil
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+from upkie.exceptions import UpkieException
+
+## \var SEGMENT_METADATA
+## Name of the file holding the number of recorded rows of a segment.
+SEGMENT_METADATA: str = "segment.json"
+
+
+def _flat_shape(space: gym.Space) -> Tuple[Tuple[int, ...], np.dtype]:
+    r"""!
+    Get the shape and data type of recorded elements of a space.
+
+    \param space Observation or action space.
+    \return Shape and data type of the arrays recorded for this space. Box
+        elements are recorded as is, other elements are flattened.
+    """
+    if isinstance(space, gym.spaces.Box):
+        return space.shape, space.dtype
+    flat_space = gym.spaces.flatten_space(space)
+    return flat_space.shape, flat_space.dtype
+
+
+def _write_length(path: str, length: int) -> None:
+    r"""!
+    Write the number of recorded rows of a segment.
+
+    \param path Path to the segment directory.
+    \param length Number of recorded rows.
+    """
+    metadata_path = os.path.join(path, SEGMENT_METADATA)
+    with open(f"{metadata_path}.tmp", "w") as file:
+        json.dump({"length": length}, file)
+    os.replace(f"{metadata_path}.tmp", metadata_path)
+
+
+class RecordEpisodes(gym.Wrapper):
+    r"""!
+    Record episodes to memory-mapped NumPy arrays.
+
+    Each step appends one row to the following columns:
+
+    - `observation`: observation the action was computed from.
+    - `action`: action passed to `step`.
+    - `next_observation`: observation returned by `step`.
+    - `reward`: reward returned by `step`.
+    - `terminated`: termination flag returned by `step`.
+    - `truncated`: truncation flag returned by `step`.
+    - `episode`: index of the episode, counted from zero at the first reset.
+    - `spine_observation.<field>`: value of each selected field of the spine
+      observation returned in `info`, e.g. `spine_observation.imu.orientation`
+      for the field `"imu.orientation"`.
+
+    Observations and actions from non-Box spaces are flattened. Columns are
+    written to `.npy` files preallocated in segment directories
+    (`segment_00000`, `segment_00001`, ...) of the output directory. A new
+    segment starts whenever the current one is full. Steps only copy values
+    to memory-mapped files: a background thread periodically flushes them to
+    disk, records the number of valid rows of each segment, and preallocates
+    the next segment in advance so that steps don't create files when they
+    switch segments. Recorded columns can be loaded with \ref load.
+    """
+
+    __columns: Dict[str, np.ndarray]
+    __episode: int
+    __observation: Optional[np.ndarray]
+    __row: int
+    __segment_index: int
+
+    ## \var directory
+    ## Output directory.
+    directory: str
+
+    ## \var segment_length
+    ## Number of rows in each segment.
+    segment_length: int
+
+    ## \var spine_fields
+    ## Fields of the spine observation recorded at each step, as dot-separated
+    ## key paths.
+    spine_fields: Tuple[str, ...]
+
+    def __init__(
+        self,
+        env: gym.Env,
+        directory: str,
+        segment_length: int = 65536,
+        spine_fields: Sequence[str] = (),
+        flush_period: float = 1.0,
+    ):
+        r"""!
+        Initialize wrapper.
+
+        \param env Environment to wrap.
+        \param directory Output directory, created if it does not exist. It
+            should be empty, so that the recording does not overwrite
+            previous ones.
+        \param segment_length Number of rows preallocated in each segment.
+        \param spine_fields Fields of the spine observation to record, as
+            dot-separated key paths such as `"base_orientation.pitch"`.
+        \param flush_period Period in seconds at which recorded rows are
+            flushed to disk.
+        \throw UpkieException If the output directory is not empty.
+        """
+        super().__init__(env)
+        if segment_length < 1:
+            raise UpkieException(f"{segment_length=} should be positive")
+        os.makedirs(directory, exist_ok=True)
+        if os.listdir(directory):
+            raise UpkieException(f"Output directory {directory} is not empty")
+        self.__columns = {}
+        self.__episode = -1
+        self.__flush_period = flush_period
+        self.__lock = threading.Lock()
+        self.__observation = None
+        self.__queue = queue.Queue()
+        self.__row = 0
+        self.__segment_index = -1
+        self.__segment_path = None
+        self.__spares = queue.Queue()
+        self.__spine_keys = [tuple(field.split(".")) for field in spine_fields]
+        self.__thread = None
+        self.directory = directory
+        self.segment_length = segment_length
+        self.spine_fields = tuple(spine_fields)
+
+    def reset(self, **kwargs) -> Tuple[np.ndarray, dict]:
+        r"""!
+        Reset the environment and start a new episode.
+
+        \param kwargs Keyword arguments forwarded to the wrapped environment.
+        \return Observation and info dictionary from the wrapped environment.
+        """
+        observation, info = self.env.reset(**kwargs)
+        if self.__thread is None:
+            self.__start(info)
+        self.__episode += 1
+        self.__observation = np.array(
+            self.__flatten(self.observation_space, observation)
+        )  # copy as environments may update their observation in place
+        return observation, info
+
+    def step(
+        self, action: np.ndarray
+    ) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        r"""!
+        Step the environment and record the transition.
+
+        \param action Action from the agent.
+        \return Tuple with (observation, reward, terminated, truncated, info).
+            See \ref upkie.envs.upkie_base_env.UpkieBaseEnv.step for details.
+        """
+        if self.__observation is None:
+            raise UpkieException("call `reset` before `step`")
+        observation, reward, terminated, truncated, info = self.env.step(
+            action
+        )
+        if self.__row >= self.segment_length:
+            self.__next_segment()
+        row, columns = self.__row, self.__columns
+        columns["observation"][row] = self.__observation
+        columns["action"][row] = self.__flatten(self.action_space, action)
+        next_observation = columns["next_observation"][row]
+        next_observation[...] = self.__flatten(
+            self.observation_space, observation
+        )
+        columns["reward"][row] = reward
+        columns["terminated"][row] = terminated
+        columns["truncated"][row] = truncated
+        columns["episode"][row] = self.__episode
+        if self.__spine_keys:
+            spine_observation = info["spine_observation"]
+            for field, keys in zip(self.spine_fields, self.__spine_keys):
+                value = spine_observation
+                for key in keys:
+                    value = value[key]
+                columns[f"spine_observation.{field}"][row] = value
+        self.__row = row + 1
+        self.__observation[...] = next_observation
+        return observation, reward, terminated, truncated, info
+
+    def close(self) -> None:
+        """!
+        Flush recorded rows to disk and close the wrapped environment.
+
+        Resetting the wrapper after closing it resumes the recording in a new
+        segment.
+        """
+        if self.__thread is not None:
+            with self.__lock:
+                self.__queue.put(
+                    ("flush", self.__segment_path, self.__columns, self.__row)
+                )
+                self.__queue.put(None)
+                self.__columns = {}
+            self.__thread.join()
+            self.__thread = None
+            while not self.__spares.empty():  # discard unused segments
+                spare = self.__spares.get()
+                if isinstance(spare, Exception):
+                    continue
+                path, columns = spare
+                del columns
+                shutil.rmtree(path)
+        super().close()
+
+    @staticmethod
+    def load(directory: str) -> Dict[str, np.ndarray]:
+        r"""!
+        Load columns recorded in a directory.
+
+        \param directory Output directory of a recording.
+        \return Dictionary from column names to arrays, with one row per
+            recorded step. Columns of single-segment recordings are read-only
+            memory maps, while columns of longer recordings are concatenated.
+        """
+        segments: Dict[str, List[np.ndarray]] = {}
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            metadata_path = os.path.join(path, SEGMENT_METADATA)
+            if not name.startswith("segment_") or not os.path.exists(
+                metadata_path
+            ):
+                continue
+            with open(metadata_path) as file:
+                length = json.load(file)["length"]
+            for filename in os.listdir(path):
+                if not filename.endswith(".npy"):
+                    continue
+                column = np.load(os.path.join(path, filename), mmap_mode="r")
+                segments.setdefault(filename[:-4], []).append(column[:length])
+        return {
+            name: parts[0] if len(parts) == 1 else np.concatenate(parts)
+            for name, parts in segments.items()
+        }
+
+    def __flatten(self, space: gym.Space, value) -> np.ndarray:
+        if isinstance(space, gym.spaces.Box):
+            return value
+        return gym.spaces.flatten(space, value)
+
+    def __start(self, info: dict) -> None:
+        r"""!
+        Determine column layouts and start the flushing thread.
+
+        \param info Info dictionary returned by the first reset, used to find
+            the shapes of spine observation fields.
+        """
+        observation_shape, observation_dtype = _flat_shape(
+            self.observation_space
+        )
+        action_shape, action_dtype = _flat_shape(self.action_space)
+        layout = {
+            "observation": (observation_shape, observation_dtype),
+            "action": (action_shape, action_dtype),
+            "next_observation": (observation_shape, observation_dtype),
+            "reward": ((), np.dtype(np.float64)),
+            "terminated": ((), np.dtype(bool)),
+            "truncated": ((), np.dtype(bool)),
+            "episode": ((), np.dtype(np.int64)),
+        }
+        if self.__spine_keys:
+            spine_observation = info["spine_observation"]
+            for field, keys in zip(self.spine_fields, self.__spine_keys):
+                value = spine_observation
+                for key in keys:
+                    value = value[key]
+                layout[f"spine_observation.{field}"] = (
+                    np.shape(value),
+                    np.dtype(np.float64),
+                )
+        self.__layout = layout
+        segment_index = self.__segment_index + 1  # resume after a close
+        self.__segment_path, self.__columns = self.__allocate_segment(
+            segment_index
+        )
+        self.__row = 0
+        self.__segment_index = segment_index
+        self.__queue.put(("allocate", segment_index + 1))
+        self.__thread = threading.Thread(
+            target=self.__run,
+            name="episode_recorder",
+            daemon=True,
+        )
+        self.__thread.start()
+
+    def __allocate_segment(
+        self, segment_index: int
+    ) -> Tuple[str, Dict[str, np.ndarray]]:
+        r"""!
+        Create the directory and memory-mapped columns of a segment.
+
+        \param segment_index Index of the segment.
+        \return Path to the segment directory and its columns.
+        """
+        path = os.path.join(self.directory, f"segment_{segment_index:05d}")
+        os.makedirs(path, exist_ok=True)
+        columns = {
+            name: np.lib.format.open_memmap(
+                os.path.join(path, f"{name}.npy"),
+                mode="w+",
+                dtype=dtype,
+                shape=(self.segment_length,) + shape,
+            )
+            for name, (shape, dtype) in self.__layout.items()
+        }
+        _write_length(path, 0)
+        return path, columns
+
+    def __next_segment(self) -> None:
+        r"""!
+        Hand the current segment over to the flushing thread and switch to
+        the next one, preallocated by the thread.
+
+        \throw UpkieException If the thread failed to allocate the next
+            segment.
+        """
+        spare = self.__spares.get()  # only waits if the thread lags
+        if isinstance(spare, Exception):
+            self.__queue.put(("allocate", self.__segment_index + 1))  # retry
+            raise UpkieException(
+                f"Could not allocate segment {self.__segment_index + 1}"
+            ) from spare
+        path, columns = spare
+        segment_index = self.__segment_index + 1
+        with self.__lock:
+            self.__queue.put(
+                ("flush", self.__segment_path, self.__columns, self.__row)
+            )
+            self.__queue.put(("allocate", segment_index + 1))
+            self.__columns = columns
+            self.__row = 0
+            self.__segment_index = segment_index
+            self.__segment_path = path
+
+    def __run(self) -> None:
+        """!
+        Flush recorded rows to disk and preallocate segments until the
+        wrapper is closed.
+        """
+        while True:
+            try:
+                request = self.__queue.get(timeout=self.__flush_period)
+            except queue.Empty:
+                with self.__lock:
+                    segment = (self.__segment_path, self.__columns, self.__row)
+                self.__flush(*segment)
+                continue
+            if request is None:
+                break
+            if request[0] == "allocate":
+                try:
+                    spare = self.__allocate_segment(request[1])
+                except Exception as exn:  # passed on to the main thread
+                    spare = exn
+                self.__spares.put(spare)
+            else:  # request[0] == "flush"
+                self.__flush(*request[1:])
+
+    @staticmethod
+    def __flush(
+        path: str, columns: Dict[str, np.ndarray], length: int
+    ) -> None:
+        r"""!
+        Flush the columns of a segment to disk.
+
+        \param path Path to the segment directory.
+        \param columns Memory-mapped columns of the segment.
+        \param length Number of valid rows in the segment.
+        """
+        for column in columns.values():
+            column.flush()
+        _write_length(path, length)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test History wrapper."""
+
+import unittest
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+
+from upkie.envs.wrappers.history import History
+from upkie.exceptions import UpkieException
+
+
+class CounterEnv(gym.Env):
+    def __init__(self):
+        self.action_space = spaces.Box(-10.0, 10.0, shape=(1,))
+        self.observation_space = spaces.Box(-100.0, 100.0, shape=(2,))
+        self.count = 0.0
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        self.count = 0.0
+        return np.array([self.count, -self.count], dtype=np.float32), {}
+
+    def step(self, action):
+        self.count += 1.0
+        observation = np.array([self.count, -self.count], dtype=np.float32)
+        return observation, 0.0, False, False, {}
+
+
+class HistoryTestCase(unittest.TestCase):
+    def test_window(self):
+        env = History(CounterEnv(), history_length=3)
+        self.assertEqual(env.observation_space.shape, (3, 3))
+        observation, _ = env.reset()
+        self.assertTrue(np.allclose(observation, 0.0))
+        for step in range(1, 6):
+            observation, _, _, _, _ = env.step(np.array([2.0 * step]))
+        self.assertTrue(env.observation_space.contains(observation))
+        self.assertTrue(np.allclose(observation[:, 0], [3.0, 4.0, 5.0]))
+        self.assertTrue(np.allclose(observation[:, 1], [-3.0, -4.0, -5.0]))
+        self.assertTrue(np.allclose(observation[:, 2], [6.0, 8.0, 10.0]))
+        self.assertFalse(observation.flags.writeable)
+
+    def test_strided_window(self):
+        env = History(CounterEnv(), history_length=3, stride=2)
+        env.reset()
+        for step in range(1, 4):
+            observation, _, _, _, _ = env.step(np.array([float(step)]))
+        self.assertTrue(np.allclose(observation[:, 0], [0.0, 1.0, 3.0]))
+        self.assertTrue(np.allclose(observation[:, 2], [0.0, 1.0, 3.0]))
+
+    def test_lags(self):
+        env = History(CounterEnv(), observation_lags=[0, 2], action_lags=[1])
+        self.assertEqual(env.observation_space.shape, (5,))
+        observation, _ = env.reset()
+        self.assertTrue(np.allclose(observation, 0.0))
+        for step in range(1, 5):
+            observation, _, _, _, _ = env.step(np.array([float(step)]))
+        self.assertTrue(np.allclose(observation, [4.0, -4.0, 2.0, -2.0, 3.0]))
+
+    def test_reset_clears_history(self):
+        env = History(CounterEnv(), history_length=2)
+        env.reset()
+        env.step(np.array([1.0]))
+        observation, _ = env.reset()
+        self.assertTrue(np.allclose(observation, 0.0))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(UpkieException):
+            History(CounterEnv(), history_length=0)
+        with self.assertRaises(UpkieException):
+            History(CounterEnv(), observation_lags=[-1])
+        with self.assertRaises(UpkieException):
+            History(CounterEnv(), observation_lags=[], action_lags=[])
+
+    def test_check_env(self):
+        try:
+            from stable_baselines3.common.env_checker import check_env
+
+            env = gym.make("Pendulum-v1")
+            wrapped_env = History(
+                env, observation_lags=[0, 1], action_lags=[0]
+            )
+            check_env(wrapped_env)
+        except ImportError:
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()  # necessary for `bazel test`
@@ -25,6 +25,16 @@ class NoisifyObservationTestCase(unittest.TestCase):
         observation, _, _, _, _ = noisy_env.step(None)
         self.assertGreater(abs(observation[0] - 1.0), 1e-10)
 
+    def test_seeded_noise(self):
+        noisy_env = NoisifyObservation(
+            gym.make("Pendulum-v1"), noise=np.full(3, 0.1), block_size=4
+        )
+        first, _ = noisy_env.reset(seed=42)
+        for _ in range(10):  # consume more than one block of noise
+            noisy_env.step(noisy_env.action_space.sample())
+        second, _ = noisy_env.reset(seed=42)
+        self.assertTrue(np.allclose(first, second))
+
     def test_check_env(self):
         try:
             from stable_baselines3.common.env_checker import check_env
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test NormalizeObservation wrapper."""
+
+import os
+import unittest
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from upkie.envs.wrappers.normalize_observation import NormalizeObservation
+from upkie.envs.wrappers.tests.envs import ActionObserverEnv
+from upkie.exceptions import UpkieException
+
+
+class NormalizeObservationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.shm_name = f"/normalize_observation_test_{os.getpid()}"
+        self.values = np.random.default_rng(42).uniform(0.0, 2.0, (40, 1))
+
+    def test_identity_without_statistics(self):
+        env = NormalizeObservation(ActionObserverEnv(), update_period=100)
+        observation, _, _, _, _ = env.step(np.array([1.5]))
+        self.assertAlmostEqual(observation[0], 1.5, places=5)
+
+    def test_statistics(self):
+        env = NormalizeObservation(ActionObserverEnv(), update_period=10)
+        for value in self.values:
+            env.step(value)
+        self.assertAlmostEqual(env.mean[0], self.values.mean())
+        self.assertAlmostEqual(env.var[0], self.values.var())
+        observation, _, _, _, _ = env.step(np.array([1.0]))
+        expected = (1.0 - self.values.mean()) / self.values.std()
+        self.assertAlmostEqual(observation[0], expected, places=5)
+
+    def test_frozen(self):
+        env = NormalizeObservation(ActionObserverEnv(), update_period=10)
+        for value in self.values[:20]:
+            env.step(value)
+        mean = env.mean.copy()
+        env.frozen = True
+        for value in self.values[20:]:
+            env.step(value)
+        self.assertTrue(np.allclose(env.mean, mean))
+
+    def test_set_statistics(self):
+        env = NormalizeObservation(ActionObserverEnv(), frozen=True)
+        env.set_statistics(np.array([1.0]), np.array([4.0]))
+        observation, _, _, _, _ = env.step(np.array([2.0]))
+        self.assertAlmostEqual(observation[0], 0.5, places=5)
+
+    def test_shared_statistics(self):
+        workers = [
+            NormalizeObservation(
+                ActionObserverEnv(),
+                shm_name=self.shm_name,
+                nb_workers=2,
+                worker_index=index,
+                update_period=10,
+            )
+            for index in range(2)
+        ]
+        for step, value in enumerate(self.values):
+            workers[step % 2].step(value)
+        reader = NormalizeObservation(  # reads all slots when initialized
+            ActionObserverEnv(),
+            shm_name=self.shm_name,
+            nb_workers=2,
+            frozen=True,
+        )
+        self.assertAlmostEqual(reader.mean[0], self.values.mean())
+        self.assertAlmostEqual(reader.var[0], self.values.var())
+        reader.close()
+        for worker in reversed(workers):
+            worker.close()
+
+    def test_shared_memory_too_small(self):
+        worker = NormalizeObservation(
+            ActionObserverEnv(), shm_name=self.shm_name, nb_workers=1
+        )
+        with self.assertRaises(UpkieException):
+            NormalizeObservation(
+                ActionObserverEnv(), shm_name=self.shm_name, nb_workers=64
+            )
+        worker.close()
+
+    def test_header_mismatch(self):
+        worker = NormalizeObservation(
+            ActionObserverEnv(), shm_name=self.shm_name, nb_workers=2
+        )
+        with self.assertRaises(UpkieException):
+            NormalizeObservation(
+                ActionObserverEnv(), shm_name=self.shm_name, nb_workers=1
+            )
+        worker.close()
+
+    def test_not_statistics(self):
+        shared_memory = SharedMemory(
+            self.shm_name.lstrip("/"), create=True, size=4096
+        )
+        with self.assertRaises(UpkieException):
+            NormalizeObservation(ActionObserverEnv(), shm_name=self.shm_name)
+        resource_tracker.register(shared_memory._name, "shared_memory")
+        shared_memory.close()
+        shared_memory.unlink()
+
+    def test_slot_being_written(self):
+        worker = NormalizeObservation(
+            ActionObserverEnv(), shm_name=self.shm_name, nb_workers=2
+        )
+        shared_memory = SharedMemory(self.shm_name.lstrip("/"))
+        resource_tracker.unregister(shared_memory._name, "shared_memory")
+        sequence = np.ndarray(
+            (1,), dtype=np.float64, buffer=shared_memory.buf, offset=24
+        )
+        sequence[0] = 1.0  # worker 0 died while writing its slot
+        with self.assertRaises(UpkieException):
+            NormalizeObservation(
+                ActionObserverEnv(),
+                shm_name=self.shm_name,
+                nb_workers=2,
+                worker_index=1,
+            )
+        del sequence
+        shared_memory.close()
+        worker.close()
+
+    def test_invalid_worker_index(self):
+        with self.assertRaises(UpkieException):
+            NormalizeObservation(
+                ActionObserverEnv(), nb_workers=2, worker_index=2
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ from upkie.envs import UpkieGroundVelocity
 from upkie.envs.tests.mock_spine import MockSpine
 from upkie.envs.wrappers.random_push import RandomPush
 from upkie.envs.wrappers.tests.envs import ConstantObservationEnv
+from upkie.exceptions import UpkieException
 
 
 class RandomPushTestCase(unittest.TestCase):
@@ -29,26 +30,87 @@ class RandomPushTestCase(unittest.TestCase):
         shared_memory.close()
         self.env._spine = MockSpine()
 
+    def get_force(self):
+        bullet_action = self.env._spine.action.get("bullet", {})
+        if "external_forces" not in bullet_action:
+            return None
+        return np.copy(bullet_action["external_forces"]["torso"]["force"])
+
     def test_wrapper(self):
-        env = ConstantObservationEnv(1.0)
-        env.get_spine_action = lambda action: {}
         wrapped_env = RandomPush(
-            env, push_prob=1, push_generator=lambda: np.array([42, 42, 42])
+            self.env,
+            push_prob=1.0,
+            push_generator=lambda: np.array([42.0, 42.0, 42.0]),
+        )
+        wrapped_env.reset()
+        action = np.array([0.0])
+        wrapped_env.step(action)
+        self.assertTrue(np.allclose(self.get_force(), [42.0, 42.0, 42.0]))
+        wrapped_env.step(action)
+        self.assertTrue(np.allclose(self.get_force(), 0.0))
+
+    def test_push_profile(self):
+        wrapped_env = RandomPush(
+            self.env,
+            push_prob=1.0,
+            push_generator=lambda: np.array([10.0, 0.0, 0.0]),
+            push_profile=(0.5, 1.0, 1.0),
+        )
+        wrapped_env.reset()
+        action = np.array([0.0])
+        forces = []
+        for _ in range(5):
+            wrapped_env.step(action)
+            forces.append(self.get_force())
+        self.assertAlmostEqual(forces[0][0], 5.0)
+        self.assertAlmostEqual(forces[1][0], 10.0)
+        self.assertIsNone(forces[2])  # force unchanged, nothing sent
+        self.assertAlmostEqual(forces[3][0], 0.0)
+        self.assertAlmostEqual(forces[4][0], 5.0)  # next push
+
+    def test_no_push(self):
+        wrapped_env = RandomPush(self.env, push_prob=0.0)
+        wrapped_env.reset()
+        for _ in range(10):
+            wrapped_env.step(np.array([0.0]))
+            self.assertIsNone(self.get_force())
+
+    def test_release_push_on_reset(self):
+        wrapped_env = RandomPush(
+            self.env,
+            push_prob=1.0,
+            push_generator=lambda: np.array([1.0, 2.0, 3.0]),
+            push_profile=(1.0,) * 10,
         )
-        action = np.array([1.0])
-        spine_action = wrapped_env.get_spine_action(action)
-        self.assertTrue("bullet" in spine_action)
-        self.assertTrue("external_forces" in spine_action["bullet"])
-        self.assertTrue("torso" in spine_action["bullet"]["external_forces"])
-        self.assertTrue(
-            "force" in spine_action["bullet"]["external_forces"]["torso"]
+        wrapped_env.reset()
+        wrapped_env.step(np.array([0.0]))
+        wrapped_env.push_prob = 0.0
+        wrapped_env.reset()
+        wrapped_env.step(np.array([0.0]))
+        self.assertTrue(np.allclose(self.get_force(), 0.0))
+
+    def test_requires_bullet_extra(self):
+        with self.assertRaises(UpkieException):
+            RandomPush(ConstantObservationEnv(1.0))
+
+    def test_empty_profile(self):
+        with self.assertRaises(UpkieException):
+            RandomPush(self.env, push_profile=())
+
+    def test_keep_other_external_forces(self):
+        wrapped_env = RandomPush(
+            self.env,
+            push_prob=1.0,
+            push_generator=lambda: np.array([42.0, 0.0, 0.0]),
         )
-        self.assertTrue(
-            np.allclose(
-                spine_action["bullet"]["external_forces"]["torso"]["force"],
-                np.array([42, 42, 42]),
-            )
+        wrapped_env.reset()
+        self.env.bullet_extra(
+            {"external_forces": {"left_wheel_tire": {"force": np.ones(3)}}}
         )
+        wrapped_env.step(np.array([0.0]))
+        external_forces = self.env._spine.action["bullet"]["external_forces"]
+        self.assertIn("left_wheel_tire", external_forces)
+        self.assertAlmostEqual(external_forces["torso"]["force"][0], 42.0)
 
     def test_check_env(self):
         try:
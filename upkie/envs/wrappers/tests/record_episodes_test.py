@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test RecordEpisodes wrapper."""
+
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from upkie.envs import WheeledInvertedPendulum
+from upkie.envs.wrappers.record_episodes import RecordEpisodes
+from upkie.exceptions import UpkieException
+
+
+class RecordEpisodesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.env = RecordEpisodes(
+            WheeledInvertedPendulum(regulate_frequency=False),
+            self.directory.name,
+            segment_length=4,
+            spine_fields=(
+                "wheel_odometry.position",
+                "sim.base.position",
+            ),
+        )
+
+    def tearDown(self):
+        self.env.close()
+        self.directory.cleanup()
+
+    def test_step_before_reset(self):
+        with self.assertRaises(UpkieException):
+            self.env.step(np.zeros(1))
+
+    def test_record(self):
+        observations = []
+        actions = []
+        for episode in range(2):
+            observation, _ = self.env.reset()
+            observations.append(observation.copy())
+            for step in range(5):
+                action = np.array([0.1 * step])
+                observation, _, _, _, _ = self.env.step(action)
+                actions.append(action)
+                observations.append(observation.copy())
+        self.env.close()
+
+        columns = RecordEpisodes.load(self.directory.name)
+        self.assertEqual(
+            sorted(os.listdir(self.directory.name)),
+            ["segment_00000", "segment_00001", "segment_00002"],
+        )
+        self.assertEqual(columns["observation"].shape, (10, 4))
+        self.assertEqual(columns["action"].shape, (10, 1))
+        self.assertEqual(columns["episode"].tolist(), [0] * 5 + [1] * 5)
+        self.assertTrue(np.allclose(columns["reward"], 1.0))
+        self.assertTrue(np.allclose(columns["action"], np.array(actions)))
+        self.assertTrue(
+            np.allclose(columns["observation"][:5], observations[0:5])
+        )
+        self.assertTrue(
+            np.allclose(columns["next_observation"][:5], observations[1:6])
+        )
+        self.assertTrue(
+            np.allclose(
+                columns["spine_observation.wheel_odometry.position"],
+                columns["next_observation"][:, 1],
+            )
+        )
+        self.assertEqual(
+            columns["spine_observation.sim.base.position"].shape, (10, 3)
+        )
+
+    def test_preallocate_next_segment(self):
+        self.env.reset()
+        next_segment = os.path.join(self.directory.name, "segment_00001")
+        deadline = time.perf_counter() + 1.0
+        while (
+            not os.path.exists(next_segment) and time.perf_counter() < deadline
+        ):
+            time.sleep(1e-3)
+        self.assertTrue(os.path.exists(next_segment))
+        self.env.close()
+        self.assertEqual(os.listdir(self.directory.name), ["segment_00000"])
+
+    def test_non_empty_directory(self):
+        self.env.reset()
+        with self.assertRaises(UpkieException):
+            RecordEpisodes(
+                WheeledInvertedPendulum(regulate_frequency=False),
+                self.directory.name,
+            )
+
+    def test_reset_after_close(self):
+        self.env.reset()
+        self.env.step(np.zeros(1))
+        self.env.close()
+        self.env.reset()
+        self.env.step(np.zeros(1))
+        self.env.close()
+        columns = RecordEpisodes.load(self.directory.name)
+        self.assertEqual(columns["episode"].tolist(), [0, 1])
+
+    def test_allocation_error(self):
+        self.env.reset()
+        for _ in range(4):
+            self.env.step(np.zeros(1))
+        blocker = os.path.join(self.directory.name, "segment_00002")
+        with open(blocker, "w"):
+            pass  # the next segment directory can't be created
+        for _ in range(4):
+            self.env.step(np.zeros(1))
+        with self.assertRaises(UpkieException):
+            self.env.step(np.zeros(1))
+
+    def test_flush_before_close(self):
+        directory = os.path.join(self.directory.name, "flushed")
+        env = RecordEpisodes(
+            WheeledInvertedPendulum(regulate_frequency=False),
+            directory,
+            flush_period=1e-3,
+        )
+        env.reset()
+        env.step(np.zeros(1))
+        env.step(np.zeros(1))
+        deadline = time.perf_counter() + 1.0
+        columns = RecordEpisodes.load(directory)
+        while len(columns["reward"]) < 2 and time.perf_counter() < deadline:
+            time.sleep(1e-3)
+            columns = RecordEpisodes.load(directory)
+        self.assertEqual(len(columns["reward"]), 2)
+        env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+## \namespace upkie.envs.wrappers.vector
+## \brief Wrappers for vector environments.
+
+from .add_action_to_observation import AddActionToObservation
+from .add_lag_to_action import AddLagToAction
+from .differentiate_action import DifferentiateAction
+from .noisify_action import NoisifyAction
+from .noisify_observation import NoisifyObservation
+from .observation_based_reward import ObservationBasedReward
+from .reset_mask import ResetMask
+
+__all__ = [
+    "AddActionToObservation",
+    "AddLagToAction",
+    "DifferentiateAction",
+    "NoisifyAction",
+    "NoisifyObservation",
+    "ObservationBasedReward",
+    "ResetMask",
+]
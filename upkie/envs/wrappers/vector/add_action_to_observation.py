@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from typing import Any, Dict, Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector.utils import batch_space
+
+from upkie.exceptions import UpkieException
+
+from .reset_mask import ResetMask
+
+
+class AddActionToObservation(gym.vector.VectorWrapper):
+    r"""!
+    Append the last action of each sub-environment to its observation.
+
+    This is the vector counterpart of \ref
+    upkie.envs.wrappers.add_action_to_observation.AddActionToObservation. The
+    last action of a sub-environment is set to zero when it is reset.
+    """
+
+    __last_action: np.ndarray
+
+    ## \var observation_space
+    ## Batched observation space.
+    observation_space: gym.spaces.Box
+
+    ## \var single_observation_space
+    ## Observation space of each sub-environment.
+    single_observation_space: gym.spaces.Box
+
+    def __init__(self, env: gym.vector.VectorEnv):
+        r"""!
+        Initialize wrapper.
+
+        \param env Vector environment to wrap.
+        """
+        super().__init__(env)
+        observation_space = env.single_observation_space
+        action_space = env.single_action_space
+        if observation_space.dtype != action_space.dtype:
+            raise UpkieException(
+                "Not sure which type to pick "
+                f"between {observation_space.dtype=} "
+                f"and {action_space.dtype=}"
+            )
+        low = np.concatenate([observation_space.low, action_space.low])
+        self.single_observation_space = gym.spaces.Box(
+            low=low,
+            high=np.concatenate([observation_space.high, action_space.high]),
+            shape=low.shape,
+            dtype=observation_space.dtype,
+        )
+        self.observation_space = batch_space(
+            self.single_observation_space, env.num_envs
+        )
+        self.__last_action = np.zeros(
+            env.action_space.shape, dtype=action_space.dtype
+        )
+        self.__resets = ResetMask(env)
+
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[dict] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        r"""!
+        Reset the vector environment.
+
+        \param seed Seed forwarded to the wrapped environment.
+        \param options Options forwarded to the wrapped environment. If they
+            contain a `"reset_mask"`, only reset the last actions of these
+            sub-environments.
+        \return Batched observations and infos.
+        """
+        mask = self.__resets.reset(options)
+        observations, infos = self.env.reset(seed=seed, options=options)
+        self.__last_action[mask] = 0.0
+        return self.__observations(observations), infos
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        r"""!
+        Step the vector environment.
+
+        \param actions Batch of actions from the agent.
+        \return Batched observations, rewards, terminations, truncations and
+            infos.
+        """
+        last_action = self.__last_action
+        last_action[:] = actions
+        last_action[self.__resets.begin_step()] = 0.0
+        observations, rewards, terminations, truncations, infos = (
+            self.env.step(actions)
+        )
+        last_action[self.__resets.end_step(terminations, truncations)] = 0.0
+        return (
+            self.__observations(observations),
+            rewards,
+            terminations,
+            truncations,
+            infos,
+        )
+
+    def __observations(self, observations: np.ndarray) -> np.ndarray:
+        r"""!
+        Append last actions to a batch of observations.
+
+        \param observations Batch of observations from the wrapped
+            environment.
+        \return Batch of wrapped observations.
+        """
+        return np.concatenate([observations, self.__last_action], axis=1)
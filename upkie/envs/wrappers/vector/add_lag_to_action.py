@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from typing import Any, Dict, Optional, Tuple, Union
+
+import gymnasium as gym
+import numpy as np
+
+from .reset_mask import ResetMask
+
+
+class AddLagToAction(gym.vector.VectorWrapper):
+    r"""!
+    Model lag by applying low-pass filters to the actions of a vector
+    environment.
+
+    This is the vector counterpart of \ref
+    upkie.envs.wrappers.add_lag_to_action.AddLagToAction: each
+    sub-environment has its own filtered action and time constant, and all
+    actions are filtered by a single vectorized operation per step. Time
+    constants of sub-environments are sampled anew when they are reset.
+    """
+
+    ## \var filtered_action
+    ## Wrapped actions after low-pass filtering, of shape `(num_envs, ...)`.
+    filtered_action: np.ndarray
+
+    ## \var time_constant
+    ## Cutoff periods in seconds of the low-pass filters, one per
+    ## sub-environment.
+    time_constant: np.ndarray
+
+    ## \var time_constant_box
+    ## Box space from which time constants are sampled when sub-environments
+    ## are reset.
+    time_constant_box: gym.spaces.Box
+
+    def __init__(
+        self,
+        env: gym.vector.VectorEnv,
+        time_constant: Union[float, np.ndarray, gym.spaces.Box],
+    ):
+        r"""!
+        Initialize wrapper.
+
+        \param env Vector environment to wrap.
+        \param time_constant Cutoff period in seconds of the low-pass filters
+            applied to actions, either a single value, an array with one value
+            per sub-environment, or a Box: a new time constant is then sampled
+            uniformly at random between the bounds of the box whenever a
+            sub-environment is reset.
+        """
+        super().__init__(env)
+        if isinstance(time_constant, gym.spaces.Box):
+            time_constant_box = time_constant
+        else:
+            values = np.broadcast_to(
+                np.asarray(time_constant, dtype=float), (env.num_envs,)
+            )
+            time_constant_box = gym.spaces.Box(
+                low=values - 1e-10, high=values + 1e-10, dtype=float
+            )
+        self.__resets = ResetMask(env)
+        self.filtered_action = np.zeros(env.action_space.shape)
+        self.time_constant_box = time_constant_box
+        self.time_constant = self.__sample_time_constants()
+
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[dict] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        r"""!
+        Reset the vector environment.
+
+        \param seed Seed forwarded to the wrapped environment.
+        \param options Options forwarded to the wrapped environment. If they
+            contain a `"reset_mask"`, only reset the filters of these
+            sub-environments.
+        \return Batched observations and infos.
+        """
+        mask = self.__resets.reset(options)
+        observations, infos = self.env.reset(seed=seed, options=options)
+        self.__reset_envs(mask)
+        return observations, infos
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        r"""!
+        Step the vector environment with filtered actions.
+
+        \param actions Batch of actions from the agent.
+        \return Batched observations, rewards, terminations, truncations and
+            infos.
+        """
+        dt = self.env.unwrapped.dt
+        time_constant = self.time_constant
+        # Nyquist–Shannon sampling theorem: no filtering below 2 * dt
+        alpha = np.where(
+            time_constant > 2.0 * dt, dt / time_constant, 1.0
+        ).reshape((-1,) + (1,) * (self.filtered_action.ndim - 1))
+        filtered_action = self.filtered_action
+        filtered_action += alpha * (actions - filtered_action)
+        self.__reset_envs(self.__resets.begin_step())
+        observations, rewards, terminations, truncations, infos = (
+            self.env.step(filtered_action)
+        )
+        self.__reset_envs(self.__resets.end_step(terminations, truncations))
+        return observations, rewards, terminations, truncations, infos
+
+    def __reset_envs(self, mask: np.ndarray) -> None:
+        r"""!
+        Reset filters and time constants of some sub-environments.
+
+        \param mask Boolean mask of sub-environments to reset.
+        """
+        if not mask.any():
+            return
+        self.filtered_action[mask] = 0.0
+        self.time_constant[mask] = self.__sample_time_constants()[mask]
+
+    def __sample_time_constants(self) -> np.ndarray:
+        r"""!
+        Sample one time constant per sub-environment.
+
+        \return Array of time constants.
+        """
+        box = self.time_constant_box
+        return self.np_random.uniform(box.low, box.high, size=(self.num_envs,))
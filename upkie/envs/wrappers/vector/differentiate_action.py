@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from typing import Any, Dict, Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector.utils import batch_space
+
+from .reset_mask import ResetMask
+
+
+class DifferentiateAction(gym.vector.VectorWrapper):
+    r"""!
+    Act on the derivatives of the actions of a vector environment.
+
+    This is the vector counterpart of \ref
+    upkie.envs.wrappers.differentiate_action.DifferentiateAction: each
+    sub-environment integrates its own action, and integrals are reset along
+    with sub-environments.
+    """
+
+    __integral: np.ndarray
+
+    ## \var action_penalty
+    ## Weight for an additional penalty on differential actions added to the
+    ## rewards.
+    action_penalty: float
+
+    ## \var action_space
+    ## Batched action space.
+    action_space: gym.spaces.Box
+
+    ## \var single_action_space
+    ## Action space of each sub-environment.
+    single_action_space: gym.spaces.Box
+
+    def __init__(
+        self,
+        env: gym.vector.VectorEnv,
+        min_derivative: np.ndarray,
+        max_derivative: np.ndarray,
+        action_penalty: float = 0.0,
+    ):
+        r"""!
+        Initialize wrapper.
+
+        \param env Vector environment to wrap.
+        \param min_derivative Lower bound on the derivative of the original
+            action of each sub-environment.
+        \param max_derivative Upper bound on the derivative of the original
+            action of each sub-environment.
+        \param action_penalty Weight for an additional penalty on differential
+            actions added to the rewards.
+
+        \note We assume original actions live in a vector space.
+        """
+        super().__init__(env)
+        self.single_action_space = gym.spaces.Box(
+            np.float32(min_derivative),
+            np.float32(max_derivative),
+            shape=env.single_action_space.shape,
+            dtype=np.float32,
+        )
+        self.action_space = batch_space(self.single_action_space, env.num_envs)
+        self.__integral = np.zeros(env.action_space.shape)
+        self.__resets = ResetMask(env)
+        self.action_penalty = action_penalty
+
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[dict] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        r"""!
+        Reset the vector environment.
+
+        \param seed Seed forwarded to the wrapped environment.
+        \param options Options forwarded to the wrapped environment. If they
+            contain a `"reset_mask"`, only reset the integrals of these
+            sub-environments.
+        \return Batched observations and infos.
+        """
+        mask = self.__resets.reset(options)
+        observations, infos = self.env.reset(seed=seed, options=options)
+        self.__integral[mask] = 0.0
+        return observations, infos
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        r"""!
+        Step the vector environment.
+
+        \param actions Batch of differential actions from the agent.
+        \return Batched observations, rewards, terminations, truncations and
+            infos.
+        """
+        integral = self.__integral
+        integral += actions * self.env.unwrapped.dt
+        np.clip(
+            integral,
+            self.env.single_action_space.low,
+            self.env.single_action_space.high,
+            out=integral,
+        )
+        resetting = self.__resets.begin_step()
+        integral[resetting] = 0.0
+        observations, rewards, terminations, truncations, infos = (
+            self.env.step(integral)
+        )
+        penalties = np.square(actions).reshape(self.num_envs, -1).sum(axis=1)
+        penalties[resetting] = 0.0  # these actions were not applied
+        wrapped_rewards = rewards - self.action_penalty * penalties
+        integral[self.__resets.end_step(terminations, truncations)] = 0.0
+        return observations, wrapped_rewards, terminations, truncations, infos
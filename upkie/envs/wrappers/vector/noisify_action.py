@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Add noise to the actions of a vector environment."""
+
+from typing import Any, Dict, Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+from upkie.exceptions import UpkieException
+from upkie.utils.noise_bank import NoiseBank
+
+
+class NoisifyAction(gym.vector.VectorActionWrapper):
+    r"""!
+    Add noise to the actions of a vector environment.
+
+    This is the vector counterpart of \ref
+    upkie.envs.wrappers.noisify_action.NoisifyAction: noise for all
+    sub-environments is drawn at once, with noise levels shared by all
+    sub-environments or specific to each of them.
+    """
+
+    ## \var high
+    ## Upper bounds on action noise, of shape `(num_envs, ...)`.
+    high: np.ndarray
+
+    ## \var low
+    ## Lower bounds on action noise, of shape `(num_envs, ...)`.
+    low: np.ndarray
+
+    def __init__(
+        self,
+        env: gym.vector.VectorEnv,
+        noise: np.ndarray,
+        block_size: int = 4096,
+    ):
+        r"""!
+        Create wrapper.
+
+        \param env Vector environment to wrap.
+        \param noise Noise level, either with the shape of a single action to
+            apply to all sub-environments, or with the shape of batched
+            actions for per-environment levels.
+        \param block_size Number of steps of noise drawn at once from the
+            random number generator of the environment.
+        """
+        super().__init__(env)
+        shape = env.action_space.shape
+        if noise.shape not in (env.single_action_space.shape, shape):
+            raise UpkieException(
+                f"Action {noise.shape=} matches neither "
+                f"{env.single_action_space.shape=} nor {shape=}"
+            )
+        self.__noise_bank = NoiseBank(shape, "uniform", block_size)
+        self.high = np.broadcast_to(+np.abs(noise), shape).copy()
+        self.low = np.broadcast_to(-np.abs(noise), shape).copy()
+
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[dict] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        r"""!
+        Reset the vector environment.
+
+        \param seed Seed forwarded to the wrapped environment. When set, noise
+            drawn in advance is discarded so that subsequent noise only
+            depends on this seed.
+        \param options Options forwarded to the wrapped environment.
+        \return Batched observations and infos.
+        """
+        if seed is not None:
+            self.__noise_bank.reset()
+        return self.env.reset(seed=seed, options=options)
+
+    def actions(self, actions: np.ndarray) -> np.ndarray:
+        r"""!
+        Get noisy actions.
+
+        \param actions Batch of original actions.
+        \return Batch of noisy actions.
+        """
+        sample = self.__noise_bank.draw(self.np_random)
+        noise = self.low + (self.high - self.low) * sample
+        return np.clip(
+            actions + noise,
+            self.env.single_action_space.low,
+            self.env.single_action_space.high,
+        )
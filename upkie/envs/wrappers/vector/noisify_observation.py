@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from typing import Any, Dict, Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+from upkie.exceptions import UpkieException
+from upkie.utils.noise_bank import NoiseBank
+
+
+class NoisifyObservation(gym.vector.VectorObservationWrapper):
+    r"""!
+    Add noise to the observations of a vector environment.
+
+    This is the vector counterpart of \ref
+    upkie.envs.wrappers.noisify_observation.NoisifyObservation: noise for all
+    sub-environments is drawn at once, with noise levels shared by all
+    sub-environments or specific to each of them.
+    """
+
+    ## \var high
+    ## Upper bounds on observation noise, of shape `(num_envs, ...)`.
+    high: np.ndarray
+
+    ## \var low
+    ## Lower bounds on observation noise, of shape `(num_envs, ...)`.
+    low: np.ndarray
+
+    def __init__(
+        self,
+        env: gym.vector.VectorEnv,
+        noise: np.ndarray,
+        block_size: int = 4096,
+    ):
+        r"""!
+        Create wrapper.
+
+        \param env Vector environment to wrap.
+        \param noise Noise level, either with the shape of a single
+            observation to apply to all sub-environments, or with the shape
+            of batched observations for per-environment levels.
+        \param block_size Number of steps of noise drawn at once from the
+            random number generator of the environment.
+        """
+        super().__init__(env)
+        shape = env.observation_space.shape
+        if noise.shape not in (env.single_observation_space.shape, shape):
+            raise UpkieException(
+                f"Observation {noise.shape=} matches neither "
+                f"{env.single_observation_space.shape=} nor {shape=}"
+            )
+        self.__noise_bank = NoiseBank(shape, "uniform", block_size)
+        self.high = np.broadcast_to(+np.abs(noise), shape).copy()
+        self.low = np.broadcast_to(-np.abs(noise), shape).copy()
+
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[dict] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        r"""!
+        Reset the vector environment.
+
+        \param seed Seed forwarded to the wrapped environment. When set, noise
+            drawn in advance is discarded so that subsequent noise only
+            depends on this seed.
+        \param options Options forwarded to the wrapped environment.
+        \return Batched noisy observations and infos.
+        """
+        if seed is not None:
+            self.__noise_bank.reset()
+        return super().reset(seed=seed, options=options)
+
+    def observations(self, observations: np.ndarray) -> np.ndarray:
+        r"""!
+        Get noisy observations.
+
+        \param observations Batch of noise-less observations.
+        \return Batch of noisy observations.
+        """
+        sample = self.__noise_bank.draw(self.np_random)
+        noise = self.low + (self.high - self.low) * sample
+        return np.clip(
+            observations + noise,
+            self.env.single_observation_space.low,
+            self.env.single_observation_space.high,
+        ).astype(self.env.single_observation_space.dtype)
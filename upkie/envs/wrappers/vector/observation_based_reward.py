@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from typing import Any, Dict, Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+from .reset_mask import ResetMask
+
+
+class ObservationBasedReward(gym.vector.VectorWrapper):
+    r"""!
+    Redefine the rewards of a vector environment as a function of its
+    observations.
+
+    This is the vector counterpart of \ref
+    upkie.envs.wrappers.observation_based_reward.ObservationBasedReward:
+    inherit from this class and overwrite the \ref rewards method, which
+    computes the rewards of all sub-environments at once from their batched
+    post-step observations.
+
+    In next-step autoreset mode, sub-environments that are reset by a step
+    keep the zero reward of their initial observation.
+    """
+
+    def __init__(self, env: gym.vector.VectorEnv):
+        r"""!
+        Initialize wrapper.
+
+        \param env Vector environment to wrap.
+        """
+        super().__init__(env)
+        self.__resets = ResetMask(env)
+
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[dict] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        r"""!
+        Reset the vector environment.
+
+        \param seed Seed forwarded to the wrapped environment.
+        \param options Options forwarded to the wrapped environment.
+        \return Batched observations and infos.
+        """
+        self.__resets.reset(options)
+        return self.env.reset(seed=seed, options=options)
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        r"""!
+        Step the vector environment and compute rewards from observations.
+
+        \param actions Batch of actions from the agent.
+        \return Batched observations, rewards, terminations, truncations and
+            infos.
+        """
+        resetting = self.__resets.begin_step()
+        observations, _, terminations, truncations, infos = self.env.step(
+            actions
+        )
+        rewards = np.array(self.rewards(observations, infos), dtype=np.float64)
+        rewards[resetting] = 0.0
+        self.__resets.end_step(terminations, truncations)
+        return observations, rewards, terminations, truncations, infos
+
+    def rewards(
+        self, observations: np.ndarray, infos: Dict[str, Any]
+    ) -> np.ndarray:
+        r"""!
+        Compute the rewards of all sub-environments.
+
+        \param[in] observations Latest batch of observations.
+        \param[in] infos Latest infos from the vector environment.
+        \return Array of rewards, one per sub-environment.
+        """
+        raise NotImplementedError
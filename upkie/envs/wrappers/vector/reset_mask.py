@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+from typing import Optional
+
+import gymnasium as gym
+import numpy as np
+
+
+class ResetMask:
+    r"""!
+    Track which sub-environments of a vector environment are being reset.
+
+    Vector wrappers with per-environment state use this class to reset the
+    state of sub-environments along with them, either when they are reset
+    explicitly by `reset`, possibly only for sub-environments selected by a
+    `"reset_mask"` option, or when they are reset automatically after they
+    terminate or get truncated.
+
+    Automatic resets follow the autoreset mode of the vector environment,
+    read from its `"autoreset_mode"` metadata and defaulting to next-step
+    mode. In next-step mode, sub-environments that are done at a step are
+    reset at the following step, which ignores their actions: \ref
+    begin_step returns them. In same-step mode, they are reset at the end of
+    the step where they are done: \ref end_step returns them. Modes are
+    compared by value, as the `AutoresetMode` enumeration only exists from
+    gymnasium 1.1 on.
+    """
+
+    __done: np.ndarray
+    __none: np.ndarray
+
+    ## \var autoreset_mode
+    ## Autoreset mode of the vector environment: "NextStep", "SameStep" or
+    ## "Disabled".
+    autoreset_mode: str
+
+    def __init__(self, env: gym.vector.VectorEnv):
+        r"""!
+        Initialize mask with no sub-environment being reset.
+
+        \param env Vector environment.
+        """
+        self.__done = np.zeros(env.num_envs, dtype=bool)
+        self.__none = np.zeros(env.num_envs, dtype=bool)
+        mode = env.metadata.get("autoreset_mode", "NextStep")
+        self.autoreset_mode = getattr(mode, "value", mode)
+
+    def reset(self, options: Optional[dict] = None) -> np.ndarray:
+        r"""!
+        Get sub-environments reset by a call to `reset`.
+
+        This function should be called before forwarding options to the
+        wrapped environment, as vector environments may consume them.
+
+        \param options Options passed to `reset`.
+        \return Boolean mask of sub-environments being reset: those of the
+            `"reset_mask"` option if present, otherwise all of them.
+        """
+        mask = None if options is None else options.get("reset_mask")
+        if mask is None:
+            mask = np.ones(self.__done.shape, dtype=bool)
+        self.__done[mask] = False
+        return mask
+
+    def begin_step(self) -> np.ndarray:
+        r"""!
+        Get sub-environments reset, rather than stepped, by the next step.
+
+        \return Boolean mask of sub-environments being reset, which is only
+            non-empty in next-step mode. Don't modify it.
+        """
+        if self.autoreset_mode == "NextStep":
+            return self.__done
+        return self.__none
+
+    def end_step(
+        self, terminations: np.ndarray, truncations: np.ndarray
+    ) -> np.ndarray:
+        r"""!
+        Record sub-environments that are done after a step.
+
+        \param terminations Terminations returned by the step.
+        \param truncations Truncations returned by the step.
+        \return Boolean mask of sub-environments reset at the end of this
+            step, which is only non-empty in same-step mode. Don't modify it.
+        """
+        self.__done = np.logical_or(terminations, truncations)
+        if self.autoreset_mode == "SameStep":
+            return self.__done
+        return self.__none
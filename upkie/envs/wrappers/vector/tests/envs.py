@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector.utils import batch_space
+
+
+def autoreset_mode(value: str):
+    AutoresetMode = getattr(gym.vector, "AutoresetMode", None)
+    return AutoresetMode(value) if AutoresetMode is not None else value
+
+
+class ActionObserverVectorEnv(gym.vector.VectorEnv):
+    def __init__(
+        self,
+        num_envs: int = 3,
+        max_episode_steps: int = 1000,
+        mode: str = "NextStep",
+    ):
+        self.num_envs = num_envs
+        self.single_action_space = gym.spaces.Box(0.0, 2.0, shape=(1,))
+        self.single_observation_space = self.single_action_space
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.observation_space = self.action_space
+        self.metadata = {"autoreset_mode": autoreset_mode(mode)}
+        self.mode = mode
+        self.dt = 1e-3
+        self.max_episode_steps = max_episode_steps
+        self.autoreset = np.zeros(num_envs, dtype=bool)
+        self.episode_steps = np.zeros(num_envs, dtype=int)
+        self.observations = np.zeros((num_envs, 1), dtype=np.float32)
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        mask = (options or {}).get("reset_mask", slice(None))
+        self.autoreset[mask] = False
+        self.episode_steps[mask] = 0
+        self.observations[mask] = 0.0
+        return self.observations.copy(), {}
+
+    def step(self, actions):
+        resetting = self.autoreset
+        self.observations[:] = actions
+        self.episode_steps += 1
+        rewards = np.ones(self.num_envs)
+        truncations = self.episode_steps >= self.max_episode_steps
+        terminations = np.zeros(self.num_envs, dtype=bool)
+        if self.mode == "NextStep":
+            self.observations[resetting] = 0.0
+            self.episode_steps[resetting] = 0
+            rewards[resetting] = 0.0
+            truncations[resetting] = False
+            self.autoreset = truncations
+        else:  # same step
+            self.observations[truncations] = 0.0
+            self.episode_steps[truncations] = 0
+        observations = self.observations.copy()
+        return observations, rewards, terminations, truncations, {}
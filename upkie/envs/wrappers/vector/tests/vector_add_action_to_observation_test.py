@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test vector AddActionToObservation wrapper."""
+
+import unittest
+
+import numpy as np
+
+from upkie.envs.wrappers.vector.add_action_to_observation import (
+    AddActionToObservation,
+)
+from upkie.envs.wrappers.vector.tests.envs import ActionObserverVectorEnv
+
+
+class AddActionToObservationTestCase(unittest.TestCase):
+    def test_observation(self):
+        env = AddActionToObservation(ActionObserverVectorEnv(num_envs=2))
+        self.assertEqual(env.observation_space.shape, (2, 2))
+        observations, _ = env.reset()
+        self.assertTrue(np.allclose(observations, 0.0))
+        actions = np.array([[1.0], [2.0]], dtype=np.float32)
+        observations, _, _, _, _ = env.step(actions)
+        self.assertTrue(np.allclose(observations, np.hstack([actions] * 2)))
+
+    def test_next_step_autoreset(self):
+        env = AddActionToObservation(
+            ActionObserverVectorEnv(num_envs=2, max_episode_steps=1)
+        )
+        env.reset()
+        actions = np.ones((2, 1), dtype=np.float32)
+        env.step(actions)
+        observations, _, _, _, _ = env.step(actions)
+        self.assertTrue(np.allclose(observations, 0.0))
+
+    def test_same_step_autoreset(self):
+        env = AddActionToObservation(
+            ActionObserverVectorEnv(
+                num_envs=2,
+                max_episode_steps=1,
+                mode="SameStep",
+            )
+        )
+        env.reset()
+        actions = np.ones((2, 1), dtype=np.float32)
+        observations, _, _, truncations, _ = env.step(actions)
+        self.assertTrue(truncations.all())
+        self.assertTrue(np.allclose(observations, 0.0))
+
+    def test_reset_mask(self):
+        env = AddActionToObservation(
+            ActionObserverVectorEnv(num_envs=2, mode="SameStep")
+        )
+        env.reset()
+        env.step(np.ones((2, 1), dtype=np.float32))
+        observations, _ = env.reset(
+            options={"reset_mask": np.array([False, True])}
+        )
+        self.assertTrue(np.allclose(observations[0], 1.0))
+        self.assertTrue(np.allclose(observations[1], 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()  # necessary for `bazel test`
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test vector AddLagToAction wrapper."""
+
+import unittest
+
+import gymnasium as gym
+import numpy as np
+
+from upkie.envs.wrappers.vector.add_lag_to_action import AddLagToAction
+from upkie.envs.wrappers.vector.tests.envs import ActionObserverVectorEnv
+
+
+class AddLagToActionTestCase(unittest.TestCase):
+    def test_per_env_time_constants(self):
+        env = ActionObserverVectorEnv(num_envs=3)
+        lag_env = AddLagToAction(env, time_constant=np.array([1.0, 0.1, 0.0]))
+        lag_env.reset()
+        actions = np.ones((3, 1))
+        observations, _, _, _, _ = lag_env.step(actions)
+        dt = env.dt
+        expected = np.array([[dt / 1.0], [dt / 0.1], [1.0]])  # no lag <= 2 dt
+        self.assertTrue(np.allclose(observations, expected))
+
+    def test_sampled_time_constants(self):
+        env = ActionObserverVectorEnv(num_envs=16)
+        box = gym.spaces.Box(low=0.1, high=0.2)
+        lag_env = AddLagToAction(env, time_constant=box)
+        lag_env.reset(seed=42)
+        self.assertTrue(np.all(lag_env.time_constant >= 0.1))
+        self.assertTrue(np.all(lag_env.time_constant <= 0.2))
+        self.assertGreater(np.ptp(lag_env.time_constant), 0.0)
+
+    def test_reset_mask(self):
+        env = ActionObserverVectorEnv(num_envs=2, mode="SameStep")
+        lag_env = AddLagToAction(env, time_constant=1.0)
+        lag_env.reset()
+        lag_env.step(np.ones((2, 1)))
+        lag_env.reset(options={"reset_mask": np.array([True, False])})
+        self.assertTrue(np.allclose(lag_env.filtered_action[0], 0.0))
+        self.assertGreater(lag_env.filtered_action[1, 0], 0.0)
+
+    def test_autoreset(self):
+        env = ActionObserverVectorEnv(num_envs=2, max_episode_steps=2)
+        lag_env = AddLagToAction(env, time_constant=1.0)
+        lag_env.reset()
+        lag_env.step(np.ones((2, 1)))
+        _, _, _, truncations, _ = lag_env.step(np.ones((2, 1)))
+        self.assertTrue(truncations.all())
+        observations, _, _, _, _ = lag_env.step(np.ones((2, 1)))
+        self.assertTrue(np.allclose(observations, 0.0))
+        self.assertTrue(np.allclose(lag_env.filtered_action, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()  # necessary for `bazel test`
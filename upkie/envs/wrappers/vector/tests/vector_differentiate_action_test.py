@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test vector DifferentiateAction wrapper."""
+
+import unittest
+
+import numpy as np
+
+from upkie.envs.wrappers.vector.differentiate_action import (
+    DifferentiateAction,
+)
+from upkie.envs.wrappers.vector.tests.envs import ActionObserverVectorEnv
+
+
+class DifferentiateActionTestCase(unittest.TestCase):
+    def setUp(self):
+        env = ActionObserverVectorEnv(num_envs=2, max_episode_steps=3)
+        self.env = DifferentiateAction(
+            env,
+            min_derivative=-100.0,
+            max_derivative=+100.0,
+            action_penalty=0.1,
+        )
+        self.env.reset()
+
+    def test_spaces(self):
+        self.assertEqual(self.env.action_space.shape, (2, 1))
+        self.assertEqual(self.env.single_action_space.high[0], 100.0)
+
+    def test_integral(self):
+        actions = np.array([[10.0], [20.0]])
+        dt = self.env.unwrapped.dt
+        observations, rewards, _, _, _ = self.env.step(actions)
+        self.assertTrue(np.allclose(observations, actions * dt))
+        observations, _, _, _, _ = self.env.step(actions)
+        self.assertTrue(np.allclose(observations, 2.0 * actions * dt))
+        self.assertTrue(np.allclose(rewards, [1.0 - 10.0, 1.0 - 40.0]))
+
+    def test_autoreset(self):
+        actions = np.array([[10.0], [20.0]])
+        for _ in range(3):
+            self.env.step(actions)
+        observations, rewards, _, _, _ = self.env.step(actions)
+        self.assertTrue(np.allclose(observations, 0.0))
+        self.assertTrue(np.allclose(rewards, 0.0))
+        observations, _, _, _, _ = self.env.step(actions)
+        self.assertTrue(np.allclose(observations, actions * 1e-3))
+
+
+if __name__ == "__main__":
+    unittest.main()  # necessary for `bazel test`
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test vector NoisifyAction wrapper."""
+
+import unittest
+
+import numpy as np
+
+from upkie.envs.wrappers.vector.noisify_action import NoisifyAction
+from upkie.envs.wrappers.vector.tests.envs import ActionObserverVectorEnv
+from upkie.exceptions import UpkieException
+
+
+class NoisifyActionTestCase(unittest.TestCase):
+    def test_per_env_noise(self):
+        env = ActionObserverVectorEnv(num_envs=2)
+        noisy_env = NoisifyAction(env, noise=np.array([[0.0], [0.1]]))
+        noisy_env.reset(seed=42)
+        observations, _, _, _, _ = noisy_env.step(np.ones((2, 1)))
+        self.assertAlmostEqual(observations[0, 0], 1.0)
+        self.assertNotAlmostEqual(observations[1, 0], 1.0)
+        self.assertLessEqual(abs(observations[1, 0] - 1.0), 0.1 + 1e-6)
+
+    def test_seeded_noise(self):
+        noisy_env = NoisifyAction(
+            ActionObserverVectorEnv(num_envs=2),
+            noise=np.array([0.1]),
+            block_size=4,
+        )
+        noisy_env.reset(seed=42)
+        first, _, _, _, _ = noisy_env.step(np.ones((2, 1)))
+        for _ in range(10):  # consume more than one block of noise
+            noisy_env.step(np.ones((2, 1)))
+        noisy_env.reset(seed=42)
+        second, _, _, _, _ = noisy_env.step(np.ones((2, 1)))
+        self.assertTrue(np.allclose(first, second))
+
+    def test_invalid_shape(self):
+        with self.assertRaises(UpkieException):
+            NoisifyAction(ActionObserverVectorEnv(), noise=np.zeros(2))
+
+
+if __name__ == "__main__":
+    unittest.main()  # necessary for `bazel test`
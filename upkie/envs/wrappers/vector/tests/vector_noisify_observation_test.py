@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test vector NoisifyObservation wrapper."""
+
+import unittest
+
+import numpy as np
+
+from upkie.envs import WheeledInvertedPendulumVectorEnv
+from upkie.envs.wrappers.vector.noisify_observation import (
+    NoisifyObservation,
+)
+from upkie.exceptions import UpkieException
+
+
+class NoisifyObservationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.vector_env = WheeledInvertedPendulumVectorEnv(num_envs=2)
+
+    def test_per_env_noise(self):
+        noise = np.array([[0.0, 0.0, 0.0, 0.0], [0.1, 0.1, 0.1, 0.1]])
+        noisy_env = NoisifyObservation(self.vector_env, noise=noise)
+        observations, _ = noisy_env.reset(seed=42)
+        self.assertTrue(np.allclose(observations[0], 0.0))
+        self.assertFalse(np.allclose(observations[1], 0.0))
+        self.assertTrue(np.all(np.abs(observations[1]) <= 0.1))
+
+    def test_seeded_noise(self):
+        noisy_env = NoisifyObservation(
+            self.vector_env, noise=np.full(4, 0.1), block_size=4
+        )
+        first, _ = noisy_env.reset(seed=42)
+        for _ in range(10):  # consume more than one block of noise
+            noisy_env.step(np.zeros((2, 1)))
+        second, _ = noisy_env.reset(seed=42)
+        self.assertTrue(np.allclose(first, second))
+
+    def test_invalid_shape(self):
+        with self.assertRaises(UpkieException):
+            NoisifyObservation(self.vector_env, noise=np.zeros(3))
+
+
+if __name__ == "__main__":
+    unittest.main()  # necessary for `bazel test`
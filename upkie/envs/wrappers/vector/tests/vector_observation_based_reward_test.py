@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test vector ObservationBasedReward wrapper."""
+
+import unittest
+
+import numpy as np
+
+from upkie.envs.wrappers.vector.observation_based_reward import (
+    ObservationBasedReward,
+)
+from upkie.envs.wrappers.vector.tests.envs import ActionObserverVectorEnv
+
+
+class TestReward(ObservationBasedReward):
+    def rewards(self, observations, infos):
+        return observations[:, 0] + 42.0
+
+
+class ObservationBasedRewardTestCase(unittest.TestCase):
+    def test_rewards(self):
+        env = TestReward(ActionObserverVectorEnv(num_envs=2))
+        env.reset()
+        _, rewards, _, _, _ = env.step(np.array([[1.0], [2.0]]))
+        self.assertTrue(np.allclose(rewards, [43.0, 44.0]))
+
+    def test_autoreset(self):
+        env = TestReward(
+            ActionObserverVectorEnv(num_envs=2, max_episode_steps=1)
+        )
+        env.reset()
+        env.step(np.ones((2, 1)))
+        _, rewards, _, _, _ = env.step(np.ones((2, 1)))
+        self.assertTrue(np.allclose(rewards, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()  # necessary for `bazel test`
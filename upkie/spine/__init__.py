@@ -7,11 +7,17 @@
 ## \namespace upkie.spine
 ## \brief Python interface for agents to interact with a spine.
 
+from .async_spine_interface import AsyncSpineInterface
+from .latency_recorder import LatencyRecorder
+from .observation_view import ObservationView
 from .request import Request
 from .serialize import serialize
 from .spine_interface import SpineInterface
 
 __all__ = [
+    "AsyncSpineInterface",
+    "LatencyRecorder",
+    "ObservationView",
     "Request",
     "SpineInterface",
     "serialize",
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""!
+Asynchronous interface to interact with a spine from an asyncio agent.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+import numpy as np
+
+from .spine_interface import SpineInterface
+
+
+class AsyncSpineInterface:
+    r"""!
+    Awaitable wrapper around a \ref SpineInterface.
+
+    Waiting for the spine happens in a dedicated poller thread, so that the
+    event loop keeps serving other coroutines (joystick, telemetry, ...) in
+    the meantime. Blocking waits are enabled on the wrapped spine interface:
+    its poller thread then sleeps on a futex, releasing the GIL, rather than
+    competing for it with the event loop.
+    """
+
+    _executor: ThreadPoolExecutor
+
+    ## \var spine
+    ## Wrapped synchronous spine interface.
+    spine: SpineInterface
+
+    def __init__(self, spine: SpineInterface):
+        r"""!
+        Wrap a synchronous spine interface.
+
+        \param spine Spine interface to wrap. Its blocking waits are enabled
+            if they were not already.
+        """
+        if isinstance(spine, SpineInterface):
+            spine.enable_blocking_wait()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="spine_poller",
+        )
+        self.spine = spine
+
+    def close(self) -> None:
+        """!
+        Stop the poller thread.
+        """
+        self._executor.shutdown(wait=True)
+
+    async def __run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    async def set_action(
+        self, action: Optional[dict]
+    ) -> Union[dict, np.ndarray]:
+        r"""!
+        Set action for the spine to process.
+
+        \param[in] action Action dictionary, see \ref
+            SpineInterface.set_action.
+        \return Observation dictionary, or observation view in schema mode.
+        """
+        return await self.__run(self.spine.set_action, action)
+
+    async def start(self, config: dict) -> dict:
+        r"""!
+        Reset the spine to a new configuration.
+
+        \param config Configuration dictionary.
+        \return Initial observation dictionary.
+        """
+        return await self.__run(self.spine.start, config)
+
+    async def stop(self) -> None:
+        """!
+        Tell the spine to stop all actuators.
+        """
+        await self.__run(self.spine.stop)
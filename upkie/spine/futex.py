@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""!
+Futex on a 32-bit word of a shared-memory buffer.
+"""
+
+import ctypes
+import errno
+import os
+import platform
+import sys
+from typing import Optional
+
+from ..exceptions import UpkieRuntimeError
+
+## \var SYS_FUTEX
+## Number of the futex system call on the current platform, or `None` if
+## futexes are not available.
+SYS_FUTEX: Optional[int] = (
+    {
+        "aarch64": 98,
+        "arm64": 98,
+        "armv6l": 240,
+        "armv7l": 240,
+        "x86_64": 202,
+    }.get(platform.machine())
+    if sys.platform.startswith("linux")
+    else None
+)
+
+FUTEX_WAIT: int = 0
+FUTEX_WAKE: int = 1
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class Futex:
+    r"""!
+    Futex on a 32-bit word of a writable buffer, typically a memory map
+    shared with the spine.
+
+    Waiting on a futex puts the calling thread to sleep until another process
+    wakes it up or changes the value of the word. Contrary to spinning, this
+    does not keep a CPU core busy.
+    """
+
+    def __init__(self, buffer, offset: int = 0):
+        r"""!
+        Map futex to a word in a buffer.
+
+        \param buffer Writable buffer, for instance an `mmap.mmap`.
+        \param offset Offset of the 32-bit word in the buffer, in bytes.
+        \throw UpkieRuntimeError If futexes are not supported on this
+            platform.
+        """
+        if SYS_FUTEX is None:
+            raise UpkieRuntimeError(
+                f"futexes are not supported on {sys.platform} "
+                f"({platform.machine()})"
+            )
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._timespec = _Timespec()
+        self._word = ctypes.c_uint32.from_buffer(buffer, offset)
+        self._address = ctypes.addressof(self._word)
+
+    def close(self) -> None:
+        """!
+        Release our reference to the underlying buffer.
+
+        This function needs to be called before closing a memory map the
+        futex was built from.
+        """
+        if hasattr(self, "_word"):
+            del self._word
+
+    def wait(self, expected: int, timeout_ns: int) -> None:
+        r"""!
+        Sleep while the futex word is equal to an expected value.
+
+        \param expected Expected value of the word. The function returns right
+            away if the word has a different value.
+        \param timeout_ns Maximum duration to sleep for, in nanoseconds.
+
+        This function may return spuriously, for instance upon signal
+        interruption. Callers should check the value of the word after it
+        returns.
+        """
+        self._timespec.tv_sec = timeout_ns // 1_000_000_000
+        self._timespec.tv_nsec = timeout_ns % 1_000_000_000
+        ret = self._libc.syscall(
+            ctypes.c_long(SYS_FUTEX),
+            ctypes.c_void_p(self._address),
+            ctypes.c_int(FUTEX_WAIT),
+            ctypes.c_uint32(expected),
+            ctypes.byref(self._timespec),
+            ctypes.c_void_p(None),
+            ctypes.c_uint32(0),
+        )
+        if ret < 0:
+            error = ctypes.get_errno()
+            if error not in (errno.EAGAIN, errno.EINTR, errno.ETIMEDOUT):
+                raise OSError(error, os.strerror(error))
+
+    def wake(self) -> int:
+        r"""!
+        Wake up all processes waiting on the futex.
+
+        \return Number of processes woken up.
+        """
+        ret = self._libc.syscall(
+            ctypes.c_long(SYS_FUTEX),
+            ctypes.c_void_p(self._address),
+            ctypes.c_int(FUTEX_WAKE),
+            ctypes.c_int(2**31 - 1),
+            ctypes.c_void_p(None),
+            ctypes.c_void_p(None),
+            ctypes.c_uint32(0),
+        )
+        if ret < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        return ret
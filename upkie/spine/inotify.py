@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""!
+Watch a directory for new files with inotify.
+"""
+
+import ctypes
+import os
+import select
+import sys
+
+from ..exceptions import UpkieRuntimeError
+
+IN_CLOEXEC: int = 0o2000000
+IN_CREATE: int = 0x00000100
+IN_MOVED_TO: int = 0x00000080
+IN_NONBLOCK: int = 0o4000
+
+
+class Inotify:
+    r"""!
+    Watch for files created in (or moved to) a directory.
+
+    Waiting on the watch puts the calling thread to sleep until a file appears
+    in the directory, which lets callers react right away rather than polling
+    the file system at a fixed period.
+    """
+
+    def __init__(self, path: str):
+        r"""!
+        Start watching a directory.
+
+        \param path Path to the directory to watch.
+        \throw UpkieRuntimeError If inotify is not supported on this platform.
+        \throw OSError If the watch could not be added, for instance if the
+            directory does not exist.
+        """
+        if not sys.platform.startswith("linux"):
+            raise UpkieRuntimeError(
+                f"inotify is not supported on {sys.platform}"
+            )
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        ret = libc.inotify_add_watch(
+            fd, os.fsencode(path), IN_CREATE | IN_MOVED_TO
+        )
+        if ret < 0:
+            error = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(error, os.strerror(error), path)
+        self._fd = fd
+
+    def __del__(self):
+        """!
+        Close the inotify file descriptor.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """!
+        Stop watching the directory.
+        """
+        if getattr(self, "_fd", None) is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def wait(self, timeout: float) -> bool:
+        r"""!
+        Sleep until a file appears in the directory.
+
+        \param timeout Maximum duration to sleep for, in seconds.
+        \return True if a file appeared, false if the timeout expired.
+
+        Pending events are consumed, so that the next call waits for new
+        files only.
+        """
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0.0))
+        if not readable:
+            return False
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:  # no more events
+            pass
+        return True
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""!
+Record durations of the phases of spine round trips.
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from ..exceptions import UpkieRuntimeError
+from ..utils.spdlog import logging
+
+
+class LatencyRecorder:
+    r"""!
+    Ring buffer of per-phase durations of spine round trips.
+
+    Each round trip of \ref SpineInterface.set_action is split into four
+    phases:
+
+    - `wait`: waiting for the spine to be available before writing the action.
+    - `write`: serializing and writing the action to shared memory.
+    - `spine`: waiting for the spine to process the action.
+    - `read`: reading the observation from shared memory.
+
+    Round trips split between `set_action_async` and `get_observation` are
+    not recorded, as their `spine` phase would include the work of the agent
+    in between.
+
+    Durations are recorded in nanoseconds into a buffer allocated once at
+    construction, so that recording does not allocate memory in the control
+    loop.
+    """
+
+    ## \var PHASES
+    ## Names of the phases of a round trip, in chronological order.
+    PHASES: Tuple[str, ...] = ("wait", "write", "spine", "read")
+
+    ## \var durations
+    ## Buffer of durations in nanoseconds, one row per round trip and one
+    ## column per phase.
+    durations: np.ndarray
+
+    ## \var log_period
+    ## Number of round trips between two summary logs, or zero to disable
+    ## summary logging.
+    log_period: int
+
+    def __init__(self, capacity: int = 4096, log_period: int = 0):
+        r"""!
+        Allocate the ring buffer.
+
+        \param capacity Number of round trips kept in the buffer.
+        \param log_period Number of round trips between two summary logs.
+            Set to zero (default) to disable summary logging.
+        """
+        self.__count = 0
+        self.durations = np.zeros((capacity, len(self.PHASES)), dtype=np.int64)
+        self.log_period = log_period
+
+    def __len__(self) -> int:
+        """!
+        Number of round trips currently in the buffer.
+        """
+        return min(self.__count, self.durations.shape[0])
+
+    @property
+    def count(self) -> int:
+        """!
+        Total number of round trips recorded since the last reset.
+        """
+        return self.__count
+
+    def record(self, timestamps: Sequence[int]) -> None:
+        r"""!
+        Record a new round trip.
+
+        \param timestamps Timestamps in nanoseconds at the beginning of the
+            round trip and at the end of each phase, that is, one more
+            timestamp than there are phases.
+        """
+        row = self.durations[self.__count % self.durations.shape[0]]
+        for phase in range(len(self.PHASES)):
+            row[phase] = timestamps[phase + 1] - timestamps[phase]
+        self.__count += 1
+        if self.log_period > 0 and self.__count % self.log_period == 0:
+            self.log_summary()
+
+    def reset(self) -> None:
+        """!
+        Forget all recorded round trips.
+        """
+        self.__count = 0
+
+    def histogram(
+        self, phase: str, bins: int = 20
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        r"""!
+        Histogram of the durations of a phase.
+
+        \param phase Name of the phase, or "total" for full round trips.
+        \param bins Number of bins.
+        \return Pair `(counts, bin_edges)` as returned by `numpy.histogram`,
+            with bin edges in microseconds.
+        """
+        return np.histogram(self.__phase_durations_us(phase), bins=bins)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        r"""!
+        Percentiles of the durations of each phase.
+
+        \return Dictionary mapping each phase, plus "total" for full round
+            trips, to its median ("p50"), 99th percentile ("p99") and
+            maximum ("max") durations in microseconds.
+        """
+        output = {}
+        for phase in self.PHASES + ("total",):
+            durations = self.__phase_durations_us(phase)
+            p50, p99 = np.percentile(durations, [50.0, 99.0])
+            output[phase] = {
+                "p50": float(p50),
+                "p99": float(p99),
+                "max": float(durations.max()),
+            }
+        return output
+
+    def log_summary(self) -> None:
+        """!
+        Log percentiles of the durations of each phase.
+        """
+        summary = self.summary()
+        logging.info(
+            "Spine round trips over the last %d steps: %s",
+            len(self),
+            ", ".join(
+                f"{phase} p50={stats['p50']:.1f} p99={stats['p99']:.1f} "
+                f"max={stats['max']:.1f} us"
+                for phase, stats in summary.items()
+            ),
+        )
+
+    def __phase_durations_us(self, phase: str) -> np.ndarray:
+        if len(self) < 1:
+            raise UpkieRuntimeError("no round trip recorded yet")
+        durations = self.durations[: len(self)]
+        if phase == "total":
+            return 1e-3 * durations.sum(axis=1)
+        return 1e-3 * durations[:, self.PHASES.index(phase)]
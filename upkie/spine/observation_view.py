@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""!
+Nested dictionary view over flat observations.
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Union
+
+import numpy as np
+
+
+def _field_tree(names) -> dict:
+    r"""!
+    Arrange dotted field names in a tree of nested dictionaries.
+
+    \param names Field names, with keys separated by dots.
+    \return Tree whose leaves are the full field names.
+    """
+    tree: dict = {}
+    for name in names:
+        node = tree
+        keys = name.split(".")
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+        node[keys[-1]] = name
+    return tree
+
+
+class ObservationView(Mapping):
+    r"""!
+    Read-only nested dictionary view over a flat observation.
+
+    In schema mode, \ref SpineInterface.observation_view exposes observations
+    as a structured array whose field names are dotted paths such as
+    `"base_orientation.pitch"`. This view makes the same array accessible as
+    nested dictionaries, e.g. `view["base_orientation"]["pitch"]`, without
+    decoding anything upfront: sub-dictionaries are only created for keys
+    that are accessed.
+
+    Values are read from shared memory at access time. Scalars are returned
+    as floats, while vectors are returned as arrays that share memory with
+    the observation, and are thus updated in place at every step. Call \ref
+    to_dict to get a copy of the full observation.
+    """
+
+    ## \var array
+    ## Structured array of the flat observation.
+    array: np.ndarray
+
+    def __init__(self, array: np.ndarray, tree: Optional[dict] = None):
+        r"""!
+        Create a view over a flat observation.
+
+        \param array Structured array of the flat observation.
+        \param tree Tree of field names, computed from the array data type if
+            not provided. Sub-views share subtrees of their parent's tree.
+        """
+        self.array = array
+        self.__tree = (
+            tree if tree is not None else _field_tree(array.dtype.names)
+        )
+
+    def __getitem__(
+        self, key: str
+    ) -> Union["ObservationView", float, np.ndarray]:
+        r"""!
+        Get a sub-dictionary or value.
+
+        \param key Key of the sub-dictionary or value.
+        \return Sub-dictionary view or observation value.
+        """
+        node = self.__tree[key]
+        if isinstance(node, dict):
+            return ObservationView(self.array, node)
+        value = self.array[node]
+        return float(value) if value.ndim == 0 else value
+
+    def __iter__(self) -> Iterator[str]:
+        """!
+        Iterate over keys at this level of the observation.
+        """
+        return iter(self.__tree)
+
+    def __len__(self) -> int:
+        """!
+        Number of keys at this level of the observation.
+        """
+        return len(self.__tree)
+
+    def __repr__(self) -> str:
+        """!
+        String representation of the observation.
+        """
+        return f"ObservationView({self.to_dict()})"
+
+    def to_dict(self) -> Dict[str, Union[dict, float, np.ndarray]]:
+        r"""!
+        Copy the observation to nested dictionaries.
+
+        \return Observation dictionary, independent from shared memory.
+        """
+        return {
+            key: (
+                value.to_dict()
+                if isinstance(value, ObservationView)
+                else np.copy(value)
+                if isinstance(value, np.ndarray)
+                else value
+            )
+            for key, value in self.items()
+        }
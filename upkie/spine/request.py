@@ -32,6 +32,13 @@ class Request(IntEnum):
 
     @var kError
     Flag set when the last request was invalid.
+
+    @var kActions
+    Flag set to indicate a batch of actions has been supplied. Only simulated
+    spines support action batches.
+
+    @var kInitializing
+    Flag set by the spine until it is ready to process requests.
     """
 
     kNone = 0
@@ -39,3 +46,5 @@ class Request(IntEnum):
     kStart = 2
     kStop = 3
     kError = 4
+    kActions = 5
+    kInitializing = 6
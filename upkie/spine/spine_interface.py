@@ -9,30 +9,215 @@
 Inter-process communication interface.
 """
 
+import math
 import mmap
+import secrets
 import sys
 from time import perf_counter_ns
+from typing import List, Optional, Sequence, Tuple, Union
 
 import msgpack
+import numpy as np
 
-from ..exceptions import PerformanceIssue, SpineError
+from ..exceptions import PerformanceIssue, SpineError, UpkieRuntimeError
+from ..utils.spdlog import logging
+from .futex import SYS_FUTEX, Futex
+from .latency_recorder import LatencyRecorder
 from .request import Request
 from .serialize import serialize
 from .wait_for_shared_memory import wait_for_shared_memory
 
 
+def flat_layout_dtype(layout: dict) -> np.dtype:
+    r"""!
+    Get the NumPy structured data type of a flat layout.
+
+    \param layout Dictionary mapping field names to their "offset" and "size"
+        in the layout, both counted in doubles, as published by the spine in
+        schema mode.
+    \return Structured data type with one little-endian double (or subarray
+        of doubles) per field.
+    """
+    names = sorted(layout, key=lambda name: layout[name]["offset"])
+    formats = [
+        "<f8" if layout[name]["size"] == 1 else ("<f8", layout[name]["size"])
+        for name in names
+    ]
+    offsets = [8 * layout[name]["offset"] for name in names]
+    itemsize = 8 * max(
+        (field["offset"] + field["size"] for field in layout.values()),
+        default=0,
+    )
+    return np.dtype(
+        {
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": itemsize,
+        }
+    )
+
+
+def _same_value(value, last_value) -> bool:
+    r"""!
+    Check whether an action value is unchanged since it was last sent.
+
+    \param value Action value.
+    \param last_value Value last sent to the spine.
+    \return True if and only if both values are equal, where NaNs are
+        considered equal to each other.
+    """
+    if isinstance(value, np.ndarray) or isinstance(last_value, np.ndarray):
+        if not isinstance(value, np.ndarray) or not isinstance(
+            last_value, np.ndarray
+        ):
+            return False
+        equal_nan = value.dtype.kind in "fc" and last_value.dtype.kind in "fc"
+        return np.array_equal(value, last_value, equal_nan=equal_nan)
+    if type(value) is not type(last_value):
+        return False
+    if isinstance(value, float) and math.isnan(value):
+        return math.isnan(last_value)
+    return value == last_value
+
+
+def _update_delta(action: dict, last_action: dict) -> dict:
+    r"""!
+    Extract the leaves of an action that changed since the last one.
+
+    \param action Action dictionary.
+    \param[in, out] last_action Action last sent to the spine, updated with
+        the changed leaves.
+    \return Dictionary with only the leaves of the action that changed.
+    """
+    delta = {}
+    for key, value in action.items():
+        if isinstance(value, dict):
+            last_value = last_action.get(key)
+            if not isinstance(last_value, dict):
+                last_value = last_action[key] = {}
+            sub_delta = _update_delta(value, last_value)
+            if sub_delta:
+                delta[key] = sub_delta
+        elif key not in last_action or not _same_value(
+            value, last_action[key]
+        ):
+            last_action[key] = (
+                value.copy()
+                if isinstance(value, (list, np.ndarray))
+                else value
+            )
+            delta[key] = value
+    return delta
+
+
+def _remove_keys(config: dict, last_config: dict) -> dict:
+    r"""!
+    Remove the keys of the last configuration that a new one doesn't have.
+
+    \param config New configuration dictionary.
+    \param[in, out] last_config Configuration last sent to the spine, from
+        which removed keys are deleted.
+    \return Dictionary with the same structure as the configuration, whose
+        leaves are the removed keys.
+    """
+    removed_keys = {}
+    for key in list(last_config):
+        if key not in config:
+            removed_keys[key] = True
+            del last_config[key]
+        elif isinstance(last_config[key], dict) and isinstance(
+            config[key], dict
+        ):
+            sub_removed = _remove_keys(config[key], last_config[key])
+            if sub_removed:
+                removed_keys[key] = sub_removed
+    return removed_keys
+
+
+def _changes_type(config: dict, last_config: dict) -> bool:
+    r"""!
+    Check whether a configuration changes the type of a value it shares with
+    the last one, which the spine can't merge into its configuration.
+
+    \param config New configuration dictionary.
+    \param last_config Configuration last sent to the spine.
+    \return True if and only if a value present in both configurations has
+        a different type, or an array value has a different shape.
+    """
+    for key, value in config.items():
+        if key not in last_config:
+            continue
+        last_value = last_config[key]
+        if isinstance(value, dict) and isinstance(last_value, dict):
+            if _changes_type(value, last_value):
+                return True
+        elif type(value) is not type(last_value):
+            return True
+        elif isinstance(value, (list, np.ndarray)):
+            if np.shape(value) != np.shape(last_value):
+                return True
+    return False
+
+
 class SpineInterface:
-    """!
+    r"""!
     Interface to interact with a spine from a Python agent.
+
+    In schema mode, the spine publishes flat layouts of its observation and
+    action dictionaries when it starts. Subsequent observations and actions
+    are then exchanged as arrays of doubles in shared memory, exposed as NumPy
+    structured arrays by \ref observation_view and \ref action_view.
+
+    In delta mode, the interface only sends action values that changed since
+    the previous action. This works because the spine merges every action it
+    receives into the action it keeps from one cycle to the next.
+
+    Similarly, in delta-config mode, the interface only sends configuration
+    values that changed since the last start, along with the identifier of
+    the configuration they apply to and the keys that were removed since
+    then. The spine merges them into the configuration it kept, or replies
+    with the identifier of its own configuration if they don't match, in
+    which case the interface restarts the spine with the full configuration.
+    The full configuration is also sent when a value changes type, for
+    instance from an integer to a float, as the spine can't merge it.
     """
 
+    _action_fields: List[Tuple[str, Tuple[str, ...]]]
+    _action_offset: Optional[int]
+    _buffer: memoryview
+    _config_id: Optional[str]
+    _futex: Optional[Futex]
+    _last_action: Optional[dict]
+    _last_config: Optional[dict]
     _mmap: mmap.mmap
 
+    ## \var action_view
+    ## Structured array over flat actions in shared memory, in schema mode
+    ## after the spine has started. `None` otherwise.
+    action_view: Optional[np.ndarray]
+
+    ## \var latency
+    ## Durations of the phases of spine round trips, if instrumentation is
+    ## enabled. `None` otherwise.
+    latency: Optional[LatencyRecorder]
+
+    ## \var observation_view
+    ## Structured array over flat observations in shared memory, in schema
+    ## mode after the spine has started. `None` otherwise.
+    observation_view: Optional[np.ndarray]
+
     def __init__(
         self,
         shm_name: str = "/upkie",
         retries: int = 1,
         perf_checks: bool = True,
+        blocking_wait: bool = False,
+        schema: bool = False,
+        delta_actions: bool = False,
+        full_action_period: int = 100,
+        delta_config: bool = False,
+        latency: Optional[LatencyRecorder] = None,
     ):
         r"""!
         Connect to the spine shared memory.
@@ -40,20 +225,58 @@ class SpineInterface:
         \param shm_name Name of the shared memory object.
         \param retries Number of times to try opening the shared-memory file.
         \param perf_checks If true, run performance checks after construction.
+        \param blocking_wait If true, sleep on a futex while waiting for the
+            spine rather than busy-polling the request field. This frees the
+            agent's CPU core at the cost of a few microseconds of wake-up
+            latency. Falls back to busy-polling on platforms without futexes.
+        \param schema If true, ask the spine to exchange observations and
+            actions in flat layouts negotiated at every start.
+        \param delta_actions If true, only send action values that changed
+            since the previous action. Does not apply in schema mode.
+        \param full_action_period In delta mode, send the full action once
+            every this many actions, in case the spine missed an update.
+        \param delta_config If true, only send configuration values that
+            changed since the last start, along with the keys that were
+            removed since then.
+        \param latency Optional recorder for the durations of the phases of
+            each round trip to the spine by \ref set_action.
         """
         shared_memory = wait_for_shared_memory(shm_name, retries)
+        self._action_fields = []
+        self._action_offset = None
+        self._action_pending = False
+        self._buffer = shared_memory.buf
+        self._config_id = None
+        self._delta_actions = delta_actions
+        self._delta_config = delta_config
+        self._delta_count = 0
+        self._full_action_period = full_action_period
+        self._futex = None
+        self._last_action = None
+        self._last_config = None
         self._mmap = shared_memory._mmap
         self._packer = msgpack.Packer(default=serialize, use_bin_type=True)
+        self._schema = schema
         self._shared_memory = shared_memory
         self._stop_waiting = set([Request.kNone, Request.kError])
-        self._unpacker = msgpack.Unpacker(raw=False)
+        self._timestamps = [0] * (len(LatencyRecorder.PHASES) + 1)
+        self.action_view = None
+        self.latency = latency
+        self.observation_view = None
+        if blocking_wait:
+            self.enable_blocking_wait()
         if perf_checks:
             self.__perf_checks()
 
     def __perf_checks(self):
         packer_cls = str(msgpack.Packer)
         unpacker_cls = str(msgpack.Unpacker)
-        if "fallback" in packer_cls or "fallback" in unpacker_cls:
+        unpackb_module = msgpack.unpackb.__module__
+        if (
+            "fallback" in packer_cls
+            or "fallback" in unpacker_cls
+            or "fallback" in unpackb_module
+        ):
             # See https://github.com/upkie/upkie/issues/377
             raise PerformanceIssue("msgpack is running in pure Python")
 
@@ -64,22 +287,115 @@ class SpineInterface:
         Note that the spine process will unlink the shared memory object, so we
         don't unlink it here.
         """
+        self.action_view = None  # views hold exports on the buffer
+        self.observation_view = None
+        if getattr(self, "_futex", None) is not None:
+            self._futex.close()  # release buffer before closing the mmap
         if hasattr(self, "_shared_memory"):  # handle ctor exceptions
             self._shared_memory.close()
 
-    def set_action(self, action: dict) -> dict:
+    def enable_blocking_wait(self) -> None:
+        r"""!
+        Sleep on a futex while waiting for the spine rather than busy-polling.
+
+        Falls back to busy-polling, with a warning, on platforms without
+        futexes. Calling this function again has no effect.
+        """
+        if self._futex is not None:
+            return
+        if SYS_FUTEX is None:
+            logging.warning(
+                "Futexes are not available on this platform, "
+                "the spine interface will busy-poll instead"
+            )
+            return
+        self._futex = Futex(self._mmap)
+
+    def set_action(self, action: Optional[dict]) -> Union[dict, np.ndarray]:
         r"""!
         Set action for the spine to process.
 
-        \param[in] action Action dictionary.
-        \return Observation dictionary.
+        \param[in] action Action dictionary. In schema mode, values for keys
+            that are not part of the action layout are ignored, and the action
+            can be `None` if it was directly written to \ref action_view.
+        \return Observation dictionary, or \ref observation_view in schema
+            mode. Note that the latter is updated in place at every step.
+
+        This function is equivalent to \ref set_action_async followed by \ref
+        get_observation. Only its round trips are recorded by \ref latency,
+        as the spine phase of split calls would include the work of the agent
+        in between.
         """
+        instrumented = self.latency is not None
+        self._submit_action(action, instrumented)
+        return self._collect_observation(instrumented)
+
+    def set_action_async(self, action: Optional[dict]) -> None:
+        r"""!
+        Submit an action for the spine to process, without waiting for the
+        resulting observation.
+
+        \param[in] action Action dictionary, see \ref set_action.
+        \throw UpkieRuntimeError If the observation resulting from the
+            previous action has not been read yet.
+
+        The agent can carry on with other computations while the spine
+        processes the action, then call \ref get_observation to collect the
+        resulting observation.
+        """
+        self._submit_action(action, instrumented=False)
+
+    def set_actions(self, actions: Sequence[dict]) -> List[dict]:
+        r"""!
+        Send a batch of actions for the spine to execute back-to-back.
+
+        \param[in] actions Sequence of action dictionaries, executed in that
+            order as consecutive steps.
+        \return List of observation dictionaries, one after each action. They
+            are dictionaries in schema mode as well.
+        \throw SpineError If the spine does not support action batches, which
+            is the case of spines that are not simulated, or if it could not
+            reply because the batch of observations did not fit in shared
+            memory. The spine may have executed part of the batch in the
+            latter case, so that agents should reset it.
+        \throw UpkieRuntimeError If the batch of actions does not fit in
+            shared memory.
+
+        This function sends all actions in a single request, so that the
+        round-trip overhead is paid once per batch rather than once per step.
+        The interface waits for up to 100 ms per action of the batch.
+        """
+        if self._action_pending:
+            raise UpkieRuntimeError(
+                "Observation from the previous action was not read, "
+                "call `get_observation` before submitting new actions"
+            )
+        if len(actions) < 1:
+            return []
+        self._last_action = None  # next action in delta mode is a full one
         self._wait_for_spine()
-        self._write_dict(action)
-        self._write_request(Request.kAction)
-        self._wait_for_spine()
-        observation = self._read_dict()
-        return observation
+        self._write_action_batch(actions)
+        self._write_request(Request.kActions)
+        self._wait_for_spine(timeout_ns=100_000_000 * len(actions))
+        observations = self._read_observation_batch()
+        if len(observations) != len(actions):
+            raise SpineError(
+                f"Spine replied {len(observations)} observations to a batch "
+                f"of {len(actions)} actions, it may not have enough shared "
+                "memory for the batch of observations"
+            )
+        return observations
+
+    def get_observation(self) -> Union[dict, np.ndarray]:
+        r"""!
+        Wait for the spine to process the action submitted by \ref
+        set_action_async, and return the resulting observation.
+
+        \return Observation dictionary, or \ref observation_view in schema
+            mode.
+        \throw UpkieRuntimeError If no action was submitted.
+        """
+        return self._collect_observation(instrumented=False)
 
     def start(self, config: dict) -> dict:
         r"""!
@@ -87,21 +403,171 @@ class SpineInterface:
 
         \param[in] config Configuration dictionary.
         \return Observation dictionary.
+        \throw SpineError In schema mode, if the spine did not reply with its
+            flat layouts.
         """
-        self._wait_for_spine()
-        self._write_dict(config)
-        self._write_request(Request.kStart)
-        self._wait_for_spine()
-        observation = self._read_dict()
+        self._action_pending = False
+        self._last_action = None  # the spine resets its action as well
+        if self._schema:
+            spine_config = config.get("spine", {})
+            config = {**config, "spine": {**spine_config, "schema": True}}
+        observation = None
+        if (
+            self._delta_config
+            and self._last_config is not None
+            and not _changes_type(config, self._last_config)
+        ):
+            observation = self._send_config(self._get_config_update(config))
+            if observation.pop("config_id", None) != self._config_id:
+                logging.warning(
+                    "Spine did not apply the configuration update, "
+                    "restarting it with the full configuration"
+                )
+                self.stop()
+                observation = None
+        if observation is None:
+            observation = self._send_config(self._get_full_config(config))
+            observation.pop("config_id", None)
+        if self._schema:
+            if "schema" not in observation:
+                raise SpineError(
+                    "Spine did not reply with flat layouts in schema mode, "
+                    "does it support schemas?"
+                )
+            self._set_schema(observation.pop("schema"))
         return observation
 
     def stop(self) -> None:
         """!
         Tell the spine to stop all actuators.
         """
+        self._action_pending = False
         self._wait_for_spine()
         self._write_request(Request.kStop)
 
+    def _collect_observation(
+        self, instrumented: bool
+    ) -> Union[dict, np.ndarray]:
+        r"""!
+        Wait for the spine to process the pending action and read the
+        resulting observation.
+
+        \param instrumented If set, record the round trip in \ref latency.
+        \return Observation dictionary, or \ref observation_view in schema
+            mode.
+        \throw UpkieRuntimeError If no action was submitted.
+        """
+        if not self._action_pending:
+            raise UpkieRuntimeError(
+                "No pending action, call `set_action_async` first"
+            )
+        self._action_pending = False
+        self._wait_for_spine()
+        if not instrumented:
+            if self.observation_view is not None:
+                return self.observation_view
+            return self._read_dict()
+        self._timestamps[3] = perf_counter_ns()
+        observation = (
+            self.observation_view
+            if self.observation_view is not None
+            else self._read_dict()
+        )
+        self._timestamps[4] = perf_counter_ns()
+        self.latency.record(self._timestamps)
+        return observation
+
+    def _get_config_update(self, config: dict) -> dict:
+        r"""!
+        Get the part of a configuration to send in delta-config mode.
+
+        \param config Full configuration dictionary.
+        \return Dictionary with only the configuration values that changed
+            since the last start, along with the identifiers of the previous
+            and new configurations, and the keys removed since the last start
+            if any.
+        """
+        base_config_id = self._config_id
+        self._config_id = secrets.token_hex(8)
+        removed_keys = _remove_keys(config, self._last_config)
+        update = _update_delta(config, self._last_config)
+        spine_update = update.get("spine", {})
+        update["spine"] = {
+            **spine_update,
+            "base_config_id": base_config_id,
+            "config_id": self._config_id,
+        }
+        if removed_keys:
+            update["spine"]["removed_keys"] = removed_keys
+        return update
+
+    def _get_delta_action(self, action: dict) -> dict:
+        r"""!
+        Get the part of an action to send in delta mode.
+
+        \param action Full action dictionary.
+        \return Dictionary with only the action values that changed since the
+            previous action, or the full action at refresh cycles.
+        """
+        if self._last_action is None or self._delta_count <= 0:
+            self._delta_count = self._full_action_period - 1
+            self._last_action = {}
+            _update_delta(action, self._last_action)
+            return action
+        self._delta_count -= 1
+        return _update_delta(action, self._last_action)
+
+    def _get_full_config(self, config: dict) -> dict:
+        r"""!
+        Get the full configuration to send to the spine.
+
+        \param config Configuration dictionary.
+        \return Same configuration, with a new configuration identifier in
+            delta-config mode.
+        """
+        if not self._delta_config:
+            return config
+        self._config_id = secrets.token_hex(8)
+        self._last_config = {}
+        _update_delta(config, self._last_config)
+        spine_config = config.get("spine", {})
+        return {
+            **config,
+            "spine": {**spine_config, "config_id": self._config_id},
+        }
+
+    def _submit_action(
+        self, action: Optional[dict], instrumented: bool
+    ) -> None:
+        r"""!
+        Write an action to shared memory and request the spine to process it.
+
+        \param[in] action Action dictionary, see \ref set_action.
+        \param instrumented If set, timestamp the phases of the round trip.
+        \throw UpkieRuntimeError If the observation resulting from the
+            previous action has not been read yet.
+        """
+        if self._action_pending:
+            raise UpkieRuntimeError(
+                "Observation from the previous action was not read, "
+                "call `get_observation` before submitting a new action"
+            )
+        if instrumented:  # perf_counter_ns clocks ~1 us on the raspi
+            self._timestamps[0] = perf_counter_ns()
+        self._wait_for_spine()
+        if instrumented:
+            self._timestamps[1] = perf_counter_ns()
+        if self.observation_view is not None:
+            self._write_flat_action(action)
+        elif self._delta_actions and action is not None:
+            self._write_dict(self._get_delta_action(action))
+        else:
+            self._write_dict(action)
+        self._write_request(Request.kAction)
+        if instrumented:
+            self._timestamps[2] = perf_counter_ns()
+        self._action_pending = True
+
     def _read_request(self) -> int:
         """!
         Read current request from shared memory.
@@ -116,18 +582,86 @@ class SpineInterface:
         \return Observation dictionary.
         """
         assert self._read_request() == Request.kNone
-        self._mmap.seek(0)
-        self._mmap.read(4)  # skip request field
-        size = int.from_bytes(self._mmap.read(4), byteorder=sys.byteorder)
-        data = self._mmap.read(size)
-        self._unpacker.feed(data)
-        unpacked = 0
-        last_dict = {}
-        for observation in self._unpacker:
-            last_dict = observation
-            unpacked += 1
-        assert unpacked == 1
-        return last_dict
+        size = int.from_bytes(self._buffer[4:8], byteorder=sys.byteorder)
+        # Unpack directly from a view of the shared memory: unlike
+        # `mmap.read`, slicing a memoryview does not copy the data.
+        return msgpack.unpackb(self._buffer[8 : 8 + size], raw=False)
+
+    def _send_config(self, config: dict) -> dict:
+        r"""!
+        Send a start request to the spine.
+
+        \param config Configuration dictionary.
+        \return Observation dictionary.
+        """
+        self._wait_for_spine()
+        self._write_dict(config)
+        self._write_request(Request.kStart)
+        self._wait_for_spine()
+        return self._read_dict()
+
+    def _read_observation_batch(self) -> List[dict]:
+        r"""!
+        Read a batch of observations from shared memory.
+
+        \return Observation dictionaries.
+        """
+        assert self._read_request() == Request.kNone
+        buffer = self._buffer
+        nb_observations = int.from_bytes(buffer[8:12], byteorder=sys.byteorder)
+        observations = []
+        offset = 12
+        for _ in range(nb_observations):
+            size = int.from_bytes(
+                buffer[offset : offset + 4], byteorder=sys.byteorder
+            )
+            offset += 4
+            observations.append(
+                msgpack.unpackb(buffer[offset : offset + size], raw=False)
+            )
+            offset += size
+        return observations
+
+    def _set_schema(self, schema: dict) -> None:
+        r"""!
+        Map structured arrays to the flat layouts published by the spine.
+
+        \param schema Schema dictionary from the spine.
+        """
+        observation_dtype = flat_layout_dtype(schema["observation"])
+        action_dtype = flat_layout_dtype(schema["action"])
+        self.observation_view = np.ndarray(
+            (), dtype=observation_dtype, buffer=self._buffer, offset=8
+        )
+        self.action_view = np.ndarray(
+            (),
+            dtype=action_dtype,
+            buffer=self._buffer,
+            offset=8 + schema["action_offset"],
+        )
+        self._action_fields = [
+            (name, tuple(name.split("."))) for name in action_dtype.names
+        ]
+        self._action_offset = schema["action_offset"]
+
+    def _write_flat_action(self, action: Optional[dict]) -> None:
+        r"""!
+        Write action dictionary to the flat action layout.
+
+        \param action Action dictionary, or `None` to leave the flat action
+            as is.
+        """
+        if action is None:
+            return
+        action_view = self.action_view
+        for name, keys in self._action_fields:
+            value = action
+            for key in keys:
+                if not isinstance(value, dict) or key not in value:
+                    break
+                value = value[key]
+            else:  # all keys were found
+                action_view[name] = value
 
     def _wait_for_spine(self, timeout_ns: int = 100000000) -> None:
         r"""!
@@ -139,6 +673,8 @@ class SpineInterface:
         \raise SpineError If the request read from spine has an error flag.
         """
         stop = perf_counter_ns() + timeout_ns
+        if self._futex is not None:
+            self._sleep_until_spine(stop, timeout_ns)
         while self._read_request() not in self._stop_waiting:  # sets are fast
             # Fun fact: `not in set` is 3-4x faster than `!=` on the raspi
             # perf_counter_ns clocks ~1 us on the raspi
@@ -151,6 +687,27 @@ class SpineInterface:
             self._write_request(Request.kNone)
             raise SpineError("Invalid request, is the spine started?")
 
+    def _sleep_until_spine(self, stop: int, timeout_ns: int) -> None:
+        r"""!
+        Sleep on the request futex until the spine is available.
+
+        \param stop Time in nanoseconds after which we stop waiting.
+        \param timeout_ns Timeout duration, only used in error messages.
+
+        Sleeps are capped to one millisecond so that we keep on polling at
+        this lower rate if the spine does not wake up waiters.
+        """
+        request = self._read_request()
+        while request not in self._stop_waiting:
+            remaining_ns = stop - perf_counter_ns()
+            if remaining_ns <= 0:
+                raise TimeoutError(
+                    "Spine did not process request within "
+                    f"{timeout_ns / 1e6:.1f} ms, is it stopped?"
+                )
+            self._futex.wait(request, min(remaining_ns, 1_000_000))
+            request = self._read_request()
+
     def _write_request(self, request: int) -> None:
         """!
         Set request in shared memory.
@@ -158,6 +715,37 @@ class SpineInterface:
         self._mmap.seek(0)
         self._mmap.write(request.to_bytes(4, byteorder=sys.byteorder))
 
+    def _write_action_batch(self, actions: Sequence[dict]) -> None:
+        r"""!
+        Write a batch of actions to shared memory.
+
+        \param actions Action dictionaries.
+
+        The batch consists of the number of actions, followed by the size and
+        serialized dictionary of each action.
+
+        \throw UpkieRuntimeError If the batch does not fit in shared memory.
+            In schema mode, it should also not overlap with flat actions.
+        """
+        assert self._read_request() == Request.kNone
+        chunks = [self._packer.pack(action) for action in actions]
+        size = 4 + sum(4 + len(chunk) for chunk in chunks)
+        capacity = len(self._buffer) - 8  # request and size fields
+        if self._action_offset is not None:
+            capacity = self._action_offset
+        if size > capacity:
+            raise UpkieRuntimeError(
+                f"Batch of {len(actions)} actions takes {size} bytes while "
+                f"the spine interface only has {capacity} bytes for it"
+            )
+        self._mmap.seek(0)
+        self._mmap.read(4)  # skip request field
+        self._mmap.write(size.to_bytes(4, byteorder=sys.byteorder))
+        self._mmap.write(len(chunks).to_bytes(4, byteorder=sys.byteorder))
+        for chunk in chunks:
+            self._mmap.write(len(chunk).to_bytes(4, byteorder=sys.byteorder))
+            self._mmap.write(chunk)
+
     def _write_dict(self, dictionary: dict) -> None:
         r"""!
         Set the shared memory to a given dictionary.
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test futex helper."""
+
+import mmap
+import threading
+import time
+import unittest
+
+from upkie.spine.futex import SYS_FUTEX, Futex
+
+
+@unittest.skipIf(SYS_FUTEX is None, "futexes are not available")
+class TestFutex(unittest.TestCase):
+    def setUp(self):
+        self.buffer = mmap.mmap(-1, 64)
+        self.futex = Futex(self.buffer)
+
+    def tearDown(self):
+        self.futex.close()
+        self.buffer.close()
+
+    def test_wait_different_value(self):
+        start = time.perf_counter()
+        self.futex.wait(expected=42, timeout_ns=1_000_000_000)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_wait_times_out(self):
+        start = time.perf_counter()
+        self.futex.wait(expected=0, timeout_ns=10_000_000)
+        self.assertGreater(time.perf_counter() - start, 0.005)
+
+    def test_wake(self):
+        def wake_later():
+            time.sleep(0.01)
+            self.buffer[0] = 1
+            self.futex.wake()
+
+        thread = threading.Thread(target=wake_later)
+        start = time.perf_counter()
+        thread.start()
+        self.futex.wait(expected=0, timeout_ns=2_000_000_000)
+        thread.join()
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(self.buffer[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test latency recorder."""
+
+import unittest
+
+from upkie.exceptions import UpkieRuntimeError
+from upkie.spine import LatencyRecorder
+
+
+class TestLatencyRecorder(unittest.TestCase):
+    def setUp(self):
+        self.recorder = LatencyRecorder(capacity=4)
+
+    def test_empty(self):
+        self.assertEqual(len(self.recorder), 0)
+        with self.assertRaises(UpkieRuntimeError):
+            self.recorder.summary()
+
+    def test_record(self):
+        self.recorder.record([0, 1000, 3000, 6000, 10000])
+        summary = self.recorder.summary()
+        self.assertAlmostEqual(summary["wait"]["p50"], 1.0)
+        self.assertAlmostEqual(summary["write"]["max"], 2.0)
+        self.assertAlmostEqual(summary["spine"]["p99"], 3.0)
+        self.assertAlmostEqual(summary["read"]["p50"], 4.0)
+        self.assertAlmostEqual(summary["total"]["max"], 10.0)
+
+    def test_ring_buffer(self):
+        for step in range(10):
+            self.recorder.record([0, step, step, step, step])
+        self.assertEqual(len(self.recorder), 4)
+        self.assertEqual(self.recorder.count, 10)
+        self.assertAlmostEqual(self.recorder.summary()["wait"]["max"], 9e-3)
+        self.assertAlmostEqual(self.recorder.summary()["wait"]["p50"], 7.5e-3)
+
+    def test_histogram(self):
+        for step in range(4):
+            self.recorder.record([0, 1000 * step, 0, 0, 0])
+        counts, edges = self.recorder.histogram("wait", bins=2)
+        self.assertEqual(counts.sum(), 4)
+        self.assertAlmostEqual(edges[-1], 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
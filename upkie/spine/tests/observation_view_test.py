@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Tests for ObservationView."""
+
+import unittest
+
+import numpy as np
+
+from upkie.spine import ObservationView
+from upkie.spine.spine_interface import flat_layout_dtype
+
+
+class TestObservationView(unittest.TestCase):
+    def setUp(self):
+        dtype = flat_layout_dtype(
+            {
+                "base_orientation.pitch": {"offset": 0, "size": 1},
+                "base_orientation.angular_velocity": {"offset": 1, "size": 3},
+                "number": {"offset": 4, "size": 1},
+            }
+        )
+        self.buffer = np.arange(5, dtype=float)
+        self.array = np.ndarray((), dtype=dtype, buffer=self.buffer)
+        self.view = ObservationView(self.array)
+
+    def test_keys(self):
+        self.assertEqual(set(self.view), {"base_orientation", "number"})
+        self.assertEqual(len(self.view["base_orientation"]), 2)
+        self.assertIn("pitch", self.view["base_orientation"])
+
+    def test_values(self):
+        self.assertIsInstance(self.view["number"], float)
+        self.assertAlmostEqual(self.view["number"], 4.0)
+        base_orientation = self.view["base_orientation"]
+        self.assertAlmostEqual(base_orientation["pitch"], 0.0)
+        self.assertTrue(
+            np.allclose(base_orientation["angular_velocity"], [1.0, 2.0, 3.0])
+        )
+
+    def test_values_follow_shared_memory(self):
+        angular_velocity = self.view["base_orientation"]["angular_velocity"]
+        self.buffer[:] = -1.0
+        self.assertAlmostEqual(self.view["base_orientation"]["pitch"], -1.0)
+        self.assertAlmostEqual(angular_velocity[2], -1.0)
+
+    def test_to_dict(self):
+        observation = self.view.to_dict()
+        self.buffer[:] = -1.0
+        self.assertAlmostEqual(observation["number"], 4.0)
+        self.assertAlmostEqual(
+            observation["base_orientation"]["angular_velocity"][0], 1.0
+        )
+
+    def test_missing_key(self):
+        with self.assertRaises(KeyError):
+            self.view["foo"]
+
+
+if __name__ == "__main__":
+    unittest.main()
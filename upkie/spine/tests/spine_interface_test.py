@@ -8,13 +8,23 @@
 Test the spine interface.
 """
 
+import asyncio
 import sys
 import unittest
 from multiprocessing.shared_memory import SharedMemory
 
 import msgpack
+import numpy as np
 
-from upkie.spine import Request, SpineInterface, serialize
+from upkie.exceptions import SpineError, UpkieRuntimeError
+from upkie.spine import (
+    AsyncSpineInterface,
+    LatencyRecorder,
+    Request,
+    SpineInterface,
+    serialize,
+)
+from upkie.spine.futex import SYS_FUTEX
 
 wait_pre_monkeypatch = SpineInterface._wait_for_spine
 
@@ -39,8 +49,12 @@ class TestSpineInterface(unittest.TestCase):
         self._packer = msgpack.Packer(default=serialize, use_bin_type=True)
         self._shared_memory = shared_memory
         self._unpacker = msgpack.Unpacker(raw=False)
+        self.config_id = None
         self.last_action = {}
+        self.last_actions = []
         self.last_config = {}
+        self.last_timeout_ns = None
+        self.max_batch_reply = 1000
         self.shm_name = shm_name
         self.next_observation = {
             "servo": {
@@ -48,20 +62,44 @@ class TestSpineInterface(unittest.TestCase):
                 "bar": {"position": 1.0},
             }
         }
+        self.flat_observation = None
 
-        def wait_monkeypatch(spine):
+        def wait_monkeypatch(spine, timeout_ns=100000000):
             """
             Monkey patch to the interface's `_wait_for_spine` function so that
             TestSpineInterface carries out the tasks expected by the spine.
 
             Args:
                 spine: The spine interface waiting for a free request slot.
+                timeout_ns: Timeout duration, recorded for tests.
             """
+            self.last_timeout_ns = timeout_ns
             if self.__read_request() == Request.kAction:
+                if self.flat_observation is not None:
+                    self.__write_flat_observation(self.flat_observation)
+                    return
                 self.last_action = self.__read_dict()
                 self.__write_observation(self.next_observation)
             elif self.__read_request() == Request.kStart:
                 self.last_config = self.__read_dict()
+                spine_config = self.last_config.get("spine", {})
+                if "config_id" in spine_config:
+                    base_config_id = spine_config.get("base_config_id")
+                    if base_config_id in (None, self.config_id):
+                        self.config_id = spine_config["config_id"]
+                    self.__write_observation(
+                        {**self.next_observation, "config_id": self.config_id}
+                    )
+                elif spine_config.get("schema", False):
+                    self.__write_observation(self.next_observation)
+            elif self.__read_request() == Request.kActions:
+                self.last_actions = self.__read_action_batch()
+                self.__write_observation_batch(
+                    [self.next_observation]
+                    * min(len(self.last_actions), self.max_batch_reply)
+                )
+            elif self.__read_request() == Request.kStop:
+                self.__write_request(Request.kNone)
             self.assertEqual(self.__read_request(), Request.kNone)
 
         self.assertTrue(hasattr(SpineInterface, "_wait_for_spine"))
@@ -102,6 +140,49 @@ class TestSpineInterface(unittest.TestCase):
         self._mmap.write(data)
         self.__write_request(Request.kNone)
 
+    def __read_action_batch(self) -> list:
+        """
+        Read a batch of actions from shared memory.
+
+        Returns:
+            List of action dictionaries.
+        """
+        self._mmap.seek(8)
+        nb_actions = int.from_bytes(self._mmap.read(4), sys.byteorder)
+        actions = []
+        for _ in range(nb_actions):
+            size = int.from_bytes(self._mmap.read(4), sys.byteorder)
+            actions.append(msgpack.unpackb(self._mmap.read(size)))
+        return actions
+
+    def __write_observation_batch(self, observations: list) -> None:
+        """
+        Write a batch of observations to shared memory.
+
+        Args:
+            observations: Observations to write to shared memory.
+        """
+        data = len(observations).to_bytes(4, sys.byteorder)
+        for observation in observations:
+            packed = self._packer.pack(observation)
+            data += len(packed).to_bytes(4, sys.byteorder) + packed
+        self._mmap.seek(4)
+        self._mmap.write(len(data).to_bytes(4, byteorder=sys.byteorder))
+        self._mmap.write(data)
+        self.__write_request(Request.kNone)
+
+    def __write_flat_observation(self, values: np.ndarray) -> None:
+        """
+        Write flat observation to shared memory.
+
+        Args:
+            values: Observation values, as an array of doubles.
+        """
+        data = values.astype("<f8").tobytes()
+        self._mmap.seek(8)
+        self._mmap.write(data)
+        self.__write_request(Request.kNone)
+
     def __read_dict(self) -> dict:
         """
         Read dictionary from the memory shared with the spine interface.
@@ -135,6 +216,124 @@ class TestSpineInterface(unittest.TestCase):
         self.assertEqual(self.__read_request(), Request.kNone)
         self.assertEqual(self.last_config, config)
 
+    def test_set_actions(self):
+        """
+        Send a batch of actions and get one observation per action.
+        """
+        actions = [
+            {"servo": {"foo": {"position": float(k)}}} for k in range(3)
+        ]
+        observations = self.spine.set_actions(actions)
+        self.assertEqual(self.last_actions, actions)
+        self.assertEqual(len(observations), 3)
+        self.assertEqual(observations[2], self.next_observation)
+        self.assertEqual(self.last_timeout_ns, 300000000)
+        self.assertEqual(self.spine.set_actions([]), [])
+
+    def test_set_actions_too_large(self):
+        """
+        Batches that don't fit in shared memory are rejected before sending.
+        """
+        actions = [{"servo": {"foo": {"position": 1.0}}}] * 100
+        with self.assertRaises(UpkieRuntimeError):
+            self.spine.set_actions(actions)
+        self.assertEqual(self.__read_request(), Request.kNone)
+
+    def test_set_actions_reply_failed(self):
+        """
+        Spine replies without observations when they don't fit.
+        """
+        self.max_batch_reply = 0
+        actions = [{"servo": {"foo": {"position": 1.0}}}] * 3
+        with self.assertRaises(SpineError):
+            self.spine.set_actions(actions)
+
+    def test_latency(self):
+        """
+        Round-trip phases are recorded when instrumentation is enabled.
+        """
+        self.spine.latency = LatencyRecorder(capacity=8)
+        for _ in range(3):
+            self.spine.set_action({"servo": {"foo": {"position": 1.0}}})
+        self.assertEqual(len(self.spine.latency), 3)
+        summary = self.spine.latency.summary()
+        self.assertGreater(summary["write"]["max"], 0.0)
+        self.assertGreaterEqual(
+            summary["total"]["max"], summary["read"]["max"]
+        )
+        self.spine.set_action_async({"servo": {"foo": {"position": 1.0}}})
+        self.spine.get_observation()
+        self.assertEqual(len(self.spine.latency), 3)  # split: not recorded
+
+    def test_delta_config(self):
+        """
+        Only changed configuration values are sent in delta-config mode.
+        """
+        self.spine._delta_config = True
+        config = {"bullet": {"gui": False, "reset": {"position": 0.0}}}
+        observation = self.spine.start(config)
+        self.assertNotIn("config_id", observation)
+        self.assertEqual(self.last_config["bullet"]["gui"], False)
+        first_config_id = self.config_id
+
+        config["bullet"]["reset"]["position"] = 1.0
+        self.spine.start(config)
+        self.assertEqual(
+            self.last_config["bullet"], {"reset": {"position": 1.0}}
+        )
+        spine_config = self.last_config["spine"]
+        self.assertEqual(spine_config["base_config_id"], first_config_id)
+        self.assertEqual(spine_config["config_id"], self.config_id)
+
+        self.config_id = "other"  # spine lost track of our configuration
+        config["bullet"]["reset"]["position"] = 2.0
+        self.spine.start(config)
+        self.assertNotIn("base_config_id", self.last_config["spine"])
+        self.assertEqual(self.last_config["bullet"]["gui"], False)
+        self.assertEqual(
+            self.last_config["spine"]["config_id"], self.config_id
+        )
+
+    def test_delta_config_removed_keys(self):
+        """
+        Keys removed from the configuration are sent in delta-config mode.
+        """
+        self.spine._delta_config = True
+        config = {"bullet": {"gui": False, "restore": "initial"}, "foo": 1}
+        self.spine.start(config)
+        del config["bullet"]["restore"]
+        del config["foo"]
+        self.spine.start(config)
+        self.assertNotIn("bullet", self.last_config)
+        self.assertEqual(
+            self.last_config["spine"]["removed_keys"],
+            {"bullet": {"restore": True}, "foo": True},
+        )
+        self.spine.start(config)
+        self.assertNotIn("removed_keys", self.last_config["spine"])
+        config["bullet"]["restore"] = "initial"
+        self.spine.start(config)
+        self.assertEqual(self.last_config["bullet"], {"restore": "initial"})
+
+    def test_delta_config_type_change(self):
+        """
+        The full configuration is sent when a value changes type.
+        """
+        spine = SpineInterface(
+            shm_name=self.shm_name, perf_checks=False, delta_config=True
+        )
+        config = {"bullet": {"gui": False}, "foo": 1}
+        spine.start(config)
+        config["foo"] = 1.5
+        spine.start(config)
+        self.assertNotIn("base_config_id", self.last_config["spine"])
+        self.assertEqual(self.last_config["bullet"]["gui"], False)
+        self.assertEqual(self.last_config["foo"], 1.5)
+        config["foo"] = 2.5
+        spine.start(config)
+        self.assertIn("base_config_id", self.last_config["spine"])
+        self.assertNotIn("bullet", self.last_config)
+
     def test_set_action(self):
         """
         Step sends an action we deserialize successfully, and returns a new
@@ -148,6 +347,156 @@ class TestSpineInterface(unittest.TestCase):
         self.assertEqual(self.last_action, action)
         self.assertEqual(observation, self.next_observation)
 
+    def test_set_action_async(self):
+        """
+        Submit an action, then collect the resulting observation.
+        """
+        action = {"servo": {"foo": {"position": 3.0}}}
+        self.spine.set_action_async(action)
+        self.assertEqual(self.__read_request(), Request.kAction)
+        with self.assertRaises(UpkieRuntimeError):
+            self.spine.set_action_async(action)
+        observation = self.spine.get_observation()
+        self.assertEqual(self.last_action, action)
+        self.assertEqual(observation, self.next_observation)
+        with self.assertRaises(UpkieRuntimeError):
+            self.spine.get_observation()
+
+    def test_async_set_action(self):
+        """
+        Await an observation from the asynchronous interface.
+        """
+        spine = AsyncSpineInterface(self.spine)
+        action = {"servo": {"foo": {"position": 2.0}}}
+        observation = asyncio.run(spine.set_action(action))
+        spine.close()
+        self.assertEqual(self.last_action, action)
+        self.assertEqual(observation, self.next_observation)
+
+    def test_async_enables_blocking_wait(self):
+        """
+        The asynchronous interface sleeps on a futex while waiting.
+        """
+        self.assertIsNone(self.spine._futex)
+        spine = AsyncSpineInterface(self.spine)
+        spine.close()
+        if SYS_FUTEX is not None:
+            self.assertIsNotNone(self.spine._futex)
+
+    def test_delta_actions(self):
+        """
+        Only changed action values are sent in delta mode.
+        """
+        spine = SpineInterface(
+            shm_name=self.shm_name,
+            perf_checks=False,
+            delta_actions=True,
+            full_action_period=3,
+        )
+        action = {
+            "servo": {
+                "foo": {"position": 1.0, "velocity": np.zeros(2)},
+                "bar": {"position": 2.0, "velocity": np.zeros(2)},
+            }
+        }
+        spine.set_action(action)
+        self.assertEqual(self.last_action["servo"]["bar"]["position"], 2.0)
+        action["servo"]["foo"]["position"] = 3.0
+        spine.set_action(action)
+        self.assertEqual(
+            self.last_action, {"servo": {"foo": {"position": 3.0}}}
+        )
+        action["servo"]["bar"]["velocity"] = np.ones(2)
+        spine.set_action(action)
+        self.assertEqual(list(self.last_action["servo"]), ["bar"])
+        self.assertEqual(list(self.last_action["servo"]["bar"]), ["velocity"])
+        spine.set_action(action)  # full refresh
+        self.assertEqual(self.last_action["servo"]["foo"]["position"], 3.0)
+        spine.set_action(action)
+        self.assertEqual(self.last_action, {})
+
+    def test_delta_actions_nan(self):
+        """
+        NaN action values are not resent in delta mode.
+        """
+        spine = SpineInterface(
+            shm_name=self.shm_name, perf_checks=False, delta_actions=True
+        )
+        action = {
+            "servo": {
+                "foo": {"position": np.nan, "velocity": np.full(2, np.nan)},
+            }
+        }
+        spine.set_action(action)
+        self.assertEqual(
+            list(self.last_action["servo"]["foo"]), ["position", "velocity"]
+        )
+        spine.set_action(action)
+        self.assertEqual(self.last_action, {})
+
+    def test_observation_size_changes(self):
+        """
+        Observations are read up to their size, even when the previous
+        observation in shared memory was larger.
+        """
+        self.next_observation["servo"]["baz"] = {"position": 2.0}
+        self.spine.set_action({})
+        del self.next_observation["servo"]["baz"]
+        observation = self.spine.set_action({})
+        self.assertEqual(observation, self.next_observation)
+
+    def test_schema_unsupported(self):
+        """
+        Starting in schema mode fails clearly against a spine that does not
+        reply with flat layouts.
+        """
+        spine = SpineInterface(
+            shm_name=self.shm_name, perf_checks=False, schema=True
+        )
+        with self.assertRaises(SpineError):
+            spine.start({})
+
+    def test_schema(self):
+        """
+        In schema mode, the interface exchanges flat arrays following the
+        layouts published by the spine at startup.
+        """
+        spine = SpineInterface(
+            shm_name=self.shm_name, perf_checks=False, schema=True
+        )
+        self.next_observation["schema"] = {
+            "action_offset": 256,
+            "action": {
+                "servo.foo.position": {"offset": 0, "size": 1},
+                "servo.foo.velocity": {"offset": 1, "size": 1},
+            },
+            "observation": {
+                "imu.angular_velocity": {"offset": 1, "size": 3},
+                "servo.foo.position": {"offset": 0, "size": 1},
+            },
+        }
+        observation = spine.start({"foo": "bar"})
+        self.assertTrue(self.last_config["spine"]["schema"])
+        self.assertNotIn("schema", observation)
+
+        self.flat_observation = np.array([1.0, 2.0, 3.0, 4.0])
+        action = {"servo": {"foo": {"position": 0.5}}, "log": {"x": 1}}
+        observation = spine.set_action(action)
+        self.assertAlmostEqual(observation["servo.foo.position"], 1.0)
+        self.assertTrue(
+            np.allclose(observation["imu.angular_velocity"], [2.0, 3.0, 4.0])
+        )
+        self._mmap.seek(8 + 256)
+        flat_action = np.frombuffer(self._mmap.read(16), dtype="<f8")
+        self.assertAlmostEqual(flat_action[0], 0.5)
+
+        spine.action_view["servo.foo.velocity"] = 7.0
+        spine.set_action(None)
+        self._mmap.seek(8 + 256)
+        flat_action = np.frombuffer(self._mmap.read(16), dtype="<f8")
+        self.assertAlmostEqual(flat_action[0], 0.5)
+        self.assertAlmostEqual(flat_action[1], 7.0)
+
     def test_wait_times_out(self):
         """
         Disable monkeypatch to check that waiting for the spine (when there is
@@ -162,6 +511,19 @@ class TestSpineInterface(unittest.TestCase):
         with self.assertRaises(TimeoutError):
             spine.stop()
 
+    def test_blocking_wait_times_out(self):
+        """
+        Same as above, with the interface sleeping on the request futex.
+        """
+        SpineInterface._wait_for_spine = wait_pre_monkeypatch
+        spine = SpineInterface(
+            shm_name=self.shm_name, perf_checks=False, blocking_wait=True
+        )
+        with self.assertRaises(TimeoutError):
+            spine.start({"config": "empty"})
+        with self.assertRaises(TimeoutError):
+            spine.stop()
+
 
 if __name__ == "__main__":
     unittest.main()
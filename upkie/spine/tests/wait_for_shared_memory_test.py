@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Test waiting for the spine shared memory."""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+
+from upkie.exceptions import SpineError
+from upkie.spine.inotify import Inotify
+from upkie.spine.request import Request
+from upkie.spine.wait_for_shared_memory import wait_for_shared_memory
+
+
+class TestWaitForSharedMemory(unittest.TestCase):
+    def setUp(self):
+        self.shm_name = f"upkie_test_{os.getpid()}"
+        self.shared_memory = None
+
+    def tearDown(self):
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+
+    def create_later(self, delay: float):
+        def create():
+            time.sleep(delay)
+            self.shared_memory = SharedMemory(
+                self.shm_name, create=True, size=64
+            )
+
+        thread = threading.Thread(target=create)
+        thread.start()
+        return thread
+
+    def test_no_spine(self):
+        with self.assertRaises(SpineError):
+            wait_for_shared_memory(self.shm_name, retries=1)
+
+    def test_spine_already_running(self):
+        self.shared_memory = SharedMemory(self.shm_name, create=True, size=64)
+        shared_memory = wait_for_shared_memory(self.shm_name, retries=1)
+        self.assertEqual(shared_memory.size, 64)
+        shared_memory.close()
+
+    def test_spine_starts_later(self):
+        thread = self.create_later(0.05)
+        start = time.monotonic()
+        shared_memory = wait_for_shared_memory(f"/{self.shm_name}", retries=3)
+        self.assertLess(time.monotonic() - start, 0.5)
+        shared_memory.close()
+        thread.join()
+
+    @unittest.skipIf(not os.path.isdir("/dev/shm"), "requires /dev/shm")
+    def test_wait_until_spine_is_ready(self):
+        ready = threading.Event()
+
+        def start_spine():
+            time.sleep(0.01)
+            # Same steps as the spine's agent interface
+            fd = os.open(
+                f"/dev/shm/{self.shm_name}",
+                os.O_RDWR | os.O_CREAT | os.O_EXCL,
+            )
+            initializing = int(Request.kInitializing)
+            os.pwrite(fd, initializing.to_bytes(4, sys.byteorder), 0)
+            os.ftruncate(fd, 64)
+            os.close(fd)
+            shared_memory = SharedMemory(self.shm_name, create=False)
+            self.shared_memory = shared_memory
+            time.sleep(0.05)
+            ready.set()
+            shared_memory.buf[0:4] = bytes(4)  # Request.kNone
+
+        thread = threading.Thread(target=start_spine)
+        thread.start()
+        shared_memory = wait_for_shared_memory(self.shm_name, retries=3)
+        self.assertTrue(ready.is_set())
+        shared_memory.close()
+        thread.join()
+
+
+@unittest.skipIf(not sys.platform.startswith("linux"), "requires inotify")
+class TestInotify(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.watch = Inotify(self.directory.name)
+
+    def tearDown(self):
+        self.watch.close()
+        self.directory.cleanup()
+
+    def test_wait_times_out(self):
+        self.assertFalse(self.watch.wait(0.01))
+
+    def test_new_file(self):
+        def touch_later():
+            time.sleep(0.01)
+            open(os.path.join(self.directory.name, "spine"), "w").close()
+
+        thread = threading.Thread(target=touch_later)
+        thread.start()
+        self.assertTrue(self.watch.wait(1.0))
+        thread.join()
+        self.assertFalse(self.watch.wait(0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
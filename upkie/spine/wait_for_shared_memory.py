@@ -6,11 +6,58 @@
 # Copyright 2024 Inria
 
 import logging
+import sys
 import time
 from multiprocessing import resource_tracker
 from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
 
-from ..exceptions import SpineError
+from ..exceptions import SpineError, UpkieRuntimeError
+from .inotify import Inotify
+from .request import Request
+
+## \var SHM_DIRECTORY
+## Directory where POSIX shared-memory objects appear on Linux.
+SHM_DIRECTORY: str = "/dev/shm"
+
+
+def _try_open(shm_name: str) -> Optional[SharedMemory]:
+    r"""!
+    Try to open a shared-memory object.
+
+    \param shm_name Name of the shared memory object, without leading slash.
+    \return Shared memory if it exists and has been sized by the spine,
+        `None` otherwise.
+    """
+    try:
+        shared_memory = SharedMemory(shm_name, size=0, create=False)
+    except FileNotFoundError:
+        return None
+    except ValueError:  # the spine did not truncate it to its size yet
+        return None
+    if shared_memory.size <= 4:  # only the initializing flag is written
+        shared_memory.close()
+        return None
+    # Why we unregister: https://github.com/upkie/upkie/issues/376
+    # Upstream issue: https://github.com/python/cpython/issues/82300
+    resource_tracker.unregister(shared_memory._name, "shared_memory")
+    return shared_memory
+
+
+def _watch_shm_directory() -> Optional[Inotify]:
+    r"""!
+    Watch the shared-memory directory for new objects, if possible.
+
+    \return Inotify watch, or `None` if inotify is not available.
+    """
+    try:
+        return Inotify(SHM_DIRECTORY)
+    except (OSError, UpkieRuntimeError):
+        return None
+
+
+def _read_request(shared_memory: SharedMemory) -> int:
+    return int.from_bytes(shared_memory.buf[0:4], byteorder=sys.byteorder)
 
 
 def wait_for_shared_memory(
@@ -21,29 +68,60 @@ def wait_for_shared_memory(
     Connect to the spine shared memory.
 
     \param shm_name Name of the shared memory object.
-    \param retries Number of times to try opening the shared-memory file.
+    \param retries Time budget of this function, counted in seconds plus
+        one: it gives up after `retries - 1` seconds, and only tries once when
+        `retries` is one or less.
     \throw SpineError If the spine did not respond after the prescribed number
         of trials.
+
+    On Linux, this function watches the shared-memory directory with inotify
+    and returns as soon as the spine creates its shared memory. It otherwise
+    polls with an exponential backoff capped to 100 ms. In both cases, when
+    the spine was not running yet, it then waits (within the same time budget)
+    for the spine to replace its initializing flag by no request, which it
+    does once it is ready to process requests.
     """
     # Remove leading slash if present, as SharedMemory will prepend it
     # See https://github.com/upkie/upkie/issues/375
     shm_name = shm_name.lstrip("/")
+    deadline = time.monotonic() + max(retries - 1, 0)
+
+    shared_memory = _try_open(shm_name)
+    spine_was_running = shared_memory is not None
+    watch = None if spine_was_running else _watch_shm_directory()
+    backoff = 1e-3
+    if shared_memory is None and retries > 1:
+        logging.info(f"Waiting for spine /{shm_name} to start...")
+    while shared_memory is None:
+        # Try again after setting the watch, in case we missed its creation,
+        # and periodically, as the spine sizes its shared memory after
+        # creating it
+        shared_memory = _try_open(shm_name)
+        remaining = deadline - time.monotonic()
+        if shared_memory is not None or remaining <= 0.0:
+            break
+        if watch is not None:
+            watch.wait(min(remaining, backoff))
+        else:
+            time.sleep(min(remaining, backoff))
+        backoff = min(2.0 * backoff, 0.1)
+    if watch is not None:
+        watch.close()
+    if shared_memory is None:
+        raise SpineError(
+            f"spine /{shm_name} did not respond after {retries} attempts"
+        )
+
+    if spine_was_running:
+        return shared_memory
 
-    for trial in range(retries):
-        if trial > 0:
-            logging.info(
-                f"Waiting for spine /{shm_name} to start "
-                f"(trial {trial} / {retries})..."
-            )
-            time.sleep(1.0)
-        try:
-            shared_memory = SharedMemory(shm_name, size=0, create=False)
-            # Why we unregister: https://github.com/upkie/upkie/issues/376
-            # Upstream issue: https://github.com/python/cpython/issues/82300
-            resource_tracker.unregister(shared_memory._name, "shared_memory")
-            return shared_memory
-        except FileNotFoundError:
-            pass
-    raise SpineError(
-        f"spine /{shm_name} did not respond after {retries} attempts"
-    )
+    # The spine just started: wait for it to be ready
+    backoff = 1e-3
+    while _read_request(shared_memory) != Request.kNone:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0.0:
+            logging.warning(f"spine /{shm_name} is not ready yet")
+            break
+        time.sleep(min(remaining, backoff))
+        backoff = min(2.0 * backoff, 0.1)
+    return shared_memory
@@ -8,7 +8,11 @@ r"""!
 Clamping functions.
 """
 
-from typing import Optional
+import math
+import time
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
 
 from .spdlog import logging
 
@@ -57,3 +61,131 @@ def clamp_and_warn(value: float, lower: float, upper: float, label: str):
         logging.warning(f"{label}={value} clamped to {upper=}")
         return upper
     return value
+
+
+class ArrayClamp:
+    r"""!
+    Clamp arrays between precomputed bounds, counting saturations.
+
+    Rather than warning every time a value is clamped, which can stall a
+    control loop where a policy saturates at every step, this clamp counts
+    saturations per label and logs a summary of them at most once per log
+    period. The first saturation is logged right away.
+    """
+
+    ## \var counts
+    ## Number of times each value was clamped since the last reset.
+    counts: np.ndarray
+
+    ## \var labels
+    ## Labels describing each value.
+    labels: np.ndarray
+
+    ## \var log_period
+    ## Minimum duration between two saturation summaries, in seconds, or
+    ## None to disable logging.
+    log_period: Optional[float]
+
+    ## \var lower
+    ## Lower bounds.
+    lower: np.ndarray
+
+    ## \var upper
+    ## Upper bounds.
+    upper: np.ndarray
+
+    def __init__(
+        self,
+        lower: Union[np.ndarray, float],
+        upper: Union[np.ndarray, float],
+        labels: Union[Sequence[str], str],
+        log_period: Optional[float] = 1.0,
+    ):
+        r"""!
+        Precompute bounds.
+
+        \param lower Lower bounds.
+        \param upper Upper bounds, with the same shape as lower bounds.
+        \param labels Labels describing each value, either a single label or
+            an array of labels with the same shape as bounds. Saturations of
+            values sharing the same label are counted together.
+        \param log_period Minimum duration between two saturation summaries,
+            in seconds. Set to None to disable logging.
+        """
+        lower = np.array(lower, dtype=float)
+        upper = np.array(upper, dtype=float)
+        if lower.shape != upper.shape:
+            raise ValueError(
+                f"lower bounds of shape {lower.shape} and upper bounds "
+                f"of shape {upper.shape} don't match"
+            )
+        self.__last_log_time = -math.inf
+        self.__logged_counts = np.zeros(lower.shape, dtype=int)
+        self.counts = np.zeros(lower.shape, dtype=int)
+        self.labels = np.broadcast_to(
+            np.array(labels, dtype=object), lower.shape
+        )
+        self.log_period = log_period
+        self.lower = lower
+        self.upper = upper
+
+    def __call__(
+        self,
+        value: Union[np.ndarray, float],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        r"""!
+        Clamp an array between the lower and upper bounds.
+
+        \param value Array to clamp, with the same shape as bounds.
+        \param out Optional output array, which can be `value` itself to
+            clamp it in place.
+        \return Clamped array.
+        """
+        saturated = (value < self.lower) | (value > self.upper)
+        if saturated.any():
+            self.counts += saturated
+            self.__log_summary()
+        return np.clip(value, self.lower, self.upper, out=out)
+
+    def reset(self) -> None:
+        """!
+        Reset saturation counts.
+        """
+        self.__logged_counts[...] = 0
+        self.counts[...] = 0
+
+    def saturations(self) -> Dict[str, int]:
+        r"""!
+        Get saturation counts per label.
+
+        \return Dictionary from each label that was clamped since the last
+            reset to its number of saturations.
+        """
+        return self.__count_by_label(self.counts)
+
+    def __count_by_label(self, counts: np.ndarray) -> Dict[str, int]:
+        output: Dict[str, int] = {}
+        flat_counts = counts.reshape(-1)
+        flat_labels = self.labels.reshape(-1)
+        for index in np.flatnonzero(flat_counts):
+            label = flat_labels[index]
+            output[label] = output.get(label, 0) + int(flat_counts[index])
+        return output
+
+    def __log_summary(self) -> None:
+        if self.log_period is None:
+            return
+        now = time.perf_counter()
+        if now - self.__last_log_time < self.log_period:
+            return
+        new_counts = self.__count_by_label(self.counts - self.__logged_counts)
+        logging.warning(
+            "Clamped values since the last summary: %s",
+            ", ".join(
+                f"{label} ({count} times)"
+                for label, count in new_counts.items()
+            ),
+        )
+        self.__last_log_time = now
+        self.__logged_counts[...] = self.counts
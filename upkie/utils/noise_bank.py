@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+r"""!
+Noise pre-sampled by blocks from a random number generator.
+"""
+
+from typing import Sequence, Union
+
+import numpy as np
+
+
+class NoiseBank:
+    r"""!
+    Bank of noise samples drawn by large blocks from a NumPy generator.
+
+    Calling a random number generator at every step for a handful of values
+    is dominated by call overhead. This bank rather draws standard samples
+    for many steps at once, for instance 4096, into a preallocated block,
+    then serves them one step at a time as slices of this block. Callers
+    scale samples to their distribution parameters, e.g. `loc + scale *
+    bank.draw(np_random)` for normal noise.
+
+    Samples are drawn from the generator passed to \ref draw, typically the
+    `np_random` generator of an environment, so that they are reproducible
+    from the seed passed to its `reset`. Call \ref reset when the generator
+    is reseeded, so that the next sample is drawn from the new generator.
+    """
+
+    __block: np.ndarray
+    __index: int
+
+    ## \var block_size
+    ## Number of samples drawn at once.
+    block_size: int
+
+    ## \var distribution
+    ## Distribution of samples, either "normal" for the standard normal
+    ## distribution or "uniform" for the uniform distribution over [0, 1).
+    distribution: str
+
+    def __init__(
+        self,
+        shape: Union[int, Sequence[int]],
+        distribution: str = "normal",
+        block_size: int = 4096,
+    ):
+        r"""!
+        Initialize an empty bank.
+
+        \param shape Shape of each sample.
+        \param distribution Either "normal" for samples from the standard
+            normal distribution, or "uniform" for samples from the uniform
+            distribution over [0, 1).
+        \param block_size Number of samples drawn at once.
+        \throw ValueError If the distribution is unknown or the block size is
+            not positive.
+        """
+        if distribution not in ("normal", "uniform"):
+            raise ValueError(f"Unknown noise {distribution=}")
+        if block_size < 1:
+            raise ValueError(f"{block_size=} should be positive")
+        self.__block = np.empty((block_size,) + tuple(np.atleast_1d(shape)))
+        self.__index = block_size  # empty until the first draw
+        self.block_size = block_size
+        self.distribution = distribution
+
+    def reset(self) -> None:
+        r"""!
+        Discard remaining samples, so that the next one is drawn anew.
+        """
+        self.__index = self.block_size
+
+    def draw(self, np_random: np.random.Generator) -> np.ndarray:
+        r"""!
+        Get the next sample of the bank.
+
+        \param np_random Generator to draw a new block from if the bank is
+            empty.
+        \return Next sample. It is a read-only view into the bank, valid until
+            the bank draws its next block.
+        """
+        if self.__index >= self.block_size:
+            block = self.__block
+            block.flags.writeable = True
+            if self.distribution == "normal":
+                np_random.standard_normal(out=block)
+            else:  # self.distribution == "uniform"
+                np_random.random(out=block)
+            block.flags.writeable = False
+            self.__index = 0
+        sample = self.__block[self.__index]
+        self.__index += 1
+        return sample
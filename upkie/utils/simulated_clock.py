@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+r"""!
+Pace a loop against simulated time.
+"""
+
+import asyncio
+import math
+import time
+
+from .spdlog import logging
+
+
+class SimulatedClock:
+    r"""!
+    Regulate a loop so that simulated time runs at a multiple of wall time.
+
+    Contrary to a rate limiter, which ticks at a fixed wall-clock period, this
+    clock waits at each call to \ref sleep until the wall time elapsed since
+    the previous call matches the simulated time elapsed between the two
+    calls, divided by the real-time factor. For instance, with a factor of
+    5.0, a loop whose simulated time advances by 5 ms per cycle runs one cycle
+    every millisecond. With an infinite factor, the clock never waits.
+
+    Like a rate limiter, the clock does not try to catch up after a late
+    cycle: the next cycle is paced from the time the late one was released.
+    """
+
+    __slack: float
+    __tick: float
+    __time: float
+
+    ## \var name
+    ## Human-readable name used for logging.
+    name: str
+
+    ## \var real_time_factor
+    ## Ratio of simulated time to wall time, possibly infinite.
+    real_time_factor: float
+
+    ## \var warn
+    ## If set, warn when a cycle was late with respect to its simulated time.
+    warn: bool
+
+    def __init__(
+        self,
+        real_time_factor: float,
+        name: str = "simulated clock",
+        warn: bool = True,
+    ):
+        r"""!
+        Initialize clock.
+
+        \param real_time_factor Ratio of simulated time to wall time, for
+            instance 1.0 for real time, 5.0 to run five times faster than
+            real time, or `math.inf` to run as fast as possible.
+        \param name Human-readable name used for logging.
+        \param warn If set (default), warn when a cycle was late by more than
+            10% of its wall-clock period.
+        \throw ValueError If the real-time factor is not positive.
+        """
+        if not real_time_factor > 0.0:
+            raise ValueError(f"{real_time_factor=} should be positive")
+        self.__slack = 0.0
+        self.__tick = time.perf_counter()
+        self.__time = 0.0
+        self.name = name
+        self.real_time_factor = real_time_factor
+        self.warn = warn
+
+    @property
+    def slack(self) -> float:
+        r"""!
+        Slack duration computed at the last call to \ref sleep, in seconds.
+        """
+        return self.__slack
+
+    def reset(self, sim_time: float) -> None:
+        r"""!
+        Anchor the clock to the current wall time.
+
+        \param sim_time Current simulated time, in seconds.
+        """
+        self.__slack = 0.0
+        self.__tick = time.perf_counter()
+        self.__time = sim_time
+
+    def remaining(self, sim_time: float) -> float:
+        r"""!
+        Get the wall time remaining until a simulated time is reached.
+
+        \param sim_time Simulated time, in seconds.
+        \return Time remaining, in seconds, until the loop can proceed.
+        """
+        if math.isinf(self.real_time_factor):
+            return 0.0
+        period = (sim_time - self.__time) / self.real_time_factor
+        return self.__tick + period - time.perf_counter()
+
+    def sleep(self, sim_time: float) -> None:
+        r"""!
+        Sleep until the wall time corresponding to a simulated time.
+
+        \param sim_time Simulated time of the latest observation, in seconds.
+        """
+        self.__slack = self.remaining(sim_time)
+        if self.__slack > 0.0:
+            time.sleep(self.__slack)
+        else:
+            self.__check_lateness(sim_time)
+        self.__tick = time.perf_counter()
+        self.__time = sim_time
+
+    async def async_sleep(self, sim_time: float) -> None:
+        r"""!
+        Coroutine counterpart of \ref sleep.
+
+        \param sim_time Simulated time of the latest observation, in seconds.
+        """
+        self.__slack = self.remaining(sim_time)
+        if self.__slack > 0.0:
+            await asyncio.sleep(self.__slack)
+        else:
+            self.__check_lateness(sim_time)
+        self.__tick = time.perf_counter()
+        self.__time = sim_time
+
+    def __check_lateness(self, sim_time: float) -> None:
+        period = (sim_time - self.__time) / self.real_time_factor
+        if self.warn and self.__slack < -0.1 * period:
+            logging.warning(
+                "%s is late by %.1f [ms]",
+                self.name,
+                round(-1e3 * self.__slack, 1),
+            )
@@ -10,7 +10,7 @@ import unittest
 
 import numpy as np
 
-from upkie.utils.clamp import clamp, clamp_abs, clamp_and_warn
+from upkie.utils.clamp import ArrayClamp, clamp, clamp_abs, clamp_and_warn
 
 
 class TestClamp(unittest.TestCase):
@@ -31,5 +31,50 @@ class TestClamp(unittest.TestCase):
         self.assertAlmostEqual(clamp_abs(x, np.inf), x)
 
 
+class TestArrayClamp(unittest.TestCase):
+    def setUp(self):
+        self.clamp = ArrayClamp(
+            lower=np.array([-1.0, -2.0, -3.0]),
+            upper=np.array([1.0, 2.0, 3.0]),
+            labels=["x", "y", "y"],
+            log_period=None,
+        )
+
+    def test_clamp(self):
+        value = self.clamp(np.array([-1.5, 0.5, 4.0]))
+        self.assertTrue(np.allclose(value, [-1.0, 0.5, 3.0]))
+
+    def test_clamp_in_place(self):
+        value = np.array([0.0, 2.5, np.nan])
+        self.clamp(value, out=value)
+        self.assertAlmostEqual(value[1], 2.0)
+        self.assertTrue(np.isnan(value[2]))
+        self.assertEqual(self.clamp.saturations(), {"y": 1})
+
+    def test_saturations(self):
+        self.assertEqual(self.clamp.saturations(), {})
+        for _ in range(3):
+            self.clamp(np.array([2.0, -5.0, 5.0]))
+        self.assertEqual(self.clamp.saturations(), {"x": 3, "y": 6})
+        self.clamp.reset()
+        self.assertEqual(self.clamp.saturations(), {})
+
+    def test_scalar(self):
+        clamp = ArrayClamp(-1.0, 1.0, "x", log_period=None)
+        self.assertAlmostEqual(clamp(2.0), 1.0)
+        self.assertEqual(clamp.saturations(), {"x": 1})
+
+    def test_mismatching_bounds(self):
+        with self.assertRaises(ValueError):
+            ArrayClamp(np.zeros(2), np.ones(3), "x")
+
+    def test_log_summary(self):
+        clamp = ArrayClamp(-1.0, 1.0, "x", log_period=3600.0)
+        with self.assertLogs(level="WARNING") as logs:
+            clamp(2.0)
+            clamp(3.0)
+        self.assertEqual(len(logs.output), 1)
+
+
 if __name__ == "__main__":
     unittest.main()
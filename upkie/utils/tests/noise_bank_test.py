@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Tests for noise banks."""
+
+import unittest
+
+import numpy as np
+
+from upkie.utils.noise_bank import NoiseBank
+
+
+class TestNoiseBank(unittest.TestCase):
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            NoiseBank(3, distribution="poisson")
+        with self.assertRaises(ValueError):
+            NoiseBank(3, block_size=0)
+
+    def test_uniform(self):
+        bank = NoiseBank((2, 3), "uniform", block_size=16)
+        np_random = np.random.default_rng(42)
+        samples = np.array([bank.draw(np_random) for _ in range(40)])
+        self.assertEqual(samples.shape, (40, 2, 3))
+        self.assertTrue(np.all(samples >= 0.0))
+        self.assertTrue(np.all(samples < 1.0))
+
+    def test_same_samples_as_generator(self):
+        bank = NoiseBank(4, block_size=8)
+        samples = [bank.draw(np.random.default_rng(1)) for _ in range(8)]
+        expected = np.random.default_rng(1).standard_normal((8, 4))
+        self.assertTrue(np.allclose(samples, expected))
+
+    def test_reset(self):
+        bank = NoiseBank(4, block_size=8)
+        first = np.copy(bank.draw(np.random.default_rng(7)))
+        bank.draw(np.random.default_rng(7))
+        bank.reset()
+        self.assertTrue(
+            np.allclose(bank.draw(np.random.default_rng(7)), first)
+        )
+
+    def test_samples_are_read_only(self):
+        bank = NoiseBank(4)
+        sample = bank.draw(np.random.default_rng())
+        with self.assertRaises(ValueError):
+            sample[0] = 1.0
+
+
+if __name__ == "__main__":
+    unittest.main()
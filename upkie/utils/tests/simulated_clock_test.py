@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2024 Inria
+
+"""Tests for the simulated clock."""
+
+import asyncio
+import math
+import time
+import unittest
+
+from upkie.utils.simulated_clock import SimulatedClock
+
+
+class TestSimulatedClock(unittest.TestCase):
+    def test_invalid_factor(self):
+        with self.assertRaises(ValueError):
+            SimulatedClock(0.0)
+        with self.assertRaises(ValueError):
+            SimulatedClock(-1.0)
+
+    def test_accelerated(self):
+        clock = SimulatedClock(10.0, warn=False)
+        clock.reset(sim_time=1.0)
+        start = time.perf_counter()
+        for step in range(1, 6):
+            clock.sleep(1.0 + 0.02 * step)
+        duration = time.perf_counter() - start
+        self.assertGreaterEqual(duration, 0.01)  # 0.1 s at 10x
+        self.assertLess(duration, 0.1)  # much less than real time
+
+    def test_unlimited(self):
+        clock = SimulatedClock(math.inf)
+        clock.reset(sim_time=0.0)
+        self.assertEqual(clock.remaining(1000.0), 0.0)
+        start = time.perf_counter()
+        clock.sleep(1000.0)
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+    def test_slack(self):
+        clock = SimulatedClock(1.0, warn=False)
+        clock.reset(sim_time=0.0)
+        clock.sleep(0.01)
+        self.assertGreater(clock.slack, 0.0)
+        time.sleep(0.02)
+        clock.sleep(0.02)
+        self.assertLess(clock.slack, 0.0)  # late
+
+    def test_async_sleep(self):
+        clock = SimulatedClock(2.0)
+        clock.reset(sim_time=0.0)
+        start = time.perf_counter()
+        asyncio.run(clock.async_sleep(0.02))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.009)
+
+
+if __name__ == "__main__":
+    unittest.main()